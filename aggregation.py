@@ -0,0 +1,246 @@
+import math
+import os
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+from config import load_env
+from latency import LatencyHistogram
+
+# Colunas do olist usadas pelas agregações, por papel; sobrescritas pelo .env em
+# AGGREGATION_COLUMNS (ex.: "state=seller_state,value=payment_value")
+DEFAULT_COLUMNS = {
+    "status": "order_status",
+    "state": "customer_state",
+    "date": "order_purchase_timestamp",
+    "value": "price",
+    "category": "product_category_name",
+    "seller": "seller_id",
+}
+DEFAULT_REPETITIONS = 5
+DEFAULT_WARMUP = 1
+# Tolerância das somas: SQL Server soma em FLOAT/DECIMAL e o MongoDB em double, em ordens diferentes
+RTOL = 1e-6
+ATOL = 1e-6
+
+
+# Consulta já resolvida para as colunas do dataset:
+#   keys     - (alias, coluna, bucket); bucket "month" agrupa por AAAA-MM da coluna de data
+#   measures - (alias, função, coluna); função "count" (COUNT(*)) ou "sum" (SUM(coluna))
+@dataclass(frozen=True)
+class AggregationQuery:
+    name: str
+    keys: tuple
+    measures: tuple
+    order_by: str = None
+    top: int = None
+
+
+# Formato de consulta em termos de papéis (DEFAULT_COLUMNS); "month" é o mês da coluna "date"
+@dataclass(frozen=True)
+class AggregationShape:
+    name: str
+    group: tuple
+    measures: tuple = ("orders",)
+    order_by: str = None
+    top: int = None
+
+    def roles(self):
+        roles = ["date" if role == "month" else role for role in self.group]
+        return roles + (["value"] if "total" in self.measures else [])
+
+    def resolve(self, columns):
+        keys = tuple((role, columns["date"], "month") if role == "month" else (role, columns[role], None)
+                     for role in self.group)
+        measures = tuple(("orders", "count", None) if m == "orders" else ("total", "sum", columns["value"])
+                         for m in self.measures)
+        return AggregationQuery(self.name, keys, measures, self.order_by, self.top)
+
+
+# Padrões dos relatórios: contagens por status/estado, faturamento por estado e por mês
+# e top-N de categorias e vendedores
+SHAPES = (
+    AggregationShape("count_by_status", ("status",)),
+    AggregationShape("revenue_by_state", ("state",), ("orders", "total")),
+    AggregationShape("revenue_by_month", ("month",), ("orders", "total")),
+    AggregationShape("count_by_state_status", ("state", "status")),
+    AggregationShape("top_categories", ("category",), ("orders", "total"), order_by="total", top=10),
+    AggregationShape("top_sellers", ("seller",), ("orders", "total"), order_by="orders", top=10),
+)
+
+
+def columns_from_env():
+    load_env()
+    columns = dict(DEFAULT_COLUMNS)
+    spec = os.getenv("AGGREGATION_COLUMNS", "").strip()
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        role, _, column = part.partition("=")
+        if role.strip() not in DEFAULT_COLUMNS or not column.strip():
+            raise ValueError(f"AGGREGATION_COLUMNS inválido: {part} (papéis: {', '.join(DEFAULT_COLUMNS)})")
+        columns[role.strip()] = column.strip()
+    return columns
+
+
+# Consultas cujas colunas existem no dataset; as demais são puladas com aviso
+def resolve_shapes(df, columns=None, names=None, log_fn=print):
+    columns = columns or columns_from_env()
+    queries = []
+    for shape in SHAPES:
+        if names and shape.name not in names:
+            continue
+        missing = [columns[role] for role in shape.roles() if columns[role] not in df.columns]
+        if missing:
+            log_fn(f"{shape.name}: pulada (colunas ausentes: {', '.join(missing)})")
+            continue
+        queries.append(shape.resolve(columns))
+    return queries
+
+
+# Resultado esperado calculado com pandas sobre o mesmo DataFrame inserido nos bancos
+def reference(df, query):
+    frame = pd.DataFrame(index=df.index)
+    for alias, column, bucket in query.keys:
+        values = df[column]
+        if bucket == "month":
+            if pd.api.types.is_datetime64_any_dtype(values):
+                values = values.dt.strftime("%Y-%m")
+            else:
+                values = values.astype("string").str[:7]
+        frame[alias] = values
+    for alias, func, column in query.measures:
+        frame[alias] = 1 if func == "count" else pd.to_numeric(df[column], errors="coerce")
+    keys = [alias for alias, _, _ in query.keys]
+    result = frame.groupby(keys, dropna=False, sort=False).sum(min_count=0).reset_index()
+    if query.order_by:
+        result = result.sort_values(query.order_by, ascending=False, kind="stable")
+    if query.top:
+        result = result.head(query.top)
+    return result.to_dict(orient="records")
+
+
+def _key(value):
+    if value is None or value is pd.NA or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return str(value)
+
+
+# Linhas de qualquer origem (SQL, MongoDB, pandas) -> DataFrame com chaves em texto
+# (NULL/NaN/ausente viram None) e medidas em float (NULL conta como 0)
+def _normalize(rows, query):
+    keys = [alias for alias, _, _ in query.keys]
+    measures = [alias for alias, _, _ in query.measures]
+    frame = pd.DataFrame([{col: row.get(col) for col in keys + measures} for row in rows], columns=keys + measures)
+    for col in keys:
+        frame[col] = [_key(v) for v in frame[col]]
+    for col in measures:
+        frame[col] = pd.to_numeric(frame[col], errors="coerce").astype(float).fillna(0.0)
+    return frame
+
+
+# None se os resultados são equivalentes; senão, a descrição da primeira diferença
+def compare(expected, actual, query):
+    keys = [alias for alias, _, _ in query.keys]
+    measures = [alias for alias, _, _ in query.measures]
+    exp, act = _normalize(expected, query), _normalize(actual, query)
+    if len(exp) != len(act):
+        return f"{len(act)} grupos, esperado {len(exp)}"
+    if query.top and len(exp):
+        # Empates no limite do top-N podem trazer chaves diferentes: compara os valores
+        # ordenados e as chaves só acima do menor valor
+        ev = np.sort(exp[query.order_by].to_numpy())
+        av = np.sort(act[query.order_by].to_numpy())
+        if not np.allclose(ev, av, rtol=RTOL, atol=ATOL):
+            return f"valores de {query.order_by} do top-{query.top} diferem"
+        cutoff = ev[0] + abs(ev[0]) * RTOL + ATOL
+        exp, act = exp[exp[query.order_by] > cutoff], act[act[query.order_by] > cutoff]
+    merged = exp.merge(act, on=keys, how="outer", suffixes=("", "_db"), indicator=True)
+    unmatched = int((merged["_merge"] != "both").sum())
+    if unmatched:
+        return f"{unmatched} grupos presentes em só um dos resultados"
+    for col in measures:
+        diff = ~np.isclose(merged[col], merged[f"{col}_db"], rtol=RTOL, atol=ATOL)
+        if diff.any():
+            return f"{col} difere em {int(diff.sum())} grupos"
+    return None
+
+
+# Executa cada consulta `warmup` vezes sem medir e `repetitions` vezes medindo,
+# e confere o último resultado com a referência do pandas
+def run_aggregations(backend, queries, expected, repetitions=DEFAULT_REPETITIONS, warmup=DEFAULT_WARMUP,
+                     log_fn=print):
+    if repetitions < 1:
+        raise ValueError("As agregações precisam de pelo menos uma repetição medida")
+    results = []
+    for query in queries:
+        hist = LatencyHistogram()
+        try:
+            for _ in range(warmup):
+                backend.aggregate(query)
+            for _ in range(repetitions):
+                rows = hist.measure(backend.aggregate, query)
+        except Exception as e:
+            log_fn(f"[{backend.name}] {query.name}: erro: {e}")
+            results.append({"shape": query.name, "latency": hist, "groups": None, "mismatch": f"erro: {e}"})
+            continue
+        mismatch = compare(expected[query.name], rows, query)
+        log_fn(f"[{backend.name}] {query.name}: {len(rows)} grupos | {hist.format()}"
+               + (f" | DIFERENTE: {mismatch}" if mismatch else ""))
+        results.append({"shape": query.name, "latency": hist, "groups": len(rows), "mismatch": mismatch})
+    return results
+
+
+def results_table(results, backend_name=None):
+    rows = []
+    for result in results:
+        summary = result["latency"].summary()
+        rows.append({
+            **({"backend": backend_name} if backend_name else {}),
+            "shape": result["shape"],
+            "groups": result["groups"],
+            "equivalent": result["mismatch"] is None,
+            "runs": summary["count"],
+            **{k: v for k, v in summary.items() if k in ("mean_ms", "p50_ms", "p99_ms", "max_ms")},
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    import argparse
+    from backends import create_backend
+    from dataset import load_dataset
+    from results_store import backend_params, record_run
+
+    parser = argparse.ArgumentParser(description="Agregações analíticas: GROUP BY SQL x pipeline do MongoDB")
+    parser.add_argument("backends", nargs="+", choices=["sqlserver", "mongo", "sqlite"])
+    parser.add_argument("--shape", action="append", choices=[s.name for s in SHAPES],
+                        help="pode ser repetido (padrão: todas)")
+    parser.add_argument("--repetitions", type=int, default=DEFAULT_REPETITIONS)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    args = parser.parse_args()
+
+    df = load_dataset(log_fn=print)
+    queries = resolve_shapes(df, names=args.shape)
+    expected = {query.name: reference(df, query) for query in queries}
+
+    tables = []
+    for name in args.backends:
+        backend = create_backend(name)
+        backend.connect(log_fn=print)
+        try:
+            print(f"Inserindo dados em {backend.name}...")
+            backend.prepare_dataset(df)
+            backend.insert_batch(backend.prepare_batch(df))
+            results = run_aggregations(backend, queries, expected, args.repetitions, args.warmup)
+        finally:
+            backend.teardown()
+            backend.close()
+        # Tempo somado só das execuções medidas (sem aquecimento)
+        executed = sum(r["latency"].count for r in results)
+        elapsed = sum(r["latency"].total for r in results) / 1e9
+        record_run(backend.name, "agregacao", executed / elapsed if elapsed > 0 else 0, elapsed, executed,
+                   dataset_rows=len(df), params=backend_params(backend, repetitions=args.repetitions,
+                                                               warmup=args.warmup),
+                   latency={r["shape"]: r["latency"] for r in results},
+                   extra={"mismatches": {r["shape"]: r["mismatch"] for r in results if r["mismatch"]}})
+        tables.append(results_table(results, backend.name))
+    print(pd.concat(tables, ignore_index=True).to_string(index=False))
@@ -2,139 +2,164 @@ import tkinter as tk
 from tkinter import ttk
 from tkinter.scrolledtext import ScrolledText
 import threading
-import pandas as pd
 import time
-import os
-import sys
-from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import URL
-from pymongo import MongoClient
-import urllib.parse
-import copy
-
-# -------------------- Utils --------------------
-def get_base_path():
-    return os.path.dirname(sys.executable if getattr(sys, 'frozen', False) else __file__)
-
-def get_csv_path():
-    return os.path.join(get_base_path(), "data", "olist_dataset.csv")
-
-def load_env():
-    dotenv_path = os.path.join(get_base_path(), ".env")
-    load_dotenv(dotenv_path, override=True)
+
+from backends import BACKENDS, create_backend
+from dataset import load_dataset
+from gui_chart import TimelineChart
+from gui_log import UiQueue
+from mongo_batches import encode_templates, fresh_batch, measure_prep_cost
+from parallel_insert import scaling_curve
+from results_store import backend_params, record_run
+from timeline import ThroughputSampler
+
+# Exporta a série por segundo e compara o início com o fim da execução
+def _report_timeline(name, tag, sampler, log_fn):
+    log_fn(f"[{name}] Série de throughput exportada em: {sampler.save(f'{tag}_insercao_continua')}")
+    ratio = sampler.degradation()
+    if ratio is not None:
+        log_fn(f"[{name}] Throughput no último 10% da execução: {ratio * 100:.0f}% do primeiro 10%")
 
 # -------------------- Benchmark SQL Server --------------------
-def run_benchmark_sql(log_fn, stop_event, update_table):
+# progress_fn: mensagens de progresso do loop (coalescidas pela interface); padrão: log_fn
+# sampler: amostrador do throughput por segundo (timeline.ThroughputSampler), salvo com a execução
+def run_benchmark_sql(log_fn, stop_event, update_table, progress_fn=None, sampler=None):
+    backend = None
+    progress_fn = progress_fn or log_fn
+    sampler = sampler or ThroughputSampler()
     try:
-        load_env()
-        server = os.getenv("DB_SERVER")
-        banco = os.getenv("DB_NAME")
-        username = os.getenv("DB_USERNAME")
-        password = os.getenv("DB_PASSWORD")
-        port = os.getenv("DB_PORT", "1433")
-
-        conn_url = URL.create(
-            drivername="mssql+pyodbc",
-            username=username,
-            password=password,
-            host=server,
-            port=int(port),
-            database=banco,
-            query={"driver": "ODBC Driver 18 for SQL Server", "TrustServerCertificate": "yes"}
-        )
-
-        engine = create_engine(conn_url, fast_executemany=True)
-
-        df = pd.read_csv(get_csv_path())
+        backend = create_backend("sqlserver")
+        backend.connect(log_fn=log_fn)
+
+        df = load_dataset()
+        backend.prepare_dataset(df)
+        batch = backend.prepare_batch(df)
+
         total_inserted = 0
         start_time = time.time()
 
         log_fn("[SQL Server] Iniciando inserção contínua...")
 
-        while not stop_event.is_set():
-            df.to_sql("olist_dataset", con=engine, if_exists="append", index=False)
-            total_inserted += len(df)
-            log_fn(f"[SQL Server] Linhas inseridas: {total_inserted}")
+        with sampler:
+            while not stop_event.is_set():
+                inserted = backend.insert_batch(batch)
+                sampler.add(rows=inserted)
+                total_inserted += inserted
+                progress_fn(f"[SQL Server] Linhas inseridas: {total_inserted}")
 
         elapsed = time.time() - start_time
         throughput = total_inserted / elapsed if elapsed > 0 else 0
 
-        with engine.connect() as conn:
-            conn.execute(text("DELETE FROM olist_dataset"))
-            conn.commit()
+        backend.teardown()
 
-        update_table("SQL Server", total_inserted, elapsed, throughput)
+        update_table(backend.name, total_inserted, elapsed, throughput)
+        _report_timeline(backend.name, "sqlserver", sampler, log_fn)
+        record_run(backend.name, "insercao_continua", throughput, elapsed, total_inserted,
+                   dataset_rows=len(df), params=backend_params(backend), extra={"timeline": sampler.to_dict()})
         log_fn("[SQL Server] Benchmark finalizado.")
     except Exception as e:
         log_fn(f"[SQL Server] Erro: {e}")
+    finally:
+        if backend is not None:
+            backend.close()
 
 # -------------------- Benchmark MongoDB --------------------
-def run_benchmark_mongo(log_fn, stop_event, update_table):
+def run_benchmark_mongo(log_fn, stop_event, update_table, progress_fn=None, sampler=None):
+    backend = None
+    progress_fn = progress_fn or log_fn
+    sampler = sampler or ThroughputSampler()
     try:
-        load_env()
-        mongo_host = os.getenv("MONGO_HOST")
-        mongo_port = os.getenv("MONGO_PORT")
-        mongo_db = os.getenv("MONGO_DB")
-        mongo_collection = os.getenv("MONGO_COLLECTION")
-        mongo_user = os.getenv("MONGO_USER")
-        mongo_pass = os.getenv("MONGO_PASSWORD")
-
-        encoded_pass = urllib.parse.quote_plus(mongo_pass)
-        mongo_uri = f"mongodb://{mongo_user}:{encoded_pass}@{mongo_host}:{mongo_port}/{mongo_db}?authSource=admin"
-
-        client = MongoClient(mongo_uri)
-        db = client[mongo_db]
-        collection = db[mongo_collection]
-
-        if collection.count_documents({}) > 0:
+        backend = create_backend("mongo")
+        backend.connect()
+
+        if backend.collection.count_documents({}) > 0:
             log_fn("[MongoDB] Coleção contém dados. Limpando antes de iniciar o benchmark...")
-            collection.delete_many({})
+            backend.prepare_dataset(None)
             log_fn("[MongoDB] Coleção limpa.")
 
-        df = pd.read_csv(get_csv_path())
-        # Remove _id se existir no dataframe
-        records = [{k: v for k, v in row.items() if k != "_id"} for row in df.to_dict(orient="records")]
+        df = load_dataset()
+        records = backend.prepare_batch(df)
+
+        # Codifica os documentos em BSON uma única vez (o _id é descartado);
+        # a cada iteração só os _id novos são gerados
+        templates = encode_templates(records)
+        prep = measure_prep_cost(records, templates)
+        log_fn(f"[MongoDB] Preparação por lote: deepcopy {prep['deepcopy_s'] * 1000:.1f} ms, "
+               f"templates BSON {prep['template_s'] * 1000:.1f} ms ({prep['speedup']:.1f}x mais rápido)")
 
         total_inserted = 0
+        prep_time = 0.0
         start_time = time.time()
 
         log_fn("[MongoDB] Iniciando inserção contínua...")
 
-        while not stop_event.is_set():
-            # Copia os documentos para garantir _id novo gerado pelo MongoDB
-            batch = [copy.deepcopy(doc) for doc in records]
-            collection.insert_many(batch)
-            total_inserted += len(batch)
-            log_fn(f"[MongoDB] Linhas inseridas: {total_inserted}")
+        with sampler:
+            while not stop_event.is_set():
+                t0 = time.perf_counter()
+                batch = fresh_batch(templates)
+                prep_time += time.perf_counter() - t0
+                inserted = backend.insert_batch(batch)
+                sampler.add(rows=inserted)
+                total_inserted += inserted
+                progress_fn(f"[MongoDB] Linhas inseridas: {total_inserted}")
 
         elapsed = time.time() - start_time
         throughput = total_inserted / elapsed if elapsed > 0 else 0
-
-        collection.delete_many({})
-        update_table("MongoDB", total_inserted, elapsed, throughput)
+        iterations = total_inserted // len(templates) if templates else 0
+        log_fn(f"[MongoDB] Tempo de preparação no cliente: {prep_time:.2f} s "
+               f"({prep_time / elapsed * 100 if elapsed > 0 else 0:.1f}% do total; "
+               f"~{prep['saved_s'] * iterations:.2f} s economizados em relação ao deepcopy)")
+
+        backend.teardown()
+        update_table(backend.name, total_inserted, elapsed, throughput)
+        _report_timeline(backend.name, "mongodb", sampler, log_fn)
+        record_run(backend.name, "insercao_continua", throughput, elapsed, total_inserted,
+                   dataset_rows=len(df), params=backend_params(backend, batch_prep="templates_bson"),
+                   extra={"prep_time": prep_time, "timeline": sampler.to_dict()})
         log_fn("[MongoDB] Benchmark finalizado.")
     except Exception as e:
         log_fn(f"[MongoDB] Erro: {e}")
+    finally:
+        if backend is not None:
+            backend.close()
+
+# -------------------- Curva de escalabilidade (workers paralelos) --------------------
+def run_scaling(kind, log_fn, update_table, max_workers):
+    name = BACKENDS[kind].name
+    try:
+        df = load_dataset()
+        log_fn(f"[{name}] Curva de escalabilidade com até {max_workers} workers...")
+        curve = scaling_curve(kind, df, max_workers, log_fn=lambda msg: log_fn(f"[{name}] {msg}"))
+        for row in curve.itertuples():
+            update_table(f"{name} x{row.workers}", row.rows, row.elapsed, row.throughput)
+            record_run(name, "insercao_paralela", row.throughput, row.elapsed, row.rows, dataset_rows=len(df),
+                       params={"workers": row.workers}, extra={"speedup": row.speedup, "efficiency": row.efficiency})
+        log_fn(f"[{name}] Speedup com {curve['workers'].iloc[-1]} workers: {curve['speedup'].iloc[-1]:.2f}x")
+    except Exception as e:
+        log_fn(f"[{name}] Erro: {e}")
 
 # -------------------- GUI Setup --------------------
 root = tk.Tk()
 root.title("Benchmark Contínuo")
-root.geometry("700x600")
+root.geometry("700x1000")
 
 output_box = ScrolledText(root, height=15, width=90)
 output_box.pack(padx=10, pady=10)
 
 # Result Table
-results_table = ttk.Treeview(root, columns=("Sistema", "Linhas", "Tempo (s)", "Throughput"), show='headings', height=4)
+results_table = ttk.Treeview(root, columns=("Sistema", "Linhas", "Tempo (s)", "Throughput"), show='headings', height=8)
 for col in ("Sistema", "Linhas", "Tempo (s)", "Throughput"):
     results_table.heading(col, text=col)
     results_table.column(col, width=160, anchor='center')
 results_table.pack(pady=10)
 
-def log_output(msg):
-    output_box.insert(tk.END, msg + '\n')
-    output_box.see(tk.END)
+# Throughput por segundo das execuções contínuas em andamento
+timeline_chart = TimelineChart(root)
+timeline_chart.pack(padx=10, pady=5)
+
+# Mensagens das threads passam por uma fila esvaziada pela interface a cada 100 ms
+ui = UiQueue(root, output_box)
+log_output = ui.log
 
 def update_results_table(system_name, total_rows, elapsed_time, throughput):
     for row in results_table.get_children():
@@ -143,6 +168,10 @@ def update_results_table(system_name, total_rows, elapsed_time, throughput):
             return
     results_table.insert('', tk.END, values=(system_name, total_rows, f"{elapsed_time:.2f}", f"{throughput:.2f}"))
 
+# Atualização da tabela chamada pelas threads: executada na thread do Tk
+def queue_results_update(*row):
+    ui.call(update_results_table, *row)
+
 # Thread Management
 stop_events = {"sql": threading.Event(), "mongo": threading.Event()}
 threads = {"sql": None, "mongo": None}
@@ -153,11 +182,15 @@ def start_benchmark(key):
     else:
         func = run_benchmark_mongo
 
+    sampler = ThroughputSampler()
+
     def target():
         stop_events[key].clear()
-        func(log_fn=log_output, stop_event=stop_events[key], update_table=update_results_table)
+        func(log_fn=log_output, stop_event=stop_events[key], update_table=queue_results_update,
+             progress_fn=lambda msg: ui.progress(key, msg), sampler=sampler)
 
     if threads[key] is None or not threads[key].is_alive():
+        timeline_chart.set_source("SQL Server" if key == "sql" else "MongoDB", sampler)
         t = threading.Thread(target=target, daemon=True)
         t.start()
         threads[key] = t
@@ -165,11 +198,30 @@ def start_benchmark(key):
 def stop_benchmark(key):
     stop_events[key].set()
 
+def start_scaling(key):
+    kind = "sqlserver" if key == "sql" else "mongo"
+    max_workers = int(workers_var.get())
+
+    def target():
+        run_scaling(kind, log_fn=log_output, update_table=queue_results_update, max_workers=max_workers)
+
+    if threads[key] is None or not threads[key].is_alive():
+        t = threading.Thread(target=target, daemon=True)
+        t.start()
+        threads[key] = t
+
 # Botões
 tk.Button(root, text="Executar SQL Server", width=40, command=lambda: start_benchmark("sql")).pack(pady=5)
 tk.Button(root, text="Executar MongoDB", width=40, command=lambda: start_benchmark("mongo")).pack(pady=5)
 tk.Button(root, text="Parar SQL Server", width=40, command=lambda: stop_benchmark("sql")).pack(pady=5)
 tk.Button(root, text="Parar MongoDB", width=40, command=lambda: stop_benchmark("mongo")).pack(pady=5)
+workers_frame = tk.Frame(root)
+workers_frame.pack(pady=5)
+tk.Label(workers_frame, text="Máx. workers:").pack(side=tk.LEFT)
+workers_var = tk.StringVar(value="8")
+tk.Spinbox(workers_frame, values=(1, 2, 4, 8, 16, 32), textvariable=workers_var, width=5).pack(side=tk.LEFT)
+tk.Button(root, text="Curva de escalabilidade SQL Server", width=40, command=lambda: start_scaling("sql")).pack(pady=5)
+tk.Button(root, text="Curva de escalabilidade MongoDB", width=40, command=lambda: start_scaling("mongo")).pack(pady=5)
 tk.Button(root, text="Limpar Saída", width=40, command=lambda: output_box.delete(1.0, tk.END)).pack(pady=5)
 
 root.mainloop()
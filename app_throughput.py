@@ -1,34 +1,12 @@
 import tkinter as tk
 from tkinter import scrolledtext, ttk
 import threading
-import pandas as pd
 import time
-import os
-import sys
-from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import URL
-from pymongo import MongoClient
-import urllib.parse
-
-def get_base_path():
-    base_dir = os.path.dirname(sys.executable if getattr(sys, 'frozen', False) else __file__)
-    dotenv_path = os.path.join(base_dir, '.env')
-    if not os.path.isfile(dotenv_path):
-        raise FileNotFoundError(f"Arquivo .env não encontrado em: {dotenv_path}")
-    return base_dir  # <<-- Retorna o diretório, não o caminho completo do .env
-
-def get_csv_path():
-    base_dir = os.path.dirname(sys.executable if getattr(sys, 'frozen', False) else __file__)
-    return os.path.join(base_dir, "data", "olist_dataset.csv")
-
-def load_env():
-    dotenv_path = os.path.join(get_base_path(), '.env')
-    load_dotenv(dotenv_path, override=True)
-
-def append_output(output_widget, message):
-    output_widget.insert(tk.END, message + "\n")
-    output_widget.see(tk.END)
+
+from backends import create_backend
+from dataset import load_dataset
+from gui_log import UiQueue
+from results_store import backend_params, record_run
 
 def update_results_table(table_widget, system_name, total_rows, elapsed_time, throughput):
     for row in table_widget.get_children():
@@ -37,123 +15,99 @@ def update_results_table(table_widget, system_name, total_rows, elapsed_time, th
             return
     table_widget.insert('', tk.END, values=(system_name, total_rows, f"{elapsed_time:.2f}", f"{throughput:.2f}"))
 
-def run_sql_server(output_widget, results_table):
+def run_sql_server(log_fn, update_table):
+    backend = None
     try:
-        load_dotenv(get_base_path(), override=True)
-
-        server = os.getenv("DB_SERVER")
-        banco = os.getenv("DB_NAME")
-        username = os.getenv("DB_USERNAME")
-        password = os.getenv("DB_PASSWORD")
-        port = os.getenv("DB_PORT", "1433")
-
-        append_output(output_widget, "Iniciando inserção de dados no SQL Server...")
-
-        conn_url = URL.create(
-            drivername="mssql+pyodbc",
-            username=username,
-            password=password,
-            host=server,
-            port=int(port),
-            database=banco,
-            query={"driver": "ODBC Driver 18 for SQL Server", "TrustServerCertificate": "yes"}
-        )
-
-        engine = create_engine(conn_url, fast_executemany=True)
-
-        # Verifica se o banco existe
-        with engine.connect() as conn:
-            result = conn.execute(
-                text("SELECT COUNT(*) FROM sys.databases WHERE name = :db_name"),
-                {"db_name": banco}
-            )
-            exists = result.scalar()
-            if not exists:
-                append_output(output_widget, f"Criando banco de dados '{banco}'...")
-                conn.execute(text(f"CREATE DATABASE [{banco}]"))
-                conn.commit()
-
-        engine = create_engine(conn_url, fast_executemany=True)
-
-        df = pd.read_csv(get_csv_path())
+        backend = create_backend("sqlserver")
+
+        log_fn("Iniciando inserção de dados no SQL Server...")
+
+        # Engine reaproveitada do pool; cria o banco se necessário
+        backend.connect(log_fn=log_fn)
+
+        df = load_dataset()
         total_rows = len(df)
 
+        backend.prepare_dataset(df)
+        batch = backend.prepare_batch(df)
+
         start_time = time.time()
-        df.to_sql("olist_dataset", con=engine, if_exists="replace", index=False)
+        backend.insert_batch(batch)
         end_time = time.time()
 
         elapsed_time = end_time - start_time
         throughput = total_rows / elapsed_time if elapsed_time > 0 else 0
 
-        append_output(output_widget, f"Linhas inseridas: {total_rows}")
-        append_output(output_widget, f"Tempo de inserção: {elapsed_time:.2f} segundos")
-        append_output(output_widget, f"Throughput: {throughput:.2f} linhas/segundo")
+        log_fn(f"Linhas inseridas: {total_rows}")
+        log_fn(f"Tempo de inserção: {elapsed_time:.2f} segundos")
+        log_fn(f"Throughput: {throughput:.2f} linhas/segundo")
 
-        update_results_table(results_table, "SQL Server", total_rows, elapsed_time, throughput)
+        update_table(backend.name, total_rows, elapsed_time, throughput)
+        record_run(backend.name, "insercao", throughput, elapsed_time, total_rows,
+                   dataset_rows=total_rows, params=backend_params(backend))
 
-        with engine.connect() as conn:
-            conn.execute(text("DELETE FROM olist_dataset"))
-            conn.commit()
-            #append_output(output_widget, "Dados excluídos da tabela.")
+        backend.teardown()
+        #log_fn("Dados excluídos da tabela.")
     except Exception as e:
-        append_output(output_widget, f"Erro: {e}")
+        log_fn(f"Erro: {e}")
+    finally:
+        if backend is not None:
+            backend.close()
 
-def run_mongodb(output_widget, results_table):
+def run_mongodb(log_fn, update_table):
+    backend = None
     try:
-        load_env()
-        mongo_host = os.getenv("MONGO_HOST")
-        mongo_port = os.getenv("MONGO_PORT")
-        mongo_db = os.getenv("MONGO_DB")
-        mongo_collection = os.getenv("MONGO_COLLECTION")
-        mongo_user = os.getenv("MONGO_USER")
-        mongo_pass = os.getenv("MONGO_PASSWORD")
-
-        print({mongo_host}, {mongo_port}, {mongo_user}, {mongo_pass}, {mongo_db}, {mongo_collection})
+        backend = create_backend("mongo")
 
-        encoded_pass = urllib.parse.quote_plus(mongo_pass)
-        mongo_uri = f"mongodb://{mongo_user}:{encoded_pass}@{mongo_host}:{mongo_port}/{mongo_db}?authSource=admin"
+        log_fn("Iniciando inserção de dados no MongoDB...")
 
-        append_output(output_widget, "Iniciando inserção de dados no MongoDB...")
+        backend.connect()
 
-        client = MongoClient(mongo_uri)
-        db = client[mongo_db]
-        collection = db[mongo_collection]
-
-        df = pd.read_csv(get_csv_path())
+        df = load_dataset()
         total_rows = len(df)
-        records = df.to_dict(orient="records")
+        backend.prepare_dataset(df)
+        records = backend.prepare_batch(df)
 
         start_time = time.time()
-        collection.insert_many(records)
+        backend.insert_batch(records)
         end_time = time.time()
 
         elapsed_time = end_time - start_time
         throughput = total_rows / elapsed_time if elapsed_time > 0 else 0
 
-        append_output(output_widget, f"Linhas inseridas no MongoDB: {total_rows}")
-        append_output(output_widget, f"Tempo total de inserção: {elapsed_time:.2f} segundos")
-        append_output(output_widget, f"Throughput: {throughput:.2f} linhas por segundo")
+        log_fn(f"Linhas inseridas no MongoDB: {total_rows}")
+        log_fn(f"Tempo total de inserção: {elapsed_time:.2f} segundos")
+        log_fn(f"Throughput: {throughput:.2f} linhas por segundo")
 
-        update_results_table(results_table, "MongoDB", total_rows, elapsed_time, throughput)
+        update_table(backend.name, total_rows, elapsed_time, throughput)
+        record_run(backend.name, "insercao", throughput, elapsed_time, total_rows,
+                   dataset_rows=total_rows, params=backend_params(backend))
 
-        collection.delete_many({})
-        #append_output(output_widget, "Dados excluídos do MongoDB.")
+        backend.teardown()
+        #log_fn("Dados excluídos do MongoDB.")
     except Exception as e:
-        append_output(output_widget, f"Erro (MongoDB): {e}")
+        log_fn(f"Erro (MongoDB): {e}")
+    finally:
+        if backend is not None:
+            backend.close()
+
 
+# As threads só enfileiram mensagens e atualizações da tabela; a interface as aplica em lote
+def start_thread(func):
+    def update_table(*row):
+        ui.call(update_results_table, results_table, *row)
 
-def start_thread(func, output_widget):
-    threading.Thread(target=func, args=(output_widget, results_table), daemon=True).start()
+    threading.Thread(target=func, args=(ui.log, update_table), daemon=True).start()
 
 # GUI
 root = tk.Tk()
 root.title("Throughput - SQL Server e MongoDB")
 root.geometry("600x500")
 
-btn_sql = tk.Button(root, text="Executar SQL Server", width=25, command=lambda: start_thread(run_sql_server, output))
+btn_sql = tk.Button(root, text="Executar SQL Server", width=25, command=lambda: start_thread(run_sql_server))
 btn_sql.pack(pady=5)
 
-btn_mongo = tk.Button(root, text="Executar MongoDB", width=25, command=lambda: start_thread(run_mongodb, output))
+btn_mongo = tk.Button(root, text="Executar MongoDB", width=25, command=lambda: start_thread(run_mongodb))
 btn_mongo.pack(pady=5)
 
 btn_clear = tk.Button(root, text="Limpar saída", width=25, command=lambda: output.delete(1.0, tk.END))
@@ -161,6 +115,7 @@ btn_clear.pack(pady=5)
 
 output = scrolledtext.ScrolledText(root, wrap=tk.WORD, width=70, height=10)
 output.pack(padx=10, pady=10)
+ui = UiQueue(root, output)
 
 # Tabela de resultados
 results_table = ttk.Treeview(root, columns=("Sistema", "Linhas", "Tempo (s)", "Throughput"), show='headings', height=4)
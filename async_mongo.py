@@ -0,0 +1,110 @@
+import asyncio
+import itertools
+import time
+import pandas as pd
+
+try:
+    from pymongo import AsyncMongoClient
+except ImportError:
+    # PyMongo sem API assíncrona: usa o Motor
+    from motor.motor_asyncio import AsyncIOMotorClient as AsyncMongoClient
+
+from latency import LatencyHistogram
+
+
+# Mantém `concurrency` find_one em andamento no mesmo event loop durante `duration` segundos:
+# cada corrotina dispara a próxima consulta assim que a anterior responde.
+async def run_concurrency(collection, operations, concurrency, duration):
+    histogram = LatencyHistogram()
+    counter = itertools.count()
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            key, value = operations[next(counter) % len(operations)]
+            t0 = time.perf_counter_ns()
+            try:
+                await collection.find_one({key: value})
+            except Exception:
+                errors += 1
+                continue
+            histogram.record(time.perf_counter_ns() - t0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "queries": histogram.count,
+        "errors": errors,
+        "elapsed": elapsed,
+        "throughput": histogram.count / elapsed if elapsed > 0 else 0,
+        "latency": histogram,
+    }
+
+
+# Varre K = 1, 2, 4, ... até max_concurrency usando um único client assíncrono
+async def sweep_async(uri, database, collection_name, operations, max_concurrency=64, duration=10, log_fn=None):
+    client = AsyncMongoClient(uri, maxPoolSize=max_concurrency, serverSelectionTimeoutMS=2000)
+    try:
+        collection = client[database][collection_name]
+        results = []
+        k = 1
+        while k <= max_concurrency:
+            result = await run_concurrency(collection, operations, k, duration)
+            results.append(result)
+            if log_fn:
+                log_fn(f"K={k}: {result['throughput']:.2f} consultas/segundo | {result['latency'].format()}")
+            k *= 2
+        return results
+    finally:
+        closing = client.close()
+        if asyncio.iscoroutine(closing):
+            await closing
+
+
+def sweep(backend, operations, max_concurrency=64, duration=10, log_fn=None):
+    return asyncio.run(sweep_async(
+        backend.uri(), backend.database, backend.collection_name,
+        operations, max_concurrency, duration, log_fn
+    ))
+
+
+# Tabela com throughput e percentis por K
+def results_table(results):
+    rows = []
+    for r in results:
+        row = {k: v for k, v in r.items() if k != "latency"}
+        row.update(r["latency"].summary())
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    import argparse
+    from backends import create_backend
+    from dataset import load_dataset
+    from workload import load_or_create
+
+    parser = argparse.ArgumentParser(description="Consultas find_one assíncronas com K requisições em andamento")
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10, help="segundos por valor de K")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    backend = create_backend("mongo")
+    backend.connect()
+    df = load_dataset()
+    records = df.to_dict(orient="records")
+    operations = load_or_create(df, seed=args.seed, log_fn=print).operations(df)
+
+    print("Inserindo dados para benchmark...")
+    backend.prepare_dataset(df)
+    backend.insert_batch(records)
+    try:
+        results = sweep(backend, operations, args.max_concurrency, args.duration, log_fn=print)
+        print(results_table(results).to_string(index=False))
+    finally:
+        backend.teardown()
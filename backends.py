@@ -0,0 +1,650 @@
+import os
+import threading
+import urllib.parse
+from dataclasses import replace
+from datetime import datetime, timezone
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL
+from pymongo import MongoClient
+
+from config import get_base_path, load_env
+import mongo_strategies
+import sql_schema
+import sql_strategies
+
+# -------------------- Pool de conexões --------------------
+# Engines e clients ficam vivos entre execuções (e entre cliques na GUI):
+# o handshake e a autenticação acontecem uma vez por processo e não entram
+# na medição de throughput.
+_pool_lock = threading.Lock()
+_engines = {}
+_mongo_clients = {}
+_ensured_databases = set()
+
+# Modos de preparo das consultas pontuais SQL:
+#   off    - text() novo a cada consulta (o SQLAlchemy reencontra a compilação no cache)
+#   cached - um text() por coluna, criado uma vez e reaproveitado. O SQLAlchemy já guarda a
+#            compilação de text() pelo SQL, então a diferença para off é só montar o objeto
+#            a cada consulta: serve de controle para isolar o ganho do modo raw
+#   raw    - um cursor DBAPI por coluna; o driver prepara o comando na primeira
+#            execução e reaproveita o handle preparado nas seguintes. O resultado de cada
+#            consulta é consumido até o fim para liberar a conexão (sem MARS, o SQL Server
+#            recusa outro comando enquanto um cursor tem resultados pendentes)
+STATEMENT_CACHE_MODES = ("off", "cached", "raw")
+
+# Tabela/coleção com a impressão digital de cada carga reaproveitável (fixtures.DatasetFixture)
+FIXTURE_TABLE = "bench_fixtures"
+
+
+def get_engine(url, pool_size=5, max_overflow=10, pool_pre_ping=True, **kwargs):
+    key = (url, pool_size, max_overflow, pool_pre_ping, tuple(sorted(kwargs.items())))
+    with _pool_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = create_engine(
+                url,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_pre_ping=pool_pre_ping,
+                **kwargs
+            )
+            _engines[key] = engine
+        return engine
+
+
+def get_mongo_client(uri, max_pool_size=100, **kwargs):
+    key = (uri, max_pool_size, tuple(sorted(kwargs.items())))
+    with _pool_lock:
+        client = _mongo_clients.get(key)
+        if client is None:
+            client = MongoClient(uri, maxPoolSize=max_pool_size, **kwargs)
+            _mongo_clients[key] = client
+        return client
+
+
+# Descarta uma engine do cache (pools dimensionados para uma única execução)
+def dispose_engine(engine):
+    with _pool_lock:
+        for key in [key for key, cached in _engines.items() if cached is engine]:
+            del _engines[key]
+    engine.dispose()
+
+
+def dispose_all():
+    with _pool_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        for client in _mongo_clients.values():
+            client.close()
+        _engines.clear()
+        _mongo_clients.clear()
+
+
+# -------------------- Interface comum --------------------
+# Ciclo de vida de um benchmark:
+#   connect -> prepare_dataset -> prepare_batch/insert_batch | point_query -> teardown -> close
+# prepare_batch converte o DataFrame para o formato nativo do banco fora da medição.
+class Backend:
+    name = None
+
+    def connect(self, warm=1, log_fn=None):
+        raise NotImplementedError
+
+    def prepare_dataset(self, df):
+        raise NotImplementedError
+
+    def prepare_batch(self, df):
+        raise NotImplementedError
+
+    def insert_batch(self, batch):
+        raise NotImplementedError
+
+    def point_query(self, key, value):
+        raise NotImplementedError
+
+    # Operações individuais das cargas mistas (mixed_workload): atualiza um campo do primeiro
+    # registro com key = value, lê até `limit` registros a partir de value em ordem de key
+    # e insere um registro (dict coluna -> valor)
+    def update_by_key(self, key, value, field, new_value):
+        raise NotImplementedError
+
+    def scan(self, key, value, limit):
+        raise NotImplementedError
+
+    def insert_record(self, record):
+        raise NotImplementedError
+
+    # Escritas medidas pelas cargas de atualização/exclusão; devolvem o número de registros
+    # afetados: todos os registros com key = value, o primeiro deles, ou low <= key < high
+    def update_many(self, key, value, field, new_value):
+        raise NotImplementedError
+
+    def delete_by_key(self, key, value):
+        raise NotImplementedError
+
+    def delete_range(self, key, low, high):
+        raise NotImplementedError
+
+    # Consulta de agregação (aggregation.AggregationQuery); devolve uma lista de dicts com
+    # as chaves e medidas pelos aliases da consulta
+    def aggregate(self, query):
+        raise NotImplementedError
+
+    def teardown(self):
+        raise NotImplementedError
+
+    # Impressão digital da carga atual (fixtures.DatasetFixture), gravada no próprio banco.
+    # prepare_dataset, create_table, drop_indexes e teardown a apagam: o reaproveitamento só
+    # vale para dados que ninguém recarregou ou limpou depois
+    def load_fixture(self):
+        raise NotImplementedError
+
+    def save_fixture(self, fingerprint):
+        raise NotImplementedError
+
+    def count_rows(self):
+        raise NotImplementedError
+
+    # Bytes gravados pelo servidor até agora (contadores acumulados da instância, após forçar
+    # um checkpoint): {"data_bytes": ..., "log_bytes": ...}; None quando o banco não expõe
+    def write_volume(self):
+        return None
+
+    def close(self):
+        pass
+
+
+# -------------------- SQL (SQLAlchemy) --------------------
+class SqlBackend(Backend):
+    dialect = None
+
+    # Valida a conexão a cada checkout (um round-trip extra); benchmarks que fazem
+    # checkout por consulta desligam para medir só a espera no pool
+    pool_pre_ping = True
+
+    def __init__(self, table_name="olist_dataset", pool_size=5, max_overflow=10, strategy=None):
+        self.table_name = table_name
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        # Estratégia de escrita (sql_strategies); None = df.to_sql padrão
+        self.strategy = strategy or sql_strategies.strategy_from_env()
+        self.statement_cache = os.getenv("SQL_STATEMENT_CACHE", "off")
+        if self.statement_cache not in STATEMENT_CACHE_MODES:
+            raise ValueError(f"SQL_STATEMENT_CACHE inválido: {self.statement_cache} "
+                             f"(opções: {', '.join(STATEMENT_CACHE_MODES)})")
+        self._conn = None
+        self._statements = {}
+        self._cursors = {}
+        # Esquema tipado da tabela (sql_schema), quando criada por create_table
+        self.schema = None
+        self._indexes = []
+
+    def url(self):
+        raise NotImplementedError
+
+    def engine_options(self):
+        return {}
+
+    @property
+    def engine(self):
+        return get_engine(self.url(), self.pool_size, self.max_overflow, self.pool_pre_ping, **self.engine_options())
+
+    # Abre (e valida) `warm` conexões simultâneas para deixar o pool aquecido
+    def connect(self, warm=1, log_fn=None):
+        conns = [self.engine.connect() for _ in range(max(1, warm))]
+        try:
+            for conn in conns:
+                conn.execute(text("SELECT 1"))
+        finally:
+            for conn in conns:
+                conn.close()
+
+    # Conexão mantida pelo backend para as consultas pontuais
+    def connection(self):
+        if self._conn is None:
+            self._conn = self.engine.connect()
+        return self._conn
+
+    def select_one_sql(self, key):
+        return f"SELECT TOP 1 * FROM {self.table_name} WHERE [{key}] = :val"
+
+    def update_one_sql(self, key, field):
+        return f"UPDATE TOP (1) {self.table_name} SET [{field}] = :new WHERE [{key}] = :val"
+
+    def scan_sql(self, key, limit):
+        return f"SELECT TOP ({int(limit)}) * FROM {self.table_name} WHERE [{key}] >= :val ORDER BY [{key}]"
+
+    def update_many_sql(self, key, field):
+        return f"UPDATE {self.table_name} SET [{field}] = :new WHERE [{key}] = :val"
+
+    def delete_one_sql(self, key):
+        return f"DELETE TOP (1) FROM {self.table_name} WHERE [{key}] = :val"
+
+    def delete_range_sql(self, key):
+        return f"DELETE FROM {self.table_name} WHERE [{key}] >= :low AND [{key}] < :high"
+
+    # Mês (AAAA-MM) de uma coluna DATETIME2 ou de texto no formato ISO
+    def month_sql(self, column):
+        return f"CONVERT(CHAR(7), [{column}], 120)"
+
+    def aggregate_sql(self, query):
+        keys = [self.month_sql(column) if bucket == "month" else f"[{column}]" for _, column, bucket in query.keys]
+        select = [f"{expr} AS [{alias}]" for expr, (alias, _, _) in zip(keys, query.keys)]
+        select += [f"COUNT(*) AS [{alias}]" if func == "count" else f"SUM(CAST([{column}] AS FLOAT)) AS [{alias}]"
+                   for alias, func, column in query.measures]
+        top = f"TOP ({int(query.top)}) " if query.top else ""
+        sql = f"SELECT {top}{', '.join(select)} FROM {self.table_name} GROUP BY {', '.join(keys)}"
+        if query.order_by:
+            sql += f" ORDER BY [{query.order_by}] DESC"
+        return sql
+
+    def insert_sql(self, columns):
+        names = ", ".join(f"[{col}]" for col in columns)
+        params = ", ".join(f":p{i}" for i in range(len(columns)))
+        return f"INSERT INTO {self.table_name} ({names}) VALUES ({params})"
+
+    def _statement(self, cache_key, build):
+        stmt = self._statements.get(cache_key)
+        if stmt is None:
+            stmt = self._statements[cache_key] = text(build())
+        return stmt
+
+    # Escritas na conexão mantida pelo backend, com commit a cada operação
+    def _write(self, stmt, params):
+        conn = self.connection()
+        try:
+            result = conn.execute(stmt, params)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return result.rowcount
+
+    def prepare_dataset(self, df):
+        with self.engine.begin() as conn:
+            self._clear_fixture(conn)
+            df.head(0).to_sql(self.table_name, con=conn, if_exists="replace", index=False)
+        self.schema = None
+        self._indexes = []
+
+    def prepare_batch(self, df):
+        if self.schema is not None:
+            return sql_schema.coerce_frame(df, self.schema)
+        return df
+
+    # Recria a tabela com tipos inferidos do DataFrame (typed) ou NVARCHAR(MAX) em tudo
+    def create_table(self, df, typed=True):
+        schema = sql_schema.infer_schema(df, self.dialect) if typed else sql_schema.untyped_schema(df, self.dialect)
+        with self.engine.begin() as conn:
+            self._clear_fixture(conn)
+            conn.execute(text(f"DROP TABLE IF EXISTS {self.table_name};"))
+            conn.execute(text(sql_schema.create_table_sql(self.table_name, schema)))
+        self.schema = schema
+        self._indexes = []
+        return schema
+
+    # Índices nas colunas consultadas; devolve as colunas que não puderam ser indexadas
+    def create_indexes(self, columns, clustered=None):
+        statements, skipped = sql_schema.create_index_sql(
+            self.table_name, self.schema, columns, clustered, self.dialect
+        )
+        with self.engine.begin() as conn:
+            for name, stmt in statements:
+                conn.execute(text(stmt))
+                self._indexes.append(name)
+        return skipped
+
+    def drop_indexes(self):
+        with self.engine.begin() as conn:
+            self._clear_fixture(conn)
+            for name in self._indexes:
+                conn.execute(text(self.drop_index_sql(name)))
+        self._indexes = []
+
+    def drop_index_sql(self, name):
+        return f"DROP INDEX {name} ON {self.table_name};"
+
+    def insert_batch(self, batch):
+        if self.strategy is not None:
+            return sql_strategies.insert_with_strategy(self.engine, self.table_name, batch, self.strategy)
+        batch.to_sql(self.table_name, con=self.engine, if_exists="append", index=False)
+        return len(batch)
+
+    def point_query(self, key, value):
+        if self.statement_cache == "raw":
+            cursor = self._cursors.get(key)
+            if cursor is None:
+                cursor = self._cursors[key] = self.connection().connection.cursor()
+            cursor.execute(self.select_one_sql(key).replace(":val", "?"), (value,))
+            row = cursor.fetchone()
+            cursor.fetchall()
+            return row
+        if self.statement_cache == "cached":
+            stmt = self._statements.get(key)
+            if stmt is None:
+                stmt = self._statements[key] = text(self.select_one_sql(key))
+        else:
+            stmt = text(self.select_one_sql(key))
+        # first() lê a linha e fecha o resultado, liberando a conexão para o próximo comando
+        return self.connection().execute(stmt, {"val": value}).first()
+
+    def update_by_key(self, key, value, field, new_value):
+        stmt = self._statement(("update", key, field), lambda: self.update_one_sql(key, field))
+        return self._write(stmt, {"val": value, "new": new_value})
+
+    def scan(self, key, value, limit):
+        stmt = self._statement(("scan", key, limit), lambda: self.scan_sql(key, limit))
+        return self.connection().execute(stmt, {"val": value}).fetchall()
+
+    def update_many(self, key, value, field, new_value):
+        stmt = self._statement(("update_many", key, field), lambda: self.update_many_sql(key, field))
+        return self._write(stmt, {"val": value, "new": new_value})
+
+    def delete_by_key(self, key, value):
+        stmt = self._statement(("delete", key), lambda: self.delete_one_sql(key))
+        return self._write(stmt, {"val": value})
+
+    def delete_range(self, key, low, high):
+        stmt = self._statement(("delete_range", key), lambda: self.delete_range_sql(key))
+        return self._write(stmt, {"low": low, "high": high})
+
+    def aggregate(self, query):
+        stmt = self._statement(("aggregate", query), lambda: self.aggregate_sql(query))
+        return [dict(row._mapping) for row in self.connection().execute(stmt)]
+
+    def insert_record(self, record):
+        columns = tuple(record)
+        stmt = self._statement(("insert", columns), lambda: self.insert_sql(columns))
+        return self._write(stmt, {f"p{i}": record[col] for i, col in enumerate(columns)})
+
+    # TRUNCATE desaloca as páginas de uma vez, sem registrar a exclusão linha a linha
+    def truncate_sql(self):
+        return f"TRUNCATE TABLE {self.table_name}"
+
+    def teardown(self):
+        with self.engine.begin() as conn:
+            self._clear_fixture(conn)
+            conn.execute(text(self.truncate_sql()))
+
+    def fixture_table_sql(self):
+        return (f"IF OBJECT_ID('{FIXTURE_TABLE}', 'U') IS NULL CREATE TABLE {FIXTURE_TABLE} "
+                f"([name] NVARCHAR(256) PRIMARY KEY, [fingerprint] NVARCHAR(64), [loaded_at] DATETIME2)")
+
+    def _clear_fixture(self, conn):
+        conn.execute(text(self.fixture_table_sql()))
+        conn.execute(text(f"DELETE FROM {FIXTURE_TABLE} WHERE [name] = :name"), {"name": self.table_name})
+
+    def load_fixture(self):
+        with self.engine.begin() as conn:
+            conn.execute(text(self.fixture_table_sql()))
+            return conn.execute(text(f"SELECT [fingerprint] FROM {FIXTURE_TABLE} WHERE [name] = :name"),
+                                {"name": self.table_name}).scalar()
+
+    def save_fixture(self, fingerprint):
+        with self.engine.begin() as conn:
+            self._clear_fixture(conn)
+            conn.execute(text(f"INSERT INTO {FIXTURE_TABLE} ([name], [fingerprint], [loaded_at]) "
+                              f"VALUES (:name, :fingerprint, CURRENT_TIMESTAMP)"),
+                         {"name": self.table_name, "fingerprint": fingerprint})
+
+    def count_rows(self):
+        with self.engine.connect() as conn:
+            return conn.execute(text(f"SELECT COUNT(*) FROM {self.table_name}")).scalar()
+
+    def close(self):
+        for cursor in self._cursors.values():
+            cursor.close()
+        self._cursors.clear()
+        self._statements.clear()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class SqlServerBackend(SqlBackend):
+    name = "SQL Server"
+    dialect = "mssql"
+
+    def __init__(self, table_name="olist_dataset", pool_size=5, max_overflow=10, strategy=None):
+        load_env()
+        super().__init__(table_name, pool_size, max_overflow, strategy)
+        self.server = os.getenv("DB_SERVER")
+        self.database = os.getenv("DB_NAME")
+        self.username = os.getenv("DB_USERNAME")
+        self.password = os.getenv("DB_PASSWORD")
+        self.port = int(os.getenv("DB_PORT", "1433"))
+
+    def url(self, database=None):
+        return URL.create(
+            drivername="mssql+pyodbc",
+            username=self.username,
+            password=self.password,
+            host=self.server,
+            port=self.port,
+            database=database or self.database,
+            query={"driver": "ODBC Driver 18 for SQL Server", "TrustServerCertificate": "yes"}
+        )
+
+    def engine_options(self):
+        return {"fast_executemany": True}
+
+    def connect(self, warm=1, log_fn=None):
+        self.ensure_database(log_fn)
+        super().connect(warm, log_fn)
+
+    # Escritas nos arquivos de dados (ROWS) e de log do banco; o CHECKPOINT grava as páginas
+    # sujas antes da leitura, para que as escritas de dados apareçam no contador
+    def write_volume(self):
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("CHECKPOINT"))
+            rows = conn.execute(text(
+                "SELECT f.type_desc, SUM(v.num_of_bytes_written) FROM sys.dm_io_virtual_file_stats(DB_ID(), NULL) v "
+                "JOIN sys.database_files f ON f.file_id = v.file_id GROUP BY f.type_desc"
+            )).fetchall()
+        written = {type_desc: int(total) for type_desc, total in rows}
+        return {"data_bytes": written.get("ROWS", 0), "log_bytes": written.get("LOG", 0)}
+
+    # Cria o banco, se necessário, uma única vez por processo
+    def ensure_database(self, log_fn=None):
+        if self.database in _ensured_databases:
+            return
+        engine = get_engine(self.url("master"), pool_size=1, max_overflow=0)
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            exists = conn.execute(
+                text("SELECT COUNT(*) FROM sys.databases WHERE name = :db_name"),
+                {"db_name": self.database}
+            ).scalar()
+            if not exists:
+                if log_fn:
+                    log_fn(f"Criando banco de dados '{self.database}'...")
+                conn.execute(text(f"CREATE DATABASE [{self.database}]"))
+        _ensured_databases.add(self.database)
+
+
+# Substituto local do SQL Server, útil para rodar os benchmarks sem servidor
+class SqliteBackend(SqlBackend):
+    name = "SQLite"
+    dialect = "sqlite"
+
+    def __init__(self, table_name="olist_dataset", pool_size=5, max_overflow=10, strategy=None, path=None):
+        load_env()
+        super().__init__(table_name, pool_size, max_overflow, strategy)
+        self.path = path or os.getenv("SQLITE_PATH") or os.path.join(get_base_path(), "data", "benchmark.sqlite")
+
+    def url(self):
+        return URL.create("sqlite", database=self.path)
+
+    def connect(self, warm=1, log_fn=None):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        super().connect(warm, log_fn)
+
+    def select_one_sql(self, key):
+        return f"SELECT * FROM {self.table_name} WHERE [{key}] = :val LIMIT 1"
+
+    # Sem UPDATE ... LIMIT no SQLite padrão: o primeiro registro é escolhido pelo rowid
+    def update_one_sql(self, key, field):
+        return (f"UPDATE {self.table_name} SET [{field}] = :new WHERE rowid = "
+                f"(SELECT rowid FROM {self.table_name} WHERE [{key}] = :val LIMIT 1)")
+
+    def scan_sql(self, key, limit):
+        return f"SELECT * FROM {self.table_name} WHERE [{key}] >= :val ORDER BY [{key}] LIMIT {int(limit)}"
+
+    def delete_one_sql(self, key):
+        return (f"DELETE FROM {self.table_name} WHERE rowid = "
+                f"(SELECT rowid FROM {self.table_name} WHERE [{key}] = :val LIMIT 1)")
+
+    def month_sql(self, column):
+        return f"substr([{column}], 1, 7)"
+
+    def aggregate_sql(self, query):
+        sql = super().aggregate_sql(replace(query, top=None))
+        return f"{sql} LIMIT {int(query.top)}" if query.top else sql
+
+    def drop_index_sql(self, name):
+        return f"DROP INDEX {name};"
+
+    # Sem TRUNCATE no SQLite: DELETE sem WHERE usa a otimização de truncamento
+    def truncate_sql(self):
+        return f"DELETE FROM {self.table_name}"
+
+    def fixture_table_sql(self):
+        return (f"CREATE TABLE IF NOT EXISTS {FIXTURE_TABLE} "
+                f"([name] TEXT PRIMARY KEY, [fingerprint] TEXT, [loaded_at] TEXT)")
+
+
+# -------------------- MongoDB --------------------
+class MongoBackend(Backend):
+    name = "MongoDB"
+
+    def __init__(self, collection_name=None, pool_size=100, strategy=None):
+        load_env()
+        self.host = os.getenv("MONGO_HOST")
+        self.port = os.getenv("MONGO_PORT")
+        self.database = os.getenv("MONGO_DB")
+        self.collection_name = collection_name or os.getenv("MONGO_COLLECTION")
+        self.user = os.getenv("MONGO_USER")
+        self.password = os.getenv("MONGO_PASSWORD")
+        self.pool_size = pool_size
+        # Estratégia de escrita (mongo_strategies); None = um único insert_many
+        self.strategy = strategy or mongo_strategies.strategy_from_env()
+        self.last_batch_latencies = []
+
+    def uri(self):
+        if not self.user:
+            return f"mongodb://{self.host}:{self.port}/{self.database}"
+        encoded_pass = urllib.parse.quote_plus(self.password or "")
+        return f"mongodb://{self.user}:{encoded_pass}@{self.host}:{self.port}/{self.database}?authSource=admin"
+
+    @property
+    def client(self):
+        return get_mongo_client(self.uri(), self.pool_size, serverSelectionTimeoutMS=2000)
+
+    @property
+    def collection(self):
+        return self.client[self.database][self.collection_name]
+
+    def connect(self, warm=1, log_fn=None):
+        self.client.admin.command("ping")
+
+    # drop() descarta a coleção inteira (e seus índices) em vez de excluir documento a documento
+    def prepare_dataset(self, df):
+        self.fixtures.delete_one({"_id": self.collection_name})
+        self.collection.drop()
+
+    def prepare_batch(self, df):
+        return df.to_dict(orient="records")
+
+    def insert_batch(self, batch):
+        if self.strategy is None:
+            self.collection.insert_many(batch)
+        else:
+            self.last_batch_latencies = mongo_strategies.insert_with_strategy(self.collection, batch, self.strategy)
+        return len(batch)
+
+    def point_query(self, key, value):
+        return self.collection.find_one({key: value})
+
+    def update_by_key(self, key, value, field, new_value):
+        return self.collection.update_one({key: value}, {"$set": {field: new_value}}).matched_count
+
+    def scan(self, key, value, limit):
+        return list(self.collection.find({key: {"$gte": value}}).sort(key, 1).limit(limit))
+
+    def update_many(self, key, value, field, new_value):
+        return self.collection.update_many({key: value}, {"$set": {field: new_value}}).matched_count
+
+    def delete_by_key(self, key, value):
+        return self.collection.delete_one({key: value}).deleted_count
+
+    def delete_range(self, key, low, high):
+        return self.collection.delete_many({key: {"$gte": low, "$lt": high}}).deleted_count
+
+    # $group pelas chaves (o mês sai dos 7 primeiros caracteres da data, gravada como texto
+    # pelo CSV), ordenação e $limit do top-N e $project para o mesmo formato das linhas SQL
+    def aggregate_pipeline(self, query):
+        group = {"_id": {alias: {"$substrCP": [f"${column}", 0, 7]} if bucket == "month" else f"${column}"
+                         for alias, column, bucket in query.keys}}
+        # NaN do pandas vira double NaN no BSON e contaminaria a soma; como o SUM do SQL com
+        # NULL, esses valores ficam fora (no MongoDB NaN é igual a NaN nas comparações)
+        for alias, func, column in query.measures:
+            value = {"$cond": [{"$eq": [f"${column}", float("nan")]}, 0, f"${column}"]}
+            group[alias] = {"$sum": 1 if func == "count" else value}
+        pipeline = [{"$group": group}]
+        if query.order_by:
+            pipeline.append({"$sort": {query.order_by: -1}})
+        if query.top:
+            pipeline.append({"$limit": int(query.top)})
+        project = {"_id": 0}
+        project.update({alias: f"$_id.{alias}" for alias, _, _ in query.keys})
+        project.update({alias: 1 for alias, _, _ in query.measures})
+        pipeline.append({"$project": project})
+        return pipeline
+
+    def aggregate(self, query):
+        return list(self.collection.aggregate(self.aggregate_pipeline(query), allowDiskUse=True))
+
+    # Cópia do registro: o insert_one grava o _id no próprio dicionário
+    def insert_record(self, record):
+        self.collection.insert_one(dict(record))
+        return 1
+
+    def teardown(self):
+        self.fixtures.delete_one({"_id": self.collection_name})
+        self.collection.drop()
+
+    @property
+    def fixtures(self):
+        return self.client[self.database][FIXTURE_TABLE]
+
+    def load_fixture(self):
+        doc = self.fixtures.find_one({"_id": self.collection_name})
+        return doc["fingerprint"] if doc else None
+
+    def save_fixture(self, fingerprint):
+        self.fixtures.replace_one({"_id": self.collection_name},
+                                  {"fingerprint": fingerprint, "loaded_at": datetime.now(timezone.utc)}, upsert=True)
+
+    # Bytes gravados pelo WiredTiger nos arquivos de dados (block manager) e no journal; o
+    # fsync força um checkpoint antes da leitura
+    def write_volume(self):
+        self.client.admin.command("fsync")
+        wired_tiger = self.client.admin.command("serverStatus")["wiredTiger"]
+        return {"data_bytes": int(wired_tiger["block-manager"]["bytes written"]),
+                "log_bytes": int(wired_tiger["log"]["log bytes written"])}
+
+    # Contagem pelos metadados da coleção, sem varrer os documentos
+    def count_rows(self):
+        return self.collection.estimated_document_count()
+
+
+BACKENDS = {
+    "sqlserver": SqlServerBackend,
+    "mongo": MongoBackend,
+    "sqlite": SqliteBackend,
+}
+
+
+def create_backend(kind, **kwargs):
+    if kind not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {kind} (opções: {', '.join(BACKENDS)})")
+    return BACKENDS[kind](**kwargs)
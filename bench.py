@@ -0,0 +1,454 @@
+import argparse
+import csv
+import json
+import re
+import sys
+import threading
+import time
+
+import aggregation
+import mongo_strategies
+import parallel_insert
+import sql_concurrent
+import sql_strategies
+from backends import BACKENDS, STATEMENT_CACHE_MODES, create_backend
+from config import load_env
+from dataset import load_dataset
+from latency import LatencyHistogram
+from mixed_workload import PRESETS, generate_operations, resolve_mix, run_mixed
+from mongo_indexes import compound_from_env, run_index_benchmark
+from open_loop import run_open_loop
+from parallel_insert import run_parallel_insert
+from repetition import run_repeated
+from results_store import backend_params, record_run
+from sql_schema import settings_from_env as sql_settings_from_env
+from workload import DEFAULT_SEED, load_or_create
+from write_workload import WRITE_WORKLOADS, run_write
+
+_DURATION = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*$")
+_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+# "60s", "2m", "500ms" ou "60" (segundos) -> segundos
+def parse_duration(value):
+    match = _DURATION.match(str(value))
+    if not match:
+        raise argparse.ArgumentTypeError(f"Duração inválida: {value} (ex.: 60s, 2m, 500ms)")
+    return float(match.group(1)) * _UNITS[match.group(2) or "s"]
+
+
+def _log(msg):
+    print(msg, file=sys.stderr, flush=True)
+
+
+# Carrega o dataset no banco para as cargas de consulta, com um backend por worker
+def _load_backends(args, df):
+    backends = [create_backend(args.backend, pool_size=args.workers) for _ in range(args.workers)]
+    loader = backends[0]
+    loader.connect(warm=args.workers, log_fn=args.log_fn)
+    args.log_fn("Inserindo dados para benchmark...")
+    loader.prepare_dataset(df)
+    loader.insert_batch(loader.prepare_batch(df))
+    return backends
+
+
+def _close_all(backends):
+    try:
+        backends[0].teardown()
+    finally:
+        for backend in backends:
+            backend.close()
+
+
+# Consultas em malha fechada: cada worker dispara a próxima consulta assim que a anterior termina
+def _closed_loop(backends, operations, duration):
+    workers = len(backends)
+    histograms = [LatencyHistogram() for _ in range(workers)]
+    errors = [0] * workers
+    barrier = threading.Barrier(workers + 1)
+    deadline = [0]
+
+    def worker(w):
+        backend, hist = backends[w], histograms[w]
+        barrier.wait()
+        i = w
+        while time.perf_counter() < deadline[0]:
+            key, value = operations[i % len(operations)]
+            t0 = time.perf_counter_ns()
+            try:
+                backend.point_query(key, value)
+                hist.record(time.perf_counter_ns() - t0)
+            except Exception:
+                errors[w] += 1
+            i += workers
+
+    threads = [threading.Thread(target=worker, args=(w,), daemon=True) for w in range(workers)]
+    for t in threads:
+        t.start()
+    start = time.perf_counter()
+    deadline[0] = start + duration
+    barrier.wait()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latency = LatencyHistogram()
+    for hist in histograms:
+        latency.merge(hist)
+    return {"operations": latency.count, "errors": sum(errors), "elapsed": elapsed,
+            "throughput": latency.count / elapsed if elapsed > 0 else 0, "latency": latency}
+
+
+# -------------------- Cargas de trabalho --------------------
+# Cada carga recebe os argumentos da linha de comando e o dataset e devolve
+# (resultado, backend usado para os parâmetros, histogramas de latência)
+
+def run_insert(args, df):
+    results = []
+
+    def insert_once():
+        result = run_parallel_insert(args.backend, df, args.workers)
+        results.append(result)
+        return result["throughput"]
+
+    summary, _ = run_repeated(insert_once, args.repetitions, args.warmup, log_fn=args.log_fn)
+    measured = results[args.warmup:]
+    result = {
+        "rows": measured[-1]["rows"],
+        "elapsed": sum(r["elapsed"] for r in measured) / len(measured),
+        "throughput": summary["mean"],
+        "throughput_median": summary["median"],
+        "throughput_std": summary["std"],
+        "throughput_ci_low": summary["ci_low"],
+        "throughput_ci_high": summary["ci_high"],
+        "outliers": summary["outliers"],
+    }
+    return result, create_backend(args.backend), {}
+
+
+def run_point_query(args, df):
+    backends = _load_backends(args, df)
+    try:
+        operations = load_or_create(df, seed=args.seed, log_fn=args.log_fn).operations(df)
+        args.log_fn(f"Consultas em malha fechada por {args.duration:.0f} s com {args.workers} workers...")
+        result = _closed_loop(backends, operations, args.duration)
+    finally:
+        _close_all(backends)
+    latency = result.pop("latency")
+    return result, backends[0], {"latency": latency}
+
+
+def run_open_loop_workload(args, df):
+    if not args.rate:
+        raise SystemExit("A carga open-loop exige --rate (operações por segundo)")
+    backends = _load_backends(args, df)
+    try:
+        operations = load_or_create(df, seed=args.seed, log_fn=args.log_fn).operations(df)
+        result = run_open_loop(backends, operations, args.rate, args.duration, log_fn=args.log_fn)
+    finally:
+        _close_all(backends)
+    histograms = {"latency": result.pop("latency"), "service": result.pop("service")}
+    return result, backends[0], histograms
+
+
+def run_mixed_workload(args, df):
+    mix = resolve_mix(args.preset, args.mix)
+    backends = _load_backends(args, df)
+    try:
+        args.log_fn("Gerando operações: " + ", ".join(f"{name} {ratio:.0%}" for name, ratio in mix.items()))
+        operations = generate_operations(df, mix, args.operations, args.seed if args.seed is not None else DEFAULT_SEED)
+        result = run_mixed(backends, operations, args.duration, log_fn=args.log_fn)
+    finally:
+        _close_all(backends)
+    result["mix"] = mix
+    histograms = {"total": result.pop("latency"), **result.pop("by_type")}
+    return result, backends[0], histograms
+
+
+# Atualizações/exclusões de write_workload, com o nome da carga definindo a operação
+def run_write_workload(args, df):
+    backends = _load_backends(args, df)
+    try:
+        result = run_write(backends, df, args.workload, args.operations, args.duration,
+                           args.seed if args.seed is not None else DEFAULT_SEED, log_fn=args.log_fn)
+    finally:
+        _close_all(backends)
+    histograms = {"total": result.pop("latency"), **result.pop("by_type")}
+    return result, backends[0], histograms
+
+
+# Agregações analíticas (GROUP BY x pipeline), conferidas com a referência do pandas
+def run_aggregation_workload(args, df):
+    queries = aggregation.resolve_shapes(df, log_fn=args.log_fn)
+    expected = {query.name: aggregation.reference(df, query) for query in queries}
+    backends = _load_backends(args, df)
+    try:
+        results = aggregation.run_aggregations(backends[0], queries, expected, args.repetitions, args.warmup,
+                                               log_fn=args.log_fn)
+    finally:
+        _close_all(backends)
+    histograms = {r["shape"]: r["latency"] for r in results}
+    operations = sum(h.count for h in histograms.values())
+    elapsed = sum(h.total for h in histograms.values()) / 1e9
+    result = {"operations": operations, "elapsed": elapsed,
+              "throughput": operations / elapsed if elapsed > 0 else 0,
+              "mismatches": {r["shape"]: r["mismatch"] for r in results if r["mismatch"]}}
+    return result, backends[0], histograms
+
+
+# -------------------- Varreduras e comparações --------------------
+# Devolvem "series" (um ponto por configuração medida, gravado no extra do histórico),
+# o throughput do melhor ponto e, em "settings", os parâmetros da varredura
+
+def _series_result(series, settings, rows=None):
+    best = max(series, key=lambda point: point["throughput"])
+    result = {"throughput": best["throughput"], "elapsed": sum(point["elapsed"] for point in series),
+              "best": best, "series": series, "settings": settings}
+    if rows is not None:
+        result["rows"] = rows
+    return result
+
+
+def _require(args, kinds, workload):
+    if args.backend not in kinds:
+        raise SystemExit(f"A carga {workload} só roda em: {', '.join(kinds)}")
+
+
+# Curva de escalabilidade da inserção paralela com N = 1, 2, 4, ... até --max-workers
+def run_insert_scaling(args, df):
+    curve = parallel_insert.scaling_curve(args.backend, df, args.max_workers, log_fn=args.log_fn)
+    result = _series_result(curve.to_dict(orient="records"), {"max_workers": args.max_workers}, len(df))
+    return result, create_backend(args.backend), {}
+
+
+# Varredura das estratégias de inserção (sql_strategies / mongo_strategies)
+def run_insert_strategies(args, df):
+    backend = create_backend(args.backend)
+    backend.connect(log_fn=args.log_fn)
+    try:
+        if args.backend == "mongo":
+            backend.prepare_dataset(df)
+            table = mongo_strategies.sweep(backend, df, log_fn=args.log_fn)
+        else:
+            table = sql_strategies.sweep(backend, df, log_fn=args.log_fn)
+    finally:
+        try:
+            backend.teardown()
+        finally:
+            backend.close()
+    return _series_result(table.to_dict(orient="records"), {}, len(df)), backend, {}
+
+
+# Consultas find_one assíncronas com K = 1, 2, 4, ... até --max-concurrency em andamento
+def run_async_sweep(args, df):
+    import async_mongo  # exige a API assíncrona do PyMongo (ou o Motor)
+
+    _require(args, ("mongo",), "async-sweep")
+    backends = _load_backends(args, df)
+    try:
+        operations = load_or_create(df, seed=args.seed, log_fn=args.log_fn).operations(df)
+        points = async_mongo.sweep(backends[0], operations, args.max_concurrency, args.duration, log_fn=args.log_fn)
+    finally:
+        _close_all(backends)
+    histograms = {f"k{point['concurrency']}": point.pop("latency") for point in points}
+    return _series_result(points, {"max_concurrency": args.max_concurrency}), backends[0], histograms
+
+
+# Consultas SQL concorrentes com pool de N conexões, N = 1, 2, 4, ... até --max-workers
+def run_query_scaling(args, df):
+    _require(args, ("sqlserver", "sqlite"), "query-scaling")
+    backends = _load_backends(args, df)
+    try:
+        operations = load_or_create(df, seed=args.seed, log_fn=args.log_fn).operations(df)
+        points = sql_concurrent.scaling_curve(args.backend, operations, args.max_workers, args.queries,
+                                              backends[0].table_name, args.log_fn)
+    finally:
+        _close_all(backends)
+    histograms = {}
+    for point in points:
+        histograms[f"n{point['workers']}_query"] = point.pop("query")
+        histograms[f"n{point['workers']}_pool_wait"] = point.pop("pool_wait")
+    settings = {"max_workers": args.max_workers, "queries": args.queries}
+    return _series_result(points, settings), backends[0], histograms
+
+
+def _closed_loop_point(args, backends, operations, label, **point):
+    args.log_fn(f"[{label}] Consultas em malha fechada por {args.duration:.0f} s com {len(backends)} workers...")
+    result = _closed_loop(backends, operations, args.duration)
+    latency = result.pop("latency")
+    args.log_fn(f"[{label}] {result['throughput']:.2f} consultas/segundo | {latency.format()}")
+    return {**point, **result}, latency
+
+
+# Mesmas consultas pontuais em cada modo de SQL_STATEMENT_CACHE (off/cached/raw)
+def run_compare_cache(args, df):
+    _require(args, ("sqlserver", "sqlite"), "compare-cache")
+    backends = _load_backends(args, df)
+    series, histograms = [], {}
+    try:
+        operations = load_or_create(df, seed=args.seed, log_fn=args.log_fn).operations(df)
+        for mode in STATEMENT_CACHE_MODES:
+            for backend in backends:
+                backend.close()
+                backend.statement_cache = mode
+            point, histograms[mode] = _closed_loop_point(args, backends, operations, mode, statement_cache=mode)
+            series.append(point)
+    finally:
+        _close_all(backends)
+    for point in series:
+        point["speedup"] = point["throughput"] / series[0]["throughput"] if series[0]["throughput"] > 0 else 0
+    return _series_result(series, {"modes": list(STATEMENT_CACHE_MODES)}), backends[0], histograms
+
+
+# SQL: tabela tipada, consultas sem e com índices nas colunas consultadas (SQL_INDEXES/
+# SQL_CLUSTERED_COLUMN definem o tipo). MongoDB: mesmas fases com o plano de cada campo
+# (explain) e a latência separada por IXSCAN/COLLSCAN, --queries consultas por fase
+def run_compare_indexes(args, df):
+    if args.backend == "mongo":
+        return _compare_mongo_indexes(args, df)
+
+    backends = [create_backend(args.backend, pool_size=args.workers) for _ in range(args.workers)]
+    loader = backends[0]
+    series, histograms = [], {}
+    try:
+        loader.connect(warm=args.workers, log_fn=args.log_fn)
+        typed, _, clustered = sql_settings_from_env()
+        operations = load_or_create(df, seed=args.seed, log_fn=args.log_fn).operations(df)
+        columns = sorted({key for key, _ in operations})
+        args.log_fn(f"Criando tabela ({'esquema tipado' if typed else 'NVARCHAR(MAX)'}) e inserindo dados...")
+        loader.create_table(df, typed=typed)
+        loader.insert_batch(loader.prepare_batch(df))
+        for phase in ("sem_indices", "com_indices"):
+            if phase == "com_indices":
+                skipped = loader.create_indexes(columns, clustered)
+                if skipped:
+                    args.log_fn(f"Colunas não indexáveis: {', '.join(skipped)}")
+            point, histograms[phase] = _closed_loop_point(args, backends, operations, phase, phase=phase)
+            series.append(point)
+    finally:
+        _close_all(backends)
+    settings = {"typed_schema": typed, "clustered": clustered}
+    return _series_result(series, settings), loader, histograms
+
+
+def _compare_mongo_indexes(args, df):
+    backends = _load_backends(args, df)
+    try:
+        operations = load_or_create(df, seed=args.seed, log_fn=args.log_fn).operations(df)
+        phases = run_index_benchmark(backends[0], operations, compound_from_env(), args.queries, log_fn=args.log_fn)
+    finally:
+        _close_all(backends)
+    series, histograms = [], {}
+    for phase, result in phases.items():
+        tag = phase.replace(" ", "_").replace("í", "i")
+        for plan, split in result["split"].items():
+            histograms[f"{tag}_{plan}"] = split.pop("latency")
+            series.append({"phase": tag, "plan": plan, **split})
+    return _series_result(series, {"queries": args.queries}), backends[0], histograms
+
+
+WORKLOADS = {
+    "insert": run_insert,                   # inserção do dataset completo (--workers em paralelo, --repetitions)
+    "point-query": run_point_query,         # consultas pontuais em malha fechada por --duration
+    "open-loop": run_open_loop_workload,    # consultas pontuais com taxa fixa (--rate) por --duration
+    "mixed": run_mixed_workload,            # leitura/escrita no estilo YCSB (--preset ou --mix) por --duration
+    **{name: run_write_workload for name in WRITE_WORKLOADS},  # atualizações/exclusões (--operations)
+    "aggregation": run_aggregation_workload,  # GROUP BY/pipeline por formato de consulta (--repetitions)
+    "insert-scaling": run_insert_scaling,   # inserção paralela com 1, 2, 4, ... até --max-workers
+    "insert-strategies": run_insert_strategies,  # varredura de método/lote/transação da inserção
+    "async-sweep": run_async_sweep,         # MongoDB assíncrono com K em andamento até --max-concurrency
+    "query-scaling": run_query_scaling,     # SQL concorrente com pool de 1, 2, 4, ... até --max-workers
+    "compare-cache": run_compare_cache,     # consultas SQL em cada modo de cache de statements
+    "compare-indexes": run_compare_indexes,  # consultas sem e com índices (MongoDB: por plano IXSCAN/COLLSCAN)
+}
+
+# Cargas sem --duration: medem o dataset inteiro, repetições ou um número fixo de consultas
+_UNTIMED = ("insert", "aggregation", "insert-scaling", "insert-strategies", "query-scaling")
+
+
+# Linha de resultado plana (para JSON/CSV): parâmetros, métricas e resumo de cada histograma
+def _result_row(args, result, histograms, settings=None):
+    row = {"backend": args.backend, "workload": args.workload, "workers": args.workers}
+    if args.workload not in _UNTIMED and not (args.workload == "compare-indexes" and args.backend == "mongo"):
+        row["duration"] = args.duration
+    if args.rate:
+        row["rate"] = args.rate
+    row.update(settings or {})
+    row.update(result)
+    for name, hist in histograms.items():
+        for key, value in hist.summary().items():
+            row[f"{name}_{key}"] = value
+    return row
+
+
+def write_result(row, fmt, out):
+    if fmt == "json":
+        json.dump(row, out, ensure_ascii=False, indent=2, default=str)
+        out.write("\n")
+    else:
+        writer = csv.DictWriter(out, fieldnames=list(row))
+        writer.writeheader()
+        writer.writerow({k: json.dumps(v) if isinstance(v, (list, dict)) else v for k, v in row.items()})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench", description="Benchmarks SQL Server/MongoDB/SQLite sem interface gráfica")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="executa uma carga de trabalho")
+    run.add_argument("--backend", choices=sorted(BACKENDS), required=True)
+    run.add_argument("--workload", choices=sorted(WORKLOADS), required=True)
+    run.add_argument("--duration", type=parse_duration, default=60.0, help="ex.: 60s, 2m (padrão: 60s)")
+    run.add_argument("--workers", type=int, default=1)
+    run.add_argument("--rate", type=float, default=None, help="operações por segundo (open-loop)")
+    run.add_argument("--repetitions", type=int, default=1, help="repetições medidas (insert, aggregation)")
+    run.add_argument("--warmup", type=int, default=0, help="repetições de aquecimento descartadas (insert, aggregation)")
+    run.add_argument("--seed", type=int, default=None, help="semente do workload de consultas")
+    run.add_argument("--preset", choices=sorted(PRESETS), default="P", help="proporções YCSB (mixed)")
+    run.add_argument("--mix", default=None, help="proporções customizadas, ex.: read=0.8,update=0.2 (mixed)")
+    run.add_argument("--operations", type=int, default=100_000, help="operações pré-geradas (mixed, update/delete)")
+    run.add_argument("--max-workers", type=int, default=8, help="maior N das varreduras (insert-scaling, query-scaling)")
+    run.add_argument("--max-concurrency", type=int, default=64, help="maior K em andamento (async-sweep)")
+    run.add_argument("--queries", type=int, default=1000,
+                     help="consultas por ponto (query-scaling; compare-indexes no MongoDB)")
+    run.add_argument("--format", choices=["json", "csv"], default="json")
+    run.add_argument("--output", default=None, help="arquivo de saída (padrão: stdout)")
+    run.add_argument("--no-record", action="store_true", help="não grava a execução no histórico")
+    run.add_argument("--quiet", action="store_true", help="sem mensagens de progresso no stderr")
+
+    sub.add_parser("list", help="lista as cargas de trabalho disponíveis")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for name in WORKLOADS:
+            print(name)
+        return 0
+
+    load_env()
+    args.log_fn = (lambda msg: None) if args.quiet else _log
+    df = load_dataset(log_fn=args.log_fn)
+    result, backend, histograms = WORKLOADS[args.workload](args, df)
+    settings = result.pop("settings", {})
+    row = _result_row(args, result, histograms, settings)
+
+    if not args.no_record:
+        params = backend_params(backend, workers=args.workers, duration=row.get("duration"), rate=args.rate,
+                                **settings)
+        # Carga mista: o preset e as proporções distinguem as execuções no histórico
+        if "mix" in result:
+            params.update(preset=args.preset if not args.mix else "custom", mix=result["mix"])
+        row["run_id"] = record_run(backend.name, args.workload, result["throughput"], result.get("elapsed"),
+                                   result.get("rows", result.get("operations")), dataset_rows=len(df),
+                                   params=params, latency=histograms or None,
+                                   extra={"series": result["series"]} if "series" in result else None)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            write_result(row, args.format, f)
+    else:
+        write_result(row, args.format, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
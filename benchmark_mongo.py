@@ -1,62 +1,55 @@
-import os
-import random
 import time
-from dotenv import load_dotenv
-from pymongo import MongoClient, errors
-import urllib.parse
-import pandas as pd
-
-# Carrega variáveis de ambiente
-dotenv_path = os.path.join(os.path.dirname(__file__), '.env')
-load_dotenv(dotenv_path)
-
-# Lê variáveis
-mongo_host = os.getenv("MONGO_HOST")
-mongo_port = os.getenv("MONGO_PORT")
-mongo_db = os.getenv("MONGO_DB")
-mongo_collection = os.getenv("MONGO_COLLECTION")
-mongo_user = os.getenv("MONGO_USER")
-mongo_pass = os.getenv("MONGO_PASSWORD")
-encoded_pass = urllib.parse.quote_plus(mongo_pass)
-
-# Cria URI de conexão
-mongo_uri = f"mongodb://{mongo_user}:{encoded_pass}@{mongo_host}:{mongo_port}/{mongo_db}?authSource=admin"
-
-# Conecta ao MongoDB
-client = MongoClient(mongo_uri, serverSelectionTimeoutMS=2000)  # timeout de 2s
-db = client[mongo_db]
-collection = db[mongo_collection]
+from pymongo import errors
+
+from backends import create_backend
+from dataset import load_dataset
+from fixtures import DatasetFixture
+from latency import LatencyHistogram, save_histogram
+from results_store import backend_params, record_run
+from workload import load_or_create
+
+# Conecta ao MongoDB (client reaproveitado do pool, timeout de 2s)
+backend = create_backend("mongo")
 
 # Lê CSV de dados
-csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "olist_dataset.csv")
-df = pd.read_csv(csv_path)
-records = df.to_dict(orient="records")
+df = load_dataset()
+
+# Consultas pré-geradas (semente fixa), reproduzíveis entre execuções e bancos
+operations = load_or_create(df, log_fn=print).operations(df)
+
+
+def load_collection():
+    # Descarta a coleção (drop) e insere o dataset
+    print("Inserindo dados para benchmark...")
+    backend.prepare_dataset(df)
+    backend.insert_batch(backend.prepare_batch(df))
+
 
-# Garante que o banco esteja populado
-print("Inserindo dados para benchmark...")
-collection.insert_many(records)
+# Reaproveita a coleção da execução anterior se o dataset não mudou
+fixture = DatasetFixture(backend, df, load_collection)
+fixture.ensure()
 
 print("Iniciando benchmark de consultas aleatórias...")
 
 query_count = 0
 failures = 0
-start_time = time.time()
+histogram = LatencyHistogram()
+start_time = time.perf_counter()
 
 try:
     while True:
         try:
-            # Escolhe um campo aleatório (ajuste conforme os campos reais)
-            sample = random.choice(records)
-            key, value = random.choice(list(sample.items()))
+            # Próxima consulta do workload pré-gerado
+            key, value = operations[query_count % len(operations)]
 
             # Faz uma consulta
-            result = collection.find_one({key: value})
+            histogram.measure(backend.point_query, key, value)
 
             query_count += 1
 
             # Opcional: imprimir de tempos em tempos
             if query_count % 100 == 0:
-                elapsed = time.time() - start_time
+                elapsed = time.perf_counter() - start_time
                 print(f"{query_count} consultas realizadas em {elapsed:.2f} segundos")
 
         except (errors.AutoReconnect, errors.ServerSelectionTimeoutError, errors.ExecutionTimeout) as e:
@@ -70,12 +63,16 @@ try:
 except KeyboardInterrupt:
     print("Benchmark interrompido manualmente.")
 
-end_time = time.time()
+end_time = time.perf_counter()
 total_time = end_time - start_time
 
 print(f"\nBenchmark finalizado. Total de consultas realizadas: {query_count}")
 print(f"Tempo total: {total_time:.2f} segundos")
 print(f"Throughput médio: {query_count / total_time:.2f} consultas/segundo")
+print(f"Latência: {histogram.format()}")
+print(f"Histograma exportado em: {save_histogram(histogram, 'mongodb_consultas')}")
+record_run(backend.name, "consultas_pontuais", query_count / total_time if total_time > 0 else 0, total_time,
+           query_count, dataset_rows=len(df), params=backend_params(backend, fixture_reused=fixture.reused), latency=histogram)
 
-# Limpa os dados
-collection.delete_many({})
+# Mantém a coleção para a próxima execução (ou descarta com drop(), se FIXTURE_REUSE=false)
+fixture.release()
@@ -1,52 +1,70 @@
 # benchmark_mongo.py
-import os
-import random
 import time
-from dotenv import load_dotenv
-from pymongo import MongoClient, errors
-import urllib.parse
-import pandas as pd
-
-def run_benchmark(log_fn=print):
-    dotenv_path = os.path.join(os.path.dirname(__file__), '.env')
-    load_dotenv(dotenv_path)
-
-    mongo_host = os.getenv("MONGO_HOST")
-    mongo_port = os.getenv("MONGO_PORT")
-    mongo_db = os.getenv("MONGO_DB")
-    mongo_collection = os.getenv("MONGO_COLLECTION")
-    mongo_user = os.getenv("MONGO_USER")
-    mongo_pass = os.getenv("MONGO_PASSWORD")
-    encoded_pass = urllib.parse.quote_plus(mongo_pass)
-
-    mongo_uri = f"mongodb://{mongo_user}:{encoded_pass}@{mongo_host}:{mongo_port}/{mongo_db}?authSource=admin"
-    client = MongoClient(mongo_uri, serverSelectionTimeoutMS=2000)
-    db = client[mongo_db]
-    collection = db[mongo_collection]
-
-    csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "olist_dataset.csv")
-    df = pd.read_csv(csv_path)
+from pymongo import errors
+
+from backends import create_backend
+from dataset import load_dataset
+from mongo_indexes import compound_from_env, run_index_benchmark, settings_from_env
+from latency import LatencyHistogram, save_histogram
+from results_store import backend_params, record_run
+from workload import load_or_create
+
+# Registra cada fase da comparação de índices com a latência por tipo de plano
+def _record_index_phases(backend, results, dataset_rows):
+    for phase, result in results.items():
+        split = result["split"]
+        queries = sum(r["queries"] for r in split.values())
+        elapsed = sum(r["elapsed"] for r in split.values())
+        record_run(backend.name, "consultas_por_plano", queries / elapsed if elapsed > 0 else 0, elapsed, queries,
+                   dataset_rows=dataset_rows, params=backend_params(backend, phase=phase),
+                   latency={plan: r["latency"] for plan, r in split.items()},
+                   extra={"plans": result["plans"],
+                          "throughput_by_plan": {plan: r["throughput"] for plan, r in split.items()}})
+
+# compare_indexes: mede o workload sem e com índices, separando desempenho por plano (IXSCAN/COLLSCAN)
+# Parâmetros não informados vêm do .env (MONGO_COMPARE_INDEXES / MONGO_INDEX_QUERIES)
+def run_benchmark(log_fn=print, compare_indexes=None, total_queries=None):
+    backend = create_backend("mongo")
+    env_compare, env_queries = settings_from_env()
+    compare_indexes = env_compare if compare_indexes is None else compare_indexes
+    total_queries = env_queries if total_queries is None else total_queries
+
+    df = load_dataset()
     records = df.to_dict(orient="records")
 
+    # Consultas pré-geradas (semente fixa), reproduzíveis entre execuções e bancos
+    operations = load_or_create(df, log_fn=log_fn).operations(df)
+
+    # Descarta a coleção antes: o benchmark_mongo.py pode tê-la deixado carregada (FIXTURE_REUSE)
     log_fn("Inserindo dados para benchmark...")
-    collection.insert_many(records)
+    backend.prepare_dataset(df)
+    backend.insert_batch(records)
+
+    if compare_indexes:
+        try:
+            results = run_index_benchmark(backend, operations, compound_from_env(), total_queries, log_fn=log_fn)
+        finally:
+            backend.teardown()
+        _record_index_phases(backend, results, len(df))
+        return
 
     log_fn("Iniciando benchmark de consultas aleatórias...")
 
     query_count = 0
     failures = 0
-    start_time = time.time()
+    histogram = LatencyHistogram()
+    start_time = time.perf_counter()
 
     try:
         while True:
             try:
-                sample = random.choice(records)
-                key, value = random.choice(list(sample.items()))
-                collection.find_one({key: value})
+                # Próxima consulta do workload pré-gerado
+                key, value = operations[query_count % len(operations)]
+                histogram.measure(backend.point_query, key, value)
                 query_count += 1
 
                 if query_count % 100 == 0:
-                    elapsed = time.time() - start_time
+                    elapsed = time.perf_counter() - start_time
                     log_fn(f"{query_count} consultas realizadas em {elapsed:.2f} segundos")
 
             except (errors.AutoReconnect, errors.ServerSelectionTimeoutError, errors.ExecutionTimeout) as e:
@@ -60,9 +78,24 @@ def run_benchmark(log_fn=print):
     except KeyboardInterrupt:
         log_fn("Benchmark interrompido manualmente.")
 
-    total_time = time.time() - start_time
+    total_time = time.perf_counter() - start_time
     log_fn(f"\nBenchmark finalizado. Total de consultas realizadas: {query_count}")
     log_fn(f"Tempo total: {total_time:.2f} segundos")
     log_fn(f"Throughput médio: {query_count / total_time:.2f} consultas/segundo")
+    log_fn(f"Latência: {histogram.format()}")
+    log_fn(f"Histograma exportado em: {save_histogram(histogram, 'mongodb_consultas')}")
+    record_run(backend.name, "consultas_pontuais", query_count / total_time if total_time > 0 else 0, total_time,
+               query_count, dataset_rows=len(df), params=backend_params(backend), latency=histogram)
+
+    backend.teardown()
+
+
+if __name__ == "__main__":
+    import argparse
 
-    collection.delete_many({})
+    parser = argparse.ArgumentParser(description="Consultas pontuais no MongoDB (padrões do .env)")
+    parser.add_argument("--compare-indexes", action="store_true", default=None,
+                        help="mede sem e com índices, separado por plano IXSCAN/COLLSCAN (MONGO_COMPARE_INDEXES)")
+    parser.add_argument("--queries", type=int, default=None, help="consultas por fase (MONGO_INDEX_QUERIES)")
+    args = parser.parse_args()
+    run_benchmark(compare_indexes=args.compare_indexes, total_queries=args.queries)
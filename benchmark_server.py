@@ -1,96 +1,97 @@
 import os
-import random
 import time
-import pandas as pd
-from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import URL
+
+from backends import create_backend
+from config import load_env
+from dataset import load_dataset
+from fixtures import DatasetFixture
+from latency import LatencyHistogram, save_histogram
+from results_store import backend_params, record_run
+from sql_schema import settings_from_env
+from workload import load_or_create
 
 # Carrega variáveis do .env
-dotenv_path = os.path.join(os.path.dirname(__file__), '.env')
-load_dotenv(dotenv_path, override=True)
-
-# Lê variáveis de ambiente
-server = os.getenv("DB_SERVER")
-banco = os.getenv("DB_NAME")
-username = os.getenv("DB_USERNAME")
-password = os.getenv("DB_PASSWORD")
-port = os.getenv("DB_PORT", "1433")
+load_env()
 table_name = os.getenv("DB_TABLE", "olist_benchmark")
+typed, index_mode, clustered = settings_from_env()
 
-# Cria URL de conexão
-conn_url = URL.create(
-    drivername="mssql+pyodbc",
-    username=username,
-    password=password,
-    host=server,
-    port=int(port),
-    database=banco,
-    query={"driver": "ODBC Driver 18 for SQL Server", "TrustServerCertificate": "yes"}
-)
-
-# Cria engine do SQLAlchemy
-engine = create_engine(conn_url, fast_executemany=True)
+# Backend com engine do SQLAlchemy reaproveitada do pool
+backend = create_backend("sqlserver", table_name=table_name)
+backend.connect(log_fn=print)
 
 # Lê CSV
-csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "olist_dataset.csv")
-df = pd.read_csv(csv_path)
-records = df.to_dict(orient="records")
-
-# Cria/limpa tabela
-with engine.connect() as conn:
-    print("Criando tabela...")
-    conn.execute(text(f"IF OBJECT_ID('{table_name}', 'U') IS NOT NULL DROP TABLE {table_name};"))
-    
-    columns_def = ", ".join([f"[{col}] NVARCHAR(MAX)" for col in df.columns])
-    conn.execute(text(f"CREATE TABLE {table_name} ({columns_def});"))
-    conn.commit()
-
-# Insere dados
-print("Inserindo dados para benchmark...")
-df.to_sql(table_name, engine, if_exists='append', index=False)
+df = load_dataset()
+# Consultas pré-geradas (semente fixa), reproduzíveis entre execuções e bancos
+operations = load_or_create(df, log_fn=print).operations(df)
+
+index_columns = sorted({key for key, _ in operations}) if index_mode != "none" else []
+
+
+def load_table():
+    # Recria a tabela (tipos inferidos do CSV ou NVARCHAR(MAX), conforme SQL_TYPED_SCHEMA)
+    print(f"Criando tabela ({'esquema tipado' if typed else 'NVARCHAR(MAX)'})...")
+    backend.create_table(df, typed=typed)
+
+    # Insere dados
+    print("Inserindo dados para benchmark...")
+    backend.insert_batch(backend.prepare_batch(df))
+
+    # Índices nas colunas consultadas (SQL_INDEXES)
+    if index_mode != "none":
+        print(f"Criando índices {index_mode} nas colunas consultadas...")
+        skipped = backend.create_indexes(index_columns, clustered)
+        if skipped:
+            print(f"Colunas não indexáveis: {', '.join(skipped)}")
+
+
+# Reaproveita a tabela da execução anterior se dataset, esquema e índices não mudaram
+fixture = DatasetFixture(backend, df, load_table, indexes=[index_mode, clustered, index_columns], typed=typed)
+fixture.ensure()
 
 # Inicia benchmark
 print("Iniciando benchmark de consultas aleatórias...")
 query_count = 0
 failures = 0
-start_time = time.time()
+histogram = LatencyHistogram()
+start_time = time.perf_counter()
 
 try:
-    with engine.connect() as conn:
-        while True:
-            try:
-                # Escolhe um campo e valor aleatório
-                sample = random.choice(records)
-                key, value = random.choice(list(sample.items()))
-
-                # Executa a consulta segura
-                query = text(f"SELECT TOP 1 * FROM {table_name} WHERE [{key}] = :val")
-                result = conn.execute(query, {"val": value}).fetchone()
-
-                query_count += 1
-                if query_count % 100 == 0:
-                    elapsed = time.time() - start_time
-                    print(f"{query_count} consultas realizadas em {elapsed:.2f} segundos")
-
-            except Exception as e:
-                print(f"\nErro de consulta: {e}")
-                failures += 1
-                if failures >= 3:
-                    print("Múltiplas falhas. Encerrando benchmark.")
-                    break
-                time.sleep(1)
+    while True:
+        try:
+            # Próxima consulta do workload pré-gerado
+            key, value = operations[query_count % len(operations)]
+
+            # Executa a consulta segura
+            histogram.measure(backend.point_query, key, value)
+
+            query_count += 1
+            if query_count % 100 == 0:
+                elapsed = time.perf_counter() - start_time
+                print(f"{query_count} consultas realizadas em {elapsed:.2f} segundos")
+
+        except Exception as e:
+            print(f"\nErro de consulta: {e}")
+            failures += 1
+            if failures >= 3:
+                print("Múltiplas falhas. Encerrando benchmark.")
+                break
+            time.sleep(1)
 
 except KeyboardInterrupt:
     print("Benchmark interrompido manualmente.")
 
-end_time = time.time()
+end_time = time.perf_counter()
 total_time = end_time - start_time
 
 print(f"\nBenchmark finalizado. Total de consultas realizadas: {query_count}")
 print(f"Tempo total: {total_time:.2f} segundos")
 print(f"Throughput médio: {query_count / total_time:.2f} consultas/segundo")
-
-# Limpa a tabela
-with engine.begin() as conn:
-    conn.execute(text(f"DELETE FROM {table_name}"))
+print(f"Latência: {histogram.format()}")
+print(f"Histograma exportado em: {save_histogram(histogram, 'sqlserver_consultas')}")
+record_run(backend.name, "consultas_pontuais", query_count / total_time if total_time > 0 else 0, total_time,
+           query_count, dataset_rows=len(df), params=backend_params(backend, typed_schema=typed, index_mode=index_mode, fixture_reused=fixture.reused),
+           latency=histogram)
+
+# Mantém a tabela para a próxima execução (ou limpa com TRUNCATE, se FIXTURE_REUSE=false)
+fixture.release()
+backend.close()
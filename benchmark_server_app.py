@@ -1,96 +1,153 @@
 import os
-import sys
 import time
-import random
-import pandas as pd
-from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import URL
-
-def get_base_path():
-    # Caminho correto mesmo quando empacotado com PyInstaller
-    return os.path.dirname(sys.executable if getattr(sys, 'frozen', False) else os.path.abspath(__file__))
-
-def load_env():
-    dotenv_path = os.path.join(get_base_path(), '.env')
-    if not os.path.isfile(dotenv_path):
-        raise FileNotFoundError(f"Arquivo .env não encontrado em: {dotenv_path}")
-    load_dotenv(dotenv_path, override=True)
-
-def run_benchmark(log_fn=print):
-    try:
-        load_env()
 
-        server = os.getenv("DB_SERVER")
-        banco = os.getenv("DB_NAME")
-        username = os.getenv("DB_USERNAME")
-        password = os.getenv("DB_PASSWORD")
-        port = os.getenv("DB_PORT", "1433")
+from backends import STATEMENT_CACHE_MODES, create_backend
+from config import load_env
+from dataset import load_dataset
+from latency import LatencyHistogram, save_histogram
+from results_store import backend_params, record_run
+from sql_concurrent import run_concurrent_queries
+from sql_schema import settings_from_env
+from workload import load_or_create
+
+# Executa as consultas pontuais do workload, registra a execução e devolve o throughput
+def _run_queries(backend, operations, log_fn, label, tag, dataset_rows=None):
+    log_fn(f"Iniciando benchmark de consultas aleatórias ({label})...")
+    query_count = 0
+    failures = 0
+    histogram = LatencyHistogram()
+    start_time = time.perf_counter()
+
+    while query_count < 1000:  # Limita para evitar loop infinito
+        try:
+            # Próxima consulta do workload pré-gerado
+            key, value = operations[query_count % len(operations)]
+            histogram.measure(backend.point_query, key, value)
+
+            query_count += 1
+            if query_count % 100 == 0:
+                elapsed = time.perf_counter() - start_time
+                log_fn(f"{query_count} consultas realizadas em {elapsed:.2f} segundos")
+
+        except Exception as e:
+            log_fn(f"Erro de consulta: {e}")
+            failures += 1
+            if failures >= 3:
+                log_fn("Múltiplas falhas. Encerrando benchmark.")
+                break
+            time.sleep(1)
+
+    end_time = time.perf_counter()
+    total_time = end_time - start_time
+    throughput = query_count / total_time if total_time > 0 else 0
+
+    log_fn(f"\nBenchmark finalizado. Total de consultas realizadas: {query_count}")
+    log_fn(f"Tempo total: {total_time:.2f} segundos")
+    log_fn(f"Throughput médio: {throughput:.2f} consultas/segundo")
+    log_fn(f"Latência: {histogram.format()}")
+    log_fn(f"Histograma exportado em: {save_histogram(histogram, f'sqlserver_consultas_{tag}')}")
+    record_run(backend.name, "consultas_pontuais", throughput, total_time, query_count,
+               dataset_rows=dataset_rows, params=backend_params(backend), latency=histogram)
+    return throughput
+
+# Configuração do .env: SQL_QUERY_WORKERS (threads de consulta), SQL_COMPARE_CACHE e
+# SQL_COMPARE_INDEXES (true/false)
+def comparison_from_env():
+    load_env()
+    workers = int(os.getenv("SQL_QUERY_WORKERS", "1") or 1)
+    if workers < 1:
+        raise ValueError("SQL_QUERY_WORKERS deve ser >= 1")
+    compare_cache = os.getenv("SQL_COMPARE_CACHE", "false").lower() in ("1", "true", "yes", "sim")
+    compare_indexes = os.getenv("SQL_COMPARE_INDEXES", "false").lower() in ("1", "true", "yes", "sim")
+    return workers, compare_cache, compare_indexes
+
+# workers > 1: consultas concorrentes, com pool do tamanho do número de threads
+# compare_cache: mede as consultas com e sem cache de statements
+# compare_indexes: mede o mesmo workload sem e com índices nas colunas consultadas
+# Parâmetros não informados vêm do .env (comparison_from_env)
+def run_benchmark(log_fn=print, workers=None, compare_cache=None, compare_indexes=None):
+    backend = None
+    try:
+        env_workers, env_cache, env_indexes = comparison_from_env()
+        workers = env_workers if workers is None else workers
+        compare_cache = env_cache if compare_cache is None else compare_cache
+        compare_indexes = env_indexes if compare_indexes is None else compare_indexes
         table_name = os.getenv("DB_TABLE", "olist_benchmark")
+        typed, index_mode, clustered = settings_from_env()
+        backend = create_backend("sqlserver", table_name=table_name)
+        backend.connect(log_fn=log_fn)
+
+        df = load_dataset()
+        # Consultas pré-geradas (semente fixa), reproduzíveis entre execuções e bancos
+        operations = load_or_create(df, log_fn=log_fn).operations(df)
+        query_columns = sorted({key for key, _ in operations})
 
-        conn_url = URL.create(
-            drivername="mssql+pyodbc",
-            username=username,
-            password=password,
-            host=server,
-            port=int(port),
-            database=banco,
-            query={"driver": "ODBC Driver 18 for SQL Server", "TrustServerCertificate": "yes"}
-        )
-
-        engine = create_engine(conn_url, fast_executemany=True)
-
-        csv_path = os.path.join(get_base_path(), "data", "olist_dataset.csv")
-        df = pd.read_csv(csv_path)
-        records = df.to_dict(orient="records")
-
-        with engine.connect() as conn:
-            log_fn("Criando tabela no SQL Server...")
-            conn.execute(text(f"IF OBJECT_ID('{table_name}', 'U') IS NOT NULL DROP TABLE {table_name};"))
-            columns_def = ", ".join([f"[{col}] NVARCHAR(MAX)" for col in df.columns])
-            conn.execute(text(f"CREATE TABLE {table_name} ({columns_def});"))
-            conn.commit()
+        log_fn(f"Criando tabela no SQL Server ({'esquema tipado' if typed else 'NVARCHAR(MAX)'})...")
+        backend.create_table(df, typed=typed)
 
         log_fn("Inserindo dados para benchmark...")
-        df.to_sql(table_name, engine, if_exists='append', index=False)
-
-        log_fn("Iniciando benchmark de consultas aleatórias...")
-        query_count = 0
-        failures = 0
-        start_time = time.time()
-
-        with engine.connect() as conn:
-            while query_count < 1000:  # Limita para evitar loop infinito
-                try:
-                    sample = random.choice(records)
-                    key, value = random.choice(list(sample.items()))
-                    query = text(f"SELECT TOP 1 * FROM {table_name} WHERE [{key}] = :val")
-                    result = conn.execute(query, {"val": value}).fetchone()
-
-                    query_count += 1
-                    if query_count % 100 == 0:
-                        elapsed = time.time() - start_time
-                        log_fn(f"{query_count} consultas realizadas em {elapsed:.2f} segundos")
-
-                except Exception as e:
-                    log_fn(f"Erro de consulta: {e}")
-                    failures += 1
-                    if failures >= 3:
-                        log_fn("Múltiplas falhas. Encerrando benchmark.")
-                        break
-                    time.sleep(1)
-
-        end_time = time.time()
-        total_time = end_time - start_time
-        throughput = query_count / total_time if total_time > 0 else 0
-
-        log_fn(f"\nBenchmark finalizado. Total de consultas realizadas: {query_count}")
-        log_fn(f"Tempo total: {total_time:.2f} segundos")
-        log_fn(f"Throughput médio: {throughput:.2f} consultas/segundo")
-
-        with engine.begin() as conn:
-            conn.execute(text(f"DELETE FROM {table_name}"))
+        backend.insert_batch(backend.prepare_batch(df))
+
+        def provision_indexes():
+            log_fn(f"Criando índices nas colunas consultadas ({index_mode if index_mode != 'none' else 'nonclustered'})...")
+            skipped = backend.create_indexes(query_columns, clustered)
+            if skipped:
+                log_fn(f"Colunas não indexáveis (NVARCHAR(MAX) ou chave longa): {', '.join(skipped)}")
+
+        if index_mode != "none" and not compare_indexes:
+            provision_indexes()
+
+        if workers > 1:
+            log_fn(f"Iniciando benchmark concorrente com {workers} threads...")
+            result = run_concurrent_queries("sqlserver", operations, workers, 1000, table_name, log_fn)
+            save_histogram(result["query"], f"sqlserver_consultas_{workers}_threads")
+            record_run(backend.name, "consultas_concorrentes", result["throughput"], result["elapsed"],
+                       result["queries"], dataset_rows=len(df), params=backend_params(backend, workers=workers),
+                       latency={"query": result["query"], "pool_wait": result["pool_wait"]})
+            backend.teardown()
             log_fn("Tabela limpa após benchmark.")
+            return
+
+        # compare_cache: repete as mesmas consultas com cada modo de preparo (off/cached/raw)
+        modes = STATEMENT_CACHE_MODES if compare_cache else (backend.statement_cache,)
+        phases = ("sem índices", "com índices") if compare_indexes else (None,)
+        throughputs = {}
+
+        for phase in phases:
+            if phase == "com índices":
+                provision_indexes()
+            for mode in modes:
+                backend.close()
+                backend.statement_cache = mode
+                label = f"statement cache: {mode}" + (f", {phase}" if phase else "")
+                tag = mode + (f"_{phase.split()[0]}_indices" if phase else "")
+                throughputs[label] = _run_queries(backend, operations, log_fn, label, tag, len(df))
+
+        if len(throughputs) > 1:
+            baseline = next(iter(throughputs.values()))
+            log_fn(f"\nComparação (em relação a '{next(iter(throughputs))}'):")
+            for label, throughput in throughputs.items():
+                ratio = throughput / baseline if baseline > 0 else 0
+                log_fn(f"  {label}: {throughput:.2f} consultas/segundo ({ratio:.2f}x)")
+
+        backend.teardown()
+        log_fn("Tabela limpa após benchmark.")
 
     except Exception as e:
         log_fn(f"Erro no benchmark SQL Server: {e}")
+    finally:
+        if backend is not None:
+            backend.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Consultas pontuais no SQL Server (padrões do .env)")
+    parser.add_argument("--workers", type=int, default=None, help="threads de consulta (SQL_QUERY_WORKERS)")
+    parser.add_argument("--compare-cache", action="store_true", default=None,
+                        help="mede cada modo de SQL_STATEMENT_CACHE (SQL_COMPARE_CACHE)")
+    parser.add_argument("--compare-indexes", action="store_true", default=None,
+                        help="mede sem e com índices nas colunas consultadas (SQL_COMPARE_INDEXES)")
+    args = parser.parse_args()
+    run_benchmark(workers=args.workers, compare_cache=args.compare_cache, compare_indexes=args.compare_indexes)
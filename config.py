@@ -0,0 +1,32 @@
+import os
+import sys
+from dotenv import load_dotenv
+
+
+# Diretório base do projeto (funciona também quando empacotado com PyInstaller)
+def get_base_path():
+    return os.path.dirname(sys.executable if getattr(sys, 'frozen', False) else os.path.abspath(__file__))
+
+
+# Caminho do .env, com erro explícito quando o arquivo não existe
+def get_dotenv_path():
+    dotenv_path = os.path.join(get_base_path(), '.env')
+    if not os.path.isfile(dotenv_path):
+        raise FileNotFoundError(f"Arquivo .env não encontrado em: {dotenv_path}")
+    return dotenv_path
+
+
+# Caminho do CSV de dados
+def get_csv_path():
+    return os.path.join(get_base_path(), "data", "olist_dataset.csv")
+
+
+# Pasta onde os resultados dos benchmarks são gravados
+def get_results_dir():
+    results_dir = os.path.join(get_base_path(), "results")
+    os.makedirs(results_dir, exist_ok=True)
+    return results_dir
+
+
+def load_env():
+    load_dotenv(get_dotenv_path(), override=True)
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from config import get_csv_path
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # sem pyarrow o dataset continua vindo do CSV
+    pa = None
+
+_loaded = {}
+
+
+# Caminho do cache colunar (Arrow/Feather) ao lado do CSV: data/olist_dataset.arrow
+def get_cache_path(csv_path=None):
+    return os.path.splitext(csv_path or get_csv_path())[0] + ".arrow"
+
+
+def _meta_path(cache_path):
+    return cache_path + ".json"
+
+
+def _file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_stat(csv_path):
+    stat = os.stat(csv_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+# O cache vale enquanto tamanho e mtime do CSV não mudarem; se mudarem, o hash do conteúdo
+# decide (um `touch` ou cópia do mesmo arquivo não força a reconversão)
+def _cache_valid(csv_path, cache_path):
+    meta_path = _meta_path(cache_path)
+    if not (os.path.isfile(cache_path) and os.path.isfile(meta_path)):
+        return False
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    stat = _source_stat(csv_path)
+    if meta.get("size") == stat["size"] and meta.get("mtime_ns") == stat["mtime_ns"]:
+        return True
+    if meta.get("size") != stat["size"] or meta.get("sha256") != _file_hash(csv_path):
+        return False
+    _write_meta(cache_path, {**meta, **stat})
+    return True
+
+
+def _write_meta(cache_path, meta):
+    with open(_meta_path(cache_path), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+# Grava o DataFrame no formato Feather sem compressão (lido depois com memory map)
+def write_cache(df, cache_path, meta=None):
+    os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), tmp_path, compression="uncompressed")
+    os.replace(tmp_path, cache_path)
+    _write_meta(cache_path, meta or {})
+
+
+# O pandas 2 devolve None nos nulos de colunas object vindas do Arrow, enquanto o read_csv
+# usa NaN; os nulos voltam a NaN para que o CSV e o cache gerem os mesmos documentos e consultas
+def read_cache(cache_path):
+    df = feather.read_table(cache_path, memory_map=True).to_pandas()
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].notna(), np.nan)
+    return df
+
+
+# Converte o CSV para o cache colunar uma única vez e devolve o DataFrame
+def build_cache(csv_path=None, cache_path=None):
+    csv_path = csv_path or get_csv_path()
+    cache_path = cache_path or get_cache_path(csv_path)
+    df = pd.read_csv(csv_path)
+    write_cache(df, cache_path, {**_source_stat(csv_path), "sha256": _file_hash(csv_path), "rows": len(df)})
+    return df
+
+
+# Origem do dataset: DATASET_FILE no .env (ex.: um .arrow gerado por synthetic.py) ou o CSV
+def get_dataset_source():
+    return os.getenv("DATASET_FILE") or get_csv_path()
+
+
+# Dataset usado por todos os pontos de entrada: carregado uma vez por processo, a partir do
+# cache Arrow quando ele corresponde ao CSV (reconvertendo quando não) ou do CSV sem pyarrow.
+# O DataFrame é compartilhado entre chamadas e não deve ser alterado in-place.
+def load_dataset(csv_path=None, log_fn=None):
+    csv_path = csv_path or get_dataset_source()
+    if csv_path in _loaded:
+        return _loaded[csv_path]
+
+    if csv_path.endswith(".arrow"):
+        df = read_cache(csv_path)
+    elif pa is None:
+        df = pd.read_csv(csv_path)
+    else:
+        cache_path = get_cache_path(csv_path)
+        if _cache_valid(csv_path, cache_path):
+            df = read_cache(cache_path)
+        else:
+            if log_fn:
+                log_fn(f"Convertendo {os.path.basename(csv_path)} para cache colunar: {cache_path}")
+            df = build_cache(csv_path, cache_path)
+    _loaded[csv_path] = df
+    return df
+
+
+# sha256 do arquivo de origem; para o CSV reaproveita o hash gravado no meta do cache Arrow
+# enquanto tamanho e mtime não mudarem
+def source_hash(csv_path=None):
+    csv_path = csv_path or get_dataset_source()
+    meta_path = _meta_path(get_cache_path(csv_path))
+    if not csv_path.endswith(".arrow") and os.path.isfile(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        stat = _source_stat(csv_path)
+        if meta.get("sha256") and meta.get("size") == stat["size"] and meta.get("mtime_ns") == stat["mtime_ns"]:
+            return meta["sha256"]
+    return _file_hash(csv_path)
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+
+from config import load_env
+from dataset import source_hash
+
+
+# FIXTURE_REUSE no .env: reaproveita a tabela/coleção já carregada entre execuções (padrão)
+# ou recarrega sempre e limpa ao final
+def reuse_from_env():
+    load_env()
+    return os.getenv("FIXTURE_REUSE", "true").lower() in ("1", "true", "yes", "sim")
+
+
+# Identidade da carga: hash do arquivo de origem, colunas e dtypes, número de linhas,
+# índices e o que mais mudar o conteúdo gravado (ex.: esquema tipado)
+def fingerprint(df, source=None, indexes=None, **extra):
+    payload = {
+        "source": source_hash(source),
+        "schema": [[col, str(dtype)] for col, dtype in df.dtypes.items()],
+        "rows": len(df),
+        "indexes": indexes or [],
+        **extra,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:32]
+
+
+# Carga do dataset reaproveitável entre execuções. ensure() compara a impressão digital gravada
+# no banco (e a contagem de linhas) com a do dataset atual: se batem, os dados ficam como estão;
+# senão load() recria a tabela/coleção (DROP/drop) e insere tudo de novo.
+class DatasetFixture:
+    def __init__(self, backend, df, load, indexes=None, source=None, reuse=None, log_fn=print, **extra):
+        self.backend = backend
+        self.df = df
+        self.load = load
+        self.reuse = reuse_from_env() if reuse is None else reuse
+        self.log_fn = log_fn or (lambda msg: None)
+        self.fingerprint = fingerprint(df, source, indexes, **extra)
+        self.reused = False
+
+    # None se a carga gravada corresponde ao dataset; senão, o motivo da recarga
+    def mismatch(self):
+        try:
+            stored = self.backend.load_fixture()
+            if stored != self.fingerprint:
+                return "sem carga registrada" if stored is None else "impressão digital diferente"
+            rows = self.backend.count_rows()
+        except Exception as e:
+            return f"erro ao verificar a carga: {e}"
+        if rows != len(self.df):
+            return f"{rows} linhas no banco, esperado {len(self.df)}"
+        return None
+
+    def ensure(self):
+        reason = self.mismatch() if self.reuse else "reaproveitamento desligado (FIXTURE_REUSE)"
+        if reason is None:
+            self.log_fn(f"[{self.backend.name}] Dados já carregados ({len(self.df)} linhas, "
+                        f"{self.fingerprint[:12]}): carga reaproveitada")
+            self.reused = True
+            return True
+        self.log_fn(f"[{self.backend.name}] Carregando dados: {reason}")
+        self.load()
+        self.backend.save_fixture(self.fingerprint)
+        self.reused = False
+        return False
+
+    # Fim da execução: mantém os dados para a próxima ou, sem reaproveitamento, limpa
+    # com TRUNCATE/drop()
+    def release(self):
+        if not self.reuse:
+            self.backend.teardown()
@@ -0,0 +1,64 @@
+import tkinter as tk
+
+DEFAULT_REFRESH_MS = 1000
+COLORS = ("#1f77b4", "#2ca02c", "#d62728", "#ff7f0e", "#9467bd")
+
+
+# Gráfico de linhas em um Canvas com o throughput por segundo de cada amostrador registrado
+# (timeline.ThroughputSampler); redesenhado pela thread do Tk a cada `refresh_ms`
+class TimelineChart:
+    def __init__(self, root, width=660, height=180, window=120, column=1, unit="linhas/s",
+                 refresh_ms=DEFAULT_REFRESH_MS):
+        self.root = root
+        self.width = width
+        self.height = height
+        self.window = window
+        self.column = column
+        self.unit = unit
+        self.refresh_ms = refresh_ms
+        self.canvas = tk.Canvas(root, width=width, height=height, bg="white", highlightthickness=1)
+        self._sources = {}
+        root.after(refresh_ms, self._refresh)
+
+    def pack(self, **kwargs):
+        self.canvas.pack(**kwargs)
+
+    def set_source(self, label, sampler):
+        self._sources[label] = sampler
+
+    def clear(self):
+        self._sources.clear()
+        self.canvas.delete("all")
+
+    def _refresh(self):
+        try:
+            self._draw()
+        finally:
+            self.root.after(self.refresh_ms, self._refresh)
+
+    def _draw(self):
+        c = self.canvas
+        c.delete("all")
+        series = {label: s.series()[-self.window:] for label, s in self._sources.items()}
+        peak = max((p[self.column] for points in series.values() for p in points), default=0)
+        left, right, top, bottom = 60, self.width - 10, 20, self.height - 20
+        c.create_line(left, bottom, right, bottom, fill="#999")
+        c.create_line(left, top, left, bottom, fill="#999")
+        c.create_text(left - 5, top, text=f"{peak:,.0f}", anchor="e", font=("TkDefaultFont", 8))
+        c.create_text(left - 5, bottom, text="0", anchor="e", font=("TkDefaultFont", 8))
+        c.create_text(right, bottom + 10, text=f"últimos {self.window} s ({self.unit})", anchor="e",
+                      font=("TkDefaultFont", 8))
+        if peak <= 0:
+            return
+
+        x_step = (right - left) / max(1, self.window - 1)
+        for i, (label, points) in enumerate(series.items()):
+            color = COLORS[i % len(COLORS)]
+            c.create_text(left + 5 + 120 * i, top - 10, text=label, fill=color, anchor="w",
+                          font=("TkDefaultFont", 8, "bold"))
+            coords = []
+            offset = self.window - len(points)
+            for j, point in enumerate(points):
+                coords += [left + (offset + j) * x_step, bottom - point[self.column] / peak * (bottom - top)]
+            if len(coords) >= 4:
+                c.create_line(*coords, fill=color, width=2)
@@ -0,0 +1,82 @@
+import threading
+import time
+import tkinter as tk
+from collections import deque
+
+DEFAULT_INTERVAL_MS = 100
+DEFAULT_MAX_LINES = 2000
+# Intervalo mínimo entre duas linhas de progresso com a mesma chave
+DEFAULT_PROGRESS_INTERVAL = 1.0
+
+
+# Fila entre as threads de benchmark e a interface: as threads só enfileiram mensagens e
+# chamadas (sem tocar nos widgets) e a thread do Tk esvazia a fila a cada `interval_ms` via
+# root.after, inserindo todas as linhas pendentes de uma vez e limitando o log a `max_lines`.
+class UiQueue:
+    def __init__(self, root, widget, interval_ms=DEFAULT_INTERVAL_MS, max_lines=DEFAULT_MAX_LINES,
+                 progress_interval=DEFAULT_PROGRESS_INTERVAL):
+        self.root = root
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.max_lines = max_lines
+        self.progress_interval = progress_interval
+        self._lock = threading.Lock()
+        self._lines = deque(maxlen=max_lines)
+        self._calls = deque()
+        self._progress = {}
+        self._progress_shown = {}
+        self._dropped = 0
+        root.after(interval_ms, self._drain)
+
+    # Pode ser chamado de qualquer thread
+    def log(self, msg):
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                self._dropped += 1
+            self._lines.append(msg)
+
+    # Mensagem de progresso: entre dois esvaziamentos só a última de cada chave é mantida,
+    # e cada chave gera no máximo uma linha a cada `progress_interval` segundos
+    def progress(self, key, msg):
+        with self._lock:
+            self._progress[key] = msg
+
+    # Agenda fn(*args) na thread do Tk (ex.: atualizar a tabela de resultados)
+    def call(self, fn, *args, **kwargs):
+        with self._lock:
+            self._calls.append((fn, args, kwargs))
+
+    def _take(self):
+        now = time.monotonic()
+        with self._lock:
+            lines = list(self._lines)
+            self._lines.clear()
+            dropped, self._dropped = self._dropped, 0
+            calls = list(self._calls)
+            self._calls.clear()
+            # Com linhas comuns pendentes o progresso é emitido antes delas, para manter a ordem
+            flush = bool(lines)
+            progress = []
+            for key, msg in list(self._progress.items()):
+                if flush or now - self._progress_shown.get(key, 0) >= self.progress_interval:
+                    progress.append(msg)
+                    self._progress_shown[key] = now
+                    del self._progress[key]
+        lines = progress + lines
+        if dropped:
+            lines.insert(0, f"... {dropped} mensagens omitidas")
+        return lines, calls
+
+    def _drain(self):
+        try:
+            lines, calls = self._take()
+            if lines:
+                self.widget.insert(tk.END, "\n".join(lines) + "\n")
+                excess = int(self.widget.index("end-1c").split(".")[0]) - 1 - self.max_lines
+                if excess > 0:
+                    self.widget.delete("1.0", f"{excess + 1}.0")
+                self.widget.see(tk.END)
+            for fn, args, kwargs in calls:
+                fn(*args, **kwargs)
+        finally:
+            self.root.after(self.interval_ms, self._drain)
@@ -0,0 +1,123 @@
+import itertools
+import os
+import queue
+import threading
+import time
+import pandas as pd
+
+DEFAULT_CHUNKSIZE = 50_000
+# Linhas lidas do início do CSV para fixar os tipos de todos os chunks
+DTYPE_SAMPLE_ROWS = 200_000
+
+_DONE = object()
+
+
+# Tipos fixos das colunas para a leitura em chunks, inferidos de uma amostra do início do CSV.
+# Sem eles cada chunk tem os seus próprios dtypes (uma coluna toda nula no chunk 1 vira float e
+# depois recebe texto). Colunas nulas na amostra e booleanas ficam como object e inteiras como
+# float64, para que nulos em chunks posteriores não quebrem a leitura.
+def csv_dtypes(csv_path, sample_rows=DTYPE_SAMPLE_ROWS):
+    sample = pd.read_csv(csv_path, nrows=sample_rows)
+    dtypes = {}
+    for col in sample.columns:
+        series = sample[col]
+        if series.isna().all() or pd.api.types.is_bool_dtype(series):
+            dtypes[col] = object
+        elif pd.api.types.is_integer_dtype(series):
+            dtypes[col] = "float64"
+        else:
+            dtypes[col] = series.dtype
+    return dtypes
+
+
+# Lê o CSV em blocos de tamanho fixo (nunca o arquivo inteiro na memória), todos com os
+# mesmos dtypes (os de csv_dtypes, se dtype não for informado)
+def iter_csv_chunks(csv_path, chunksize=DEFAULT_CHUNKSIZE, dtype=None):
+    dtype = csv_dtypes(csv_path) if dtype is None else dtype
+    with pd.read_csv(csv_path, chunksize=chunksize, dtype=dtype) as reader:
+        yield from reader
+
+
+# Tamanho de chunk configurado no .env (CSV_CHUNKSIZE); 0/ausente desliga o streaming
+def get_chunksize():
+    return int(os.getenv("CSV_CHUNKSIZE", "0") or 0)
+
+
+# Insere um fluxo de DataFrames no backend.
+# Uma thread produtora lê e converte o chunk N+1 (prepare_batch) enquanto o chunk N
+# é inserido; a fila limitada a `max_pending` lotes mantém a memória constante,
+# independentemente do tamanho do arquivo.
+# Como no caminho sem streaming, a tabela/coleção é recriada (prepare_dataset) antes do início
+# da medição, a partir dos dtypes do primeiro chunk (fixos para todos em iter_csv_chunks).
+def stream_insert(backend, chunks, max_pending=2, prepare=True, log_fn=None):
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is not None:
+        if prepare:
+            backend.prepare_dataset(first.head(0))
+        chunks = itertools.chain([first], chunks)
+        del first
+
+    pending = queue.Queue(maxsize=max_pending)
+    stop = threading.Event()
+    errors = []
+
+    def produce():
+        try:
+            for chunk in chunks:
+                item = backend.prepare_batch(chunk)
+                while not stop.is_set():
+                    try:
+                        pending.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+        except Exception as e:
+            errors.append(e)
+        finally:
+            pending.put(_DONE)
+
+    total_rows = 0
+    total_chunks = 0
+    insert_time = 0.0
+
+    producer = threading.Thread(target=produce, daemon=True)
+    start_time = time.perf_counter()
+    producer.start()
+    try:
+        while True:
+            batch = pending.get()
+            if batch is _DONE:
+                break
+
+            t0 = time.perf_counter()
+            total_rows += backend.insert_batch(batch)
+            insert_time += time.perf_counter() - t0
+            total_chunks += 1
+            del batch
+
+            if log_fn:
+                log_fn(f"Chunk {total_chunks} inserido ({total_rows} linhas)")
+    finally:
+        stop.set()
+        # Libera a produtora caso ela esteja bloqueada na fila cheia
+        while producer.is_alive():
+            try:
+                pending.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        producer.join()
+
+    if errors:
+        raise errors[0]
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        "rows": total_rows,
+        "chunks": total_chunks,
+        "elapsed": elapsed,
+        "insert_time": insert_time,
+        "throughput": total_rows / elapsed if elapsed > 0 else 0,
+    }
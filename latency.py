@@ -0,0 +1,136 @@
+import json
+import os
+import time
+
+from config import get_results_dir
+
+# Histograma log-linear no estilo HDR: valores em nanossegundos, 128 sub-buckets por
+# potência de 2 (erro relativo < 1%), memória fixa e independente do número de operações.
+SUB_BUCKET_BITS = 8
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT // 2
+BUCKET_COUNT = (64 - SUB_BUCKET_BITS + 1) * SUB_BUCKET_HALF + SUB_BUCKET_HALF
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def _index(value):
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return (shift + 1) * SUB_BUCKET_HALF + (value >> shift) - SUB_BUCKET_HALF
+
+
+# Valor representativo (ponto médio) do bucket
+def _value(index):
+    if index < SUB_BUCKET_COUNT:
+        return index
+    shift = index // SUB_BUCKET_HALF - 1
+    sub = index % SUB_BUCKET_HALF + SUB_BUCKET_HALF
+    return (sub << shift) + ((1 << shift) >> 1)
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, ns, count=1):
+        ns = max(0, int(ns))
+        self.counts[_index(ns)] += count
+        self.count += count
+        self.total += ns * count
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+
+    # Mede a chamada com relógio monotônico em ns e registra a latência
+    def measure(self, fn, *args, **kwargs):
+        t0 = time.perf_counter_ns()
+        result = fn(*args, **kwargs)
+        self.record(time.perf_counter_ns() - t0)
+        return result
+
+    def percentile(self, p):
+        if self.count == 0:
+            return 0
+        target = max(1, int(round(self.count * p / 100.0)))
+        seen = 0
+        for index, c in enumerate(self.counts):
+            if c:
+                seen += c
+                if seen >= target:
+                    return min(_value(index), self.max)
+        return self.max
+
+    def merge(self, other):
+        for index, c in enumerate(other.counts):
+            if c:
+                self.counts[index] += c
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+        return self
+
+    # Resumo em milissegundos
+    def summary(self):
+        result = {
+            "count": self.count,
+            "mean_ms": self.total / self.count / 1e6 if self.count else 0,
+            "min_ms": (self.min or 0) / 1e6,
+        }
+        for p in PERCENTILES:
+            result[f"p{p:g}_ms".replace(".", "_")] = self.percentile(p) / 1e6
+        result["max_ms"] = self.max / 1e6
+        return result
+
+    def format(self):
+        s = self.summary()
+        return (f"p50 {s['p50_ms']:.2f} ms | p90 {s['p90_ms']:.2f} ms | p99 {s['p99_ms']:.2f} ms | "
+                f"p99.9 {s['p99_9_ms']:.2f} ms | máx {s['max_ms']:.2f} ms")
+
+    # Exportação compacta (apenas buckets não vazios) para mesclar depois
+    def to_dict(self):
+        return {
+            "sub_bucket_bits": SUB_BUCKET_BITS,
+            "count": self.count,
+            "total_ns": self.total,
+            "min_ns": self.min,
+            "max_ns": self.max,
+            "buckets": {str(i): c for i, c in enumerate(self.counts) if c},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("sub_bucket_bits") != SUB_BUCKET_BITS:
+            raise ValueError("Histograma exportado com outra resolução de buckets")
+        hist = cls()
+        for index, c in data["buckets"].items():
+            hist.counts[int(index)] = c
+        hist.count = data["count"]
+        hist.total = data["total_ns"]
+        hist.min = data["min_ns"]
+        hist.max = data["max_ns"]
+        return hist
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+# Grava o histograma em results/latencia_<nome>_<data>.json e devolve o caminho
+def save_histogram(hist, name):
+    path = os.path.join(get_results_dir(), f"latencia_{name}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    hist.save(path)
+    return path
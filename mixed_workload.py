@@ -0,0 +1,319 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+from latency import LatencyHistogram
+from workload import DEFAULT_SEED, Workload
+
+OPERATION_TYPES = ("read", "update", "insert", "scan", "rmw", "update_many", "delete", "delete_range")
+
+# Proporções no estilo YCSB (rmw = read-modify-write). "P" aproxima o tráfego de produção:
+# 80% leituras e 20% escritas
+PRESETS = {
+    "A": {"read": 0.5, "update": 0.5},
+    "B": {"read": 0.95, "update": 0.05},
+    "C": {"read": 1.0},
+    "D": {"read": 0.95, "insert": 0.05},
+    "E": {"scan": 0.95, "insert": 0.05},
+    "F": {"read": 0.5, "rmw": 0.5},
+    "P": {"read": 0.8, "update": 0.1, "insert": 0.1},
+}
+DEFAULT_SCAN_LENGTH = 100
+WRITE_TYPES = ("update", "rmw", "update_many")
+# update_many só usa (coluna, valor) que casam com entre 2 e DEFAULT_MAX_FANOUT linhas
+DEFAULT_MAX_FANOUT = 20
+# delete_range apaga blocos disjuntos de ~DEFAULT_RANGE_ROWS linhas em ordem de uma coluna de
+# alta cardinalidade (ao menos KEY_RATIO de valores distintos); somados, os blocos não passam
+# de MAX_DELETE_FRACTION da tabela
+DEFAULT_RANGE_ROWS = 10
+KEY_RATIO = 0.5
+MAX_DELETE_FRACTION = 0.5
+
+# "read=0.8,update=0.2" -> {"read": 0.8, "update": 0.2}, normalizado para somar 1
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(","):
+        name, _, ratio = part.partition("=")
+        name = name.strip()
+        if name not in OPERATION_TYPES:
+            raise ValueError(f"Operação desconhecida: {name} (opções: {', '.join(OPERATION_TYPES)})")
+        mix[name] = float(ratio)
+    return normalize_mix(mix)
+
+
+def normalize_mix(mix):
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError("As proporções da carga mista devem somar mais que zero")
+    return {name: ratio / total for name, ratio in mix.items() if ratio > 0}
+
+
+def resolve_mix(preset=None, spec=None):
+    if spec:
+        return parse_mix(spec)
+    if preset not in PRESETS:
+        raise ValueError(f"Preset desconhecido: {preset} (opções: {', '.join(PRESETS)})")
+    return normalize_mix(PRESETS[preset])
+
+
+# Colunas gravadas pelas atualizações (numéricas) e colunas de busca (as demais). Com
+# escritas no mix as buscas não usam as colunas gravadas, para que uma atualização não mude
+# os valores procurados pelas operações seguintes
+def split_columns(df):
+    numeric = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col]) and df[col].notna().any()]
+    lookup = [col for col in df.columns if col not in numeric]
+    if not numeric or not lookup:
+        raise ValueError("As atualizações precisam de ao menos uma coluna numérica e uma coluna de busca")
+    return numeric, lookup
+
+
+# (coluna, valor, linhas) com 2 <= linhas <= max_fanout, sorteados uniformemente
+def _fanout_targets(df, columns, n, rng, max_fanout):
+    candidates = []
+    for col in columns:
+        counts = df[col].value_counts()
+        counts = counts[(counts >= 2) & (counts <= max_fanout)]
+        candidates += [(col, value, int(count)) for value, count in counts.items()]
+    if not candidates:
+        raise ValueError(f"Nenhum valor das colunas de busca casa com 2 a {max_fanout} linhas (update_many)")
+    picks = rng.integers(0, len(candidates), n)
+    return [candidates[i] for i in picks.tolist()]
+
+
+def key_columns(df, columns):
+    return [col for col in columns if df[col].nunique() >= KEY_RATIO * len(df)]
+
+
+# Número máximo de delete_range que cabem em MAX_DELETE_FRACTION da tabela
+def max_range_operations(df, range_rows=DEFAULT_RANGE_ROWS):
+    return int(len(df) * MAX_DELETE_FRACTION) // range_rows
+
+
+# Intervalos [low, high) disjuntos: o bloco j cobre as posições j * range_rows até
+# (j + 1) * range_rows da coluna ordenada; cada bloco é usado uma única vez
+def _range_targets(df, columns, count, rng, range_rows):
+    keys = key_columns(df, columns)
+    if not keys:
+        raise ValueError(f"delete_range precisa de uma coluna com ao menos {KEY_RATIO:.0%} de valores distintos")
+    limit = max_range_operations(df, range_rows)
+    if count > limit:
+        raise ValueError(f"{count} delete_range de {range_rows} linhas passam de {MAX_DELETE_FRACTION:.0%} "
+                         f"da tabela (máximo: {limit} operações)")
+    chosen = rng.integers(0, len(keys), count)
+    targets = [None] * count
+    for k, col in enumerate(keys):
+        positions = np.flatnonzero(chosen == k)
+        ordered = np.sort(df[col].dropna().to_numpy())
+        blocks = rng.permutation(max(0, len(ordered) // range_rows - 1))[:len(positions)]
+        if len(blocks) < len(positions):
+            raise ValueError(f"{col}: {len(positions)} delete_range para {len(blocks)} blocos de {range_rows} linhas")
+        for pos, block in zip(positions.tolist(), blocks.tolist()):
+            low, high = ordered[[block * range_rows, (block + 1) * range_rows]].tolist()
+            targets[pos] = (col, low, high)
+    return targets
+
+
+# Sequência de operações pré-gerada (fora da medição) e reproduzível pela semente.
+# Leituras, scans, atualizações pela chave e exclusões usam (campo, valor) sorteados como no
+# workload de consultas pontuais; atualizações gravam em uma coluna numérica o valor de outra
+# linha, update_many tem fan-out limitado a max_fanout linhas, inserções copiam uma linha
+# sorteada do dataset e delete_range apaga blocos disjuntos de range_rows linhas.
+def generate_operations(df, mix, n, seed=DEFAULT_SEED, scan_length=DEFAULT_SCAN_LENGTH,
+                        max_fanout=DEFAULT_MAX_FANOUT, range_rows=DEFAULT_RANGE_ROWS):
+    rng = np.random.default_rng(seed)
+    names = list(mix)
+    kinds = rng.choice(len(names), n, p=[mix[name] for name in names])
+    counts = np.bincount(kinds, minlength=len(names))
+    lookup = None
+    if any(name in WRITE_TYPES for name in mix):
+        numeric, lookup = split_columns(df)
+        fields = Workload.generate(df, n, seed + 1, columns=numeric).operations(df)
+    targets = Workload.generate(df, n, seed, columns=lookup).operations(df)
+    rows = rng.integers(0, len(df), n)
+    fanout = iter(_fanout_targets(df, lookup, int(counts[names.index("update_many")]), rng, max_fanout)
+                  if "update_many" in mix else ())
+    ranges = iter(_range_targets(df, lookup or list(df.columns), int(counts[names.index("delete_range")]),
+                                 rng, range_rows) if "delete_range" in mix else ())
+
+    ops = []
+    for i, kind in enumerate(kinds.tolist()):
+        name = names[kind]
+        key, value = targets[i]
+        if name in ("update", "rmw"):
+            field, new_value = fields[i]
+            ops.append((name, key, value, field, new_value))
+        elif name == "update_many":
+            field, new_value = fields[i]
+            key, value, _ = next(fanout)
+            ops.append((name, key, value, field, new_value))
+        elif name == "delete_range":
+            ops.append((name, *next(ranges)))
+        elif name == "insert":
+            ops.append((name, int(rows[i])))
+        elif name == "scan":
+            ops.append((name, key, value, scan_length))
+        else:
+            ops.append((name, key, value))
+
+    insert_rows = sorted({op[1] for op in ops if op[0] == "insert"})
+    records = {}
+    if insert_rows:
+        subset = df.iloc[insert_rows].astype(object)
+        subset = subset.where(subset.notna(), None)
+        records = dict(zip(insert_rows, subset.to_dict(orient="records")))
+    return [("insert", records[op[1]]) if op[0] == "insert" else op for op in ops]
+
+def _execute(backend, op):
+    name = op[0]
+    if name == "read":
+        backend.point_query(op[1], op[2])
+    elif name == "update":
+        return backend.update_by_key(op[1], op[2], op[3], op[4])
+    elif name == "rmw":
+        backend.point_query(op[1], op[2])
+        return backend.update_by_key(op[1], op[2], op[3], op[4])
+    elif name == "scan":
+        backend.scan(op[1], op[2], op[3])
+    elif name == "update_many":
+        return backend.update_many(op[1], op[2], op[3], op[4])
+    elif name == "delete":
+        return backend.delete_by_key(op[1], op[2])
+    elif name == "delete_range":
+        return backend.delete_range(op[1], op[2], op[3])
+    else:
+        backend.insert_record(op[1])
+    return None
+
+
+# Executa as operações com um backend por worker (malha fechada): o worker w atende
+# as posições w, w + workers, ... até acabar a sequência ou passar `duration` segundos.
+# Latência, throughput e linhas afetadas (escritas) são separados por tipo de operação.
+def run_mixed(backends, operations, duration=None, stop_event=None, log_fn=None):
+    workers = len(backends)
+    stop_event = stop_event or threading.Event()
+    histograms = [{} for _ in range(workers)]
+    errors = [{} for _ in range(workers)]
+    affected = [{} for _ in range(workers)]
+    barrier = threading.Barrier(workers + 1)
+    deadline = [float("inf")]
+
+    def worker(w):
+        backend, hists, errs, rows = backends[w], histograms[w], errors[w], affected[w]
+        barrier.wait()
+        for i in range(w, len(operations), workers):
+            if stop_event.is_set() or time.perf_counter() >= deadline[0]:
+                break
+            op = operations[i]
+            t0 = time.perf_counter_ns()
+            try:
+                count = _execute(backend, op)
+            except Exception:
+                errs[op[0]] = errs.get(op[0], 0) + 1
+                continue
+            hist = hists.get(op[0])
+            if hist is None:
+                hist = hists[op[0]] = LatencyHistogram()
+            hist.record(time.perf_counter_ns() - t0)
+            if count is not None:
+                rows[op[0]] = rows.get(op[0], 0) + count
+
+    threads = [threading.Thread(target=worker, args=(w,), daemon=True) for w in range(workers)]
+    for t in threads:
+        t.start()
+    start = time.perf_counter()
+    if duration:
+        deadline[0] = start + duration
+    barrier.wait()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    by_type = {}
+    for w in range(workers):
+        for name, hist in histograms[w].items():
+            by_type.setdefault(name, LatencyHistogram()).merge(hist)
+    total = LatencyHistogram()
+    for hist in by_type.values():
+        total.merge(hist)
+
+    result = {
+        "workers": workers,
+        "operations": total.count,
+        "errors": {name: sum(e.get(name, 0) for e in errors) for name in OPERATION_TYPES
+                   if any(name in e for e in errors)},
+        "elapsed": elapsed,
+        "throughput": total.count / elapsed if elapsed > 0 else 0,
+        "latency": total,
+        "by_type": by_type,
+        "rows_affected": {name: sum(a.get(name, 0) for a in affected) for name in OPERATION_TYPES
+                          if any(name in a for a in affected)},
+    }
+    if log_fn:
+        log_fn(f"{result['operations']} operações em {elapsed:.2f} s: {result['throughput']:.2f} ops/s "
+               f"(erros: {sum(result['errors'].values())})")
+        for name, hist in by_type.items():
+            rows = result["rows_affected"].get(name)
+            suffix = f" | {rows / hist.count:.2f} linhas/op" if rows is not None and hist.count else ""
+            log_fn(f"  {name}: {hist.count / elapsed:.2f} ops/s | {hist.format()}{suffix}")
+    return result
+
+
+# Uma linha por tipo de operação: proporção executada, throughput, linhas afetadas e percentis
+def results_table(result):
+    rows = []
+    for name, hist in result["by_type"].items():
+        summary = hist.summary()
+        rows.append({
+            "operation": name,
+            "count": hist.count,
+            "share": hist.count / result["operations"] if result["operations"] else 0,
+            "throughput": hist.count / result["elapsed"] if result["elapsed"] > 0 else 0,
+            "errors": result["errors"].get(name, 0),
+            "rows_affected": result["rows_affected"].get(name),
+            "rows_per_op": result["rows_affected"][name] / hist.count
+            if name in result["rows_affected"] and hist.count else None,
+            **{k: v for k, v in summary.items() if k.endswith("_ms")},
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    import argparse
+    from backends import create_backend
+    from dataset import load_dataset
+    from results_store import backend_params, record_run
+
+    parser = argparse.ArgumentParser(description="Carga mista leitura/escrita no estilo YCSB")
+    parser.add_argument("backend", choices=["sqlserver", "mongo", "sqlite"])
+    parser.add_argument("--preset", default="P", choices=sorted(PRESETS))
+    parser.add_argument("--mix", default=None, help="proporções customizadas, ex.: read=0.8,update=0.2")
+    parser.add_argument("--operations", type=int, default=100_000)
+    parser.add_argument("--duration", type=float, default=None, help="limite em segundos")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    mix = resolve_mix(args.preset, args.mix)
+    backends = [create_backend(args.backend, pool_size=args.workers) for _ in range(args.workers)]
+    loader = backends[0]
+    loader.connect(warm=args.workers, log_fn=print)
+
+    df = load_dataset(log_fn=print)
+    print("Inserindo dados para benchmark...")
+    loader.prepare_dataset(df)
+    loader.insert_batch(loader.prepare_batch(df))
+
+    print("Gerando operações: " + ", ".join(f"{name} {ratio:.0%}" for name, ratio in mix.items()))
+    operations = generate_operations(df, mix, args.operations, args.seed)
+    try:
+        result = run_mixed(backends, operations, args.duration, log_fn=print)
+        print(results_table(result).to_string(index=False))
+        record_run(loader.name, f"mista_{args.preset if not args.mix else 'custom'}", result["throughput"],
+                   result["elapsed"], result["operations"], dataset_rows=len(df),
+                   params=backend_params(loader, mix=mix, workers=args.workers),
+                   latency={"total": result["latency"], **result["by_type"]}, extra={"errors": result["errors"], "rows_affected": result["rows_affected"]})
+    finally:
+        loader.teardown()
+        for backend in backends:
+            backend.close()
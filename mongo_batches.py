@@ -0,0 +1,60 @@
+import copy
+import os
+import struct
+import time
+import bson
+from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+
+# Elemento BSON do _id: tipo 0x07 (ObjectId) + nome "_id" terminado em 0x00
+_ID_PREFIX = b"\x07_id\x00"
+_ID_ELEMENT_SIZE = len(_ID_PREFIX) + 12
+
+
+# Codifica cada documento (sem _id) uma única vez, antes do loop de inserção
+def encode_templates(records):
+    return [bson.encode({k: v for k, v in doc.items() if k != "_id"}) for doc in records]
+
+
+# ObjectIds do lote: timestamp + 5 bytes aleatórios sorteados por lote + contador de 3 bytes
+# (mesmo layout do ObjectId, sem o custo de instanciar um objeto por documento)
+def _object_ids(n):
+    if n > 0xFFFFFF:
+        return [ObjectId().binary for _ in range(n)]
+    prefix = struct.pack(">I", int(time.time())) + os.urandom(5)
+    return [prefix + i.to_bytes(3, "big") for i in range(n)]
+
+
+# Monta um lote novo a partir dos templates já codificados: apenas o _id é gerado,
+# o restante dos bytes é reaproveitado e o driver envia o RawBSONDocument sem recodificar.
+def fresh_batch(templates):
+    pack = struct.Struct("<i").pack
+    return [
+        RawBSONDocument(b"".join((pack(len(body) + _ID_ELEMENT_SIZE), _ID_PREFIX, oid, body[4:])))
+        for body, oid in zip(templates, _object_ids(len(templates)))
+    ]
+
+
+# Custo de preparação no cliente por lote: deepcopy + codificação BSON (caminho antigo,
+# que o insert_many fazia a cada iteração) contra a montagem a partir dos templates.
+def measure_prep_cost(records, templates, rounds=3):
+    deepcopy_time = 0.0
+    template_time = 0.0
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for doc in records:
+            bson.encode(copy.deepcopy(doc))
+        deepcopy_time += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        fresh_batch(templates)
+        template_time += time.perf_counter() - t0
+
+    deepcopy_time /= rounds
+    template_time /= rounds
+    return {
+        "deepcopy_s": deepcopy_time,
+        "template_s": template_time,
+        "saved_s": deepcopy_time - template_time,
+        "speedup": deepcopy_time / template_time if template_time > 0 else 0,
+    }
@@ -0,0 +1,136 @@
+import json
+import os
+import time
+
+from config import get_results_dir
+from latency import LatencyHistogram
+
+
+# Índices de campo único para cada campo consultado e, opcionalmente, compostos
+# (compound: lista de tuplas de campos). Devolve os nomes criados.
+def create_indexes(collection, fields, compound=None):
+    names = [collection.create_index([(field, 1)]) for field in fields]
+    for combo in compound or ():
+        names.append(collection.create_index([(field, 1) for field in combo]))
+    return names
+
+
+# Índices compostos do .env (MONGO_COMPOUND_INDEXES), ex.: "customer_state,order_status;seller_id,price"
+def compound_from_env():
+    spec = os.getenv("MONGO_COMPOUND_INDEXES", "")
+    return [tuple(f.strip() for f in combo.split(",") if f.strip()) for combo in spec.split(";") if combo.strip()]
+
+
+# MONGO_COMPARE_INDEXES no .env (true/false): o benchmark_mongo_app.py mede o workload sem e com
+# índices, separado por plano (IXSCAN/COLLSCAN); MONGO_INDEX_QUERIES é o número de consultas por fase
+def settings_from_env():
+    compare = os.getenv("MONGO_COMPARE_INDEXES", "false").lower() in ("1", "true", "yes", "sim")
+    queries = int(os.getenv("MONGO_INDEX_QUERIES", "1000") or 1000)
+    if queries < 1:
+        raise ValueError("MONGO_INDEX_QUERIES deve ser >= 1")
+    return compare, queries
+
+
+def drop_indexes(collection):
+    collection.drop_indexes()
+
+
+def _stages(node):
+    if isinstance(node, dict):
+        if "stage" in node:
+            yield node["stage"]
+        for value in node.values():
+            yield from _stages(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _stages(item)
+
+
+# Classifica o plano vencedor do explain(): IXSCAN quando algum estágio usa índice,
+# COLLSCAN quando varre a coleção (também cobre o formato do SBE, em winningPlan.queryPlan)
+def plan_type(explain):
+    stages = set(_stages(explain.get("queryPlanner", {}).get("winningPlan", {})))
+    if any(stage in ("IXSCAN", "IDHACK", "EXPRESS_IXSCAN", "EXPRESS_IDHACK") for stage in stages):
+        return "IXSCAN"
+    if "COLLSCAN" in stages:
+        return "COLLSCAN"
+    return "/".join(sorted(stages)) or "DESCONHECIDO"
+
+
+def _explain(collection, key, value):
+    explain = collection.find({key: value}).limit(1).explain()
+    winning = explain.get("queryPlanner", {}).get("winningPlan", {})
+    return {"field": key, "value": str(value), "plan": plan_type(explain), "stages": sorted(set(_stages(winning)))}
+
+
+# Captura o explain() das primeiras `sample_size` consultas do workload e de uma consulta
+# de cada campo restante; devolve o plano por campo e os planos capturados
+def capture_plans(collection, operations, sample_size=50):
+    captured = [_explain(collection, key, value) for key, value in operations[:sample_size]]
+    plans = {}
+    for entry in captured:
+        plans.setdefault(entry["field"], entry["plan"])
+    for key, value in operations:
+        if key not in plans:
+            entry = _explain(collection, key, value)
+            captured.append(entry)
+            plans[key] = entry["plan"]
+    return plans, captured
+
+
+# Executa o workload separando throughput e latência pelo tipo de plano de cada campo
+def run_split_by_plan(backend, operations, plans, total_queries=1000):
+    histograms = {}
+    elapsed = {}
+    for i in range(total_queries):
+        key, value = operations[i % len(operations)]
+        plan = plans.get(key, "DESCONHECIDO")
+        hist = histograms.setdefault(plan, LatencyHistogram())
+        t0 = time.perf_counter_ns()
+        backend.point_query(key, value)
+        spent = time.perf_counter_ns() - t0
+        hist.record(spent)
+        elapsed[plan] = elapsed.get(plan, 0) + spent
+
+    return {
+        plan: {
+            "queries": hist.count,
+            "elapsed": elapsed[plan] / 1e9,
+            "throughput": hist.count / (elapsed[plan] / 1e9) if elapsed[plan] else 0,
+            "latency": hist,
+        }
+        for plan, hist in histograms.items()
+    }
+
+
+def save_plans(captured, name):
+    path = os.path.join(get_results_dir(), f"explain_{name}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(captured, f, ensure_ascii=False, indent=2)
+    return path
+
+
+# Mesmo workload sem índices (só _id) e com índices nos campos consultados;
+# para cada fase registra os planos e o desempenho por tipo de plano
+def run_index_benchmark(backend, operations, compound=None, total_queries=1000, sample_size=50, log_fn=print):
+    collection = backend.collection
+    fields = sorted({key for key, _ in operations})
+    results = {}
+    for phase in ("sem índices", "com índices"):
+        if phase == "com índices":
+            log_fn(f"Criando índices em {len(fields)} campos" + (f" e {len(compound)} compostos..." if compound else "..."))
+            create_indexes(collection, fields, compound)
+        else:
+            drop_indexes(collection)
+
+        plans, captured = capture_plans(collection, operations, sample_size)
+        log_fn(f"[{phase}] Planos: " + ", ".join(f"{field}={plan}" for field, plan in sorted(plans.items())))
+        log_fn(f"[{phase}] Explain exportado em: {save_plans(captured, phase.replace(' ', '_').replace('í', 'i'))}")
+
+        split = run_split_by_plan(backend, operations, plans, total_queries)
+        for plan, r in split.items():
+            log_fn(f"[{phase}] {plan}: {r['queries']} consultas, {r['throughput']:.2f} consultas/segundo | {r['latency'].format()}")
+        results[phase] = {"plans": plans, "split": split}
+
+    drop_indexes(collection)
+    return results
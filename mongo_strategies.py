@@ -0,0 +1,113 @@
+import itertools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from pymongo import InsertOne
+
+from mongo_batches import encode_templates, fresh_batch
+
+METHODS = ("insert_many", "bulk_write")
+
+
+# Estratégia de escrita no MongoDB: tamanho do lote, semântica ordered,
+# método (insert_many ou bulk_write de InsertOne) e lotes enviados em paralelo
+@dataclass(frozen=True)
+class MongoInsertStrategy:
+    batch_size: int = 1000
+    ordered: bool = True
+    method: str = "insert_many"
+    concurrency: int = 1
+
+    def label(self):
+        order = "ordered" if self.ordered else "unordered"
+        return f"{self.method} lote={self.batch_size} {order} x{self.concurrency}"
+
+
+# Estratégia definida no .env (MONGO_BATCH_SIZE, MONGO_ORDERED, MONGO_BULK_METHOD,
+# MONGO_INSERT_CONCURRENCY); sem MONGO_BATCH_SIZE mantém o insert_many único
+def strategy_from_env():
+    batch_size = int(os.getenv("MONGO_BATCH_SIZE", "0") or 0)
+    if batch_size <= 0:
+        return None
+    method = os.getenv("MONGO_BULK_METHOD", "insert_many")
+    if method not in METHODS:
+        raise ValueError(f"MONGO_BULK_METHOD inválido: {method} (opções: {', '.join(METHODS)})")
+    return MongoInsertStrategy(
+        batch_size=batch_size,
+        ordered=os.getenv("MONGO_ORDERED", "true").lower() in ("1", "true", "yes", "sim"),
+        method=method,
+        concurrency=max(1, int(os.getenv("MONGO_INSERT_CONCURRENCY", "1"))),
+    )
+
+
+def _submit(collection, docs, strategy):
+    t0 = time.perf_counter_ns()
+    if strategy.method == "bulk_write":
+        collection.bulk_write([InsertOne(doc) for doc in docs], ordered=strategy.ordered)
+    else:
+        collection.insert_many(docs, ordered=strategy.ordered)
+    return time.perf_counter_ns() - t0
+
+
+# Insere `docs` segundo a estratégia e devolve a latência de cada lote (ns)
+def insert_with_strategy(collection, docs, strategy):
+    batches = [docs[i:i + strategy.batch_size] for i in range(0, len(docs), strategy.batch_size)]
+    if strategy.concurrency <= 1:
+        return [_submit(collection, batch, strategy) for batch in batches]
+    with ThreadPoolExecutor(max_workers=strategy.concurrency) as pool:
+        return list(pool.map(lambda batch: _submit(collection, batch, strategy), batches))
+
+
+def run_strategy(collection, templates, strategy):
+    docs = fresh_batch(templates)
+    start = time.perf_counter()
+    latencies = insert_with_strategy(collection, docs, strategy)
+    elapsed = time.perf_counter() - start
+    lat_ms = np.asarray(latencies) / 1e6
+    return {
+        "strategy": strategy.label(),
+        "batch_size": strategy.batch_size,
+        "ordered": strategy.ordered,
+        "method": strategy.method,
+        "concurrency": strategy.concurrency,
+        "rows": len(docs),
+        "batches": len(latencies),
+        "elapsed": elapsed,
+        "throughput": len(docs) / elapsed if elapsed > 0 else 0,
+        "batch_ms_mean": float(lat_ms.mean()),
+        "batch_ms_p50": float(np.percentile(lat_ms, 50)),
+        "batch_ms_p99": float(np.percentile(lat_ms, 99)),
+        "batch_ms_max": float(lat_ms.max()),
+    }
+
+
+# Executa todas as combinações e devolve uma tabela ordenada por throughput.
+# Os documentos são codificados uma vez; cada rodada recebe _id novos e começa com a coleção vazia.
+def sweep(backend, df, batch_sizes=(100, 1000, 10000), ordered=(True, False),
+          methods=METHODS, concurrency=(1, 4), log_fn=None):
+    templates = encode_templates(backend.prepare_batch(df))
+    collection = backend.collection
+    rows = []
+    for batch_size, is_ordered, method, workers in itertools.product(batch_sizes, ordered, methods, concurrency):
+        strategy = MongoInsertStrategy(batch_size, is_ordered, method, workers)
+        collection.delete_many({})
+        result = run_strategy(collection, templates, strategy)
+        rows.append(result)
+        if log_fn:
+            log_fn(f"{result['strategy']}: {result['throughput']:.2f} linhas/segundo, "
+                   f"lote p50 {result['batch_ms_p50']:.1f} ms / p99 {result['batch_ms_p99']:.1f} ms")
+    collection.delete_many({})
+    return pd.DataFrame(rows).sort_values("throughput", ascending=False, ignore_index=True)
+
+
+if __name__ == "__main__":
+    from backends import create_backend
+    from dataset import load_dataset
+
+    backend = create_backend("mongo")
+    backend.connect()
+    result = sweep(backend, load_dataset(), log_fn=print)
+    print(result.to_string(index=False))
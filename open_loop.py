@@ -0,0 +1,120 @@
+import threading
+import time
+
+from latency import LatencyHistogram
+
+# Atraso máximo (ns) em relação ao horário planejado para considerar o envio "no horário"
+DEFAULT_TOLERANCE_NS = 1_000_000
+
+
+# Gerador de carga em malha aberta: a operação i é planejada para start + i/rate,
+# independentemente de quanto as anteriores demoraram. A latência é medida a partir do
+# horário planejado (e não do envio real), então um travamento do servidor aparece no
+# histograma em vez de simplesmente reduzir o número de requisições (coordinated omission).
+# Cada worker tem o seu backend e atende as posições i = w, w + workers, w + 2*workers, ...
+def run_open_loop(backends, operations, rate, duration, stop_event=None,
+                  tolerance_ns=DEFAULT_TOLERANCE_NS, log_fn=None):
+    workers = len(backends)
+    interval_ns = 1e9 / rate
+    total_ops = int(rate * duration)
+    stop_event = stop_event or threading.Event()
+
+    latency = [LatencyHistogram() for _ in range(workers)]
+    service = [LatencyHistogram() for _ in range(workers)]
+    missed = [0] * workers
+    errors = [0] * workers
+    done = [0] * workers
+
+    start_ns = time.perf_counter_ns() + 10_000_000  # 10 ms para todas as threads iniciarem
+
+    def worker(w):
+        backend = backends[w]
+        for i in range(w, total_ops, workers):
+            if stop_event.is_set():
+                break
+            intended = start_ns + int(i * interval_ns)
+            delay = intended - time.perf_counter_ns()
+            if delay > 0:
+                time.sleep(delay / 1e9)
+            sent = time.perf_counter_ns()
+            if sent - intended > tolerance_ns:
+                missed[w] += 1
+            key, value = operations[i % len(operations)]
+            try:
+                backend.point_query(key, value)
+            except Exception:
+                errors[w] += 1
+            end = time.perf_counter_ns()
+            latency[w].record(end - intended)
+            service[w].record(end - sent)
+            done[w] += 1
+
+    threads = [threading.Thread(target=worker, args=(w,), daemon=True) for w in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = (time.perf_counter_ns() - start_ns) / 1e9
+
+    latency_hist = LatencyHistogram()
+    service_hist = LatencyHistogram()
+    for w in range(workers):
+        latency_hist.merge(latency[w])
+        service_hist.merge(service[w])
+
+    result = {
+        "target_rate": rate,
+        "operations": sum(done),
+        "elapsed": elapsed,
+        "throughput": sum(done) / elapsed if elapsed > 0 else 0,
+        "missed": sum(missed),
+        "errors": sum(errors),
+        "latency": latency_hist,
+        "service": service_hist,
+    }
+    if log_fn:
+        log_fn(f"Taxa alvo: {rate:.0f} ops/s | obtida: {result['throughput']:.2f} ops/s | "
+               f"fora do horário: {result['missed']} de {result['operations']} | erros: {result['errors']}")
+        log_fn(f"Latência (desde o horário planejado): {latency_hist.format()}")
+        log_fn(f"Tempo de serviço: {service_hist.format()}")
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    from backends import create_backend
+    from dataset import load_dataset
+    from latency import save_histogram
+    from results_store import backend_params, record_run
+    from workload import load_or_create
+
+    parser = argparse.ArgumentParser(description="Consultas pontuais em malha aberta com taxa constante")
+    parser.add_argument("backend", choices=["sqlserver", "mongo", "sqlite"])
+    parser.add_argument("--rate", type=float, default=2000, help="operações por segundo")
+    parser.add_argument("--duration", type=float, default=60, help="segundos")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    backends = [create_backend(args.backend, pool_size=args.workers) for _ in range(args.workers)]
+    loader = backends[0]
+    loader.connect(warm=args.workers, log_fn=print)
+
+    df = load_dataset()
+    print("Inserindo dados para benchmark...")
+    loader.prepare_dataset(df)
+    loader.insert_batch(loader.prepare_batch(df))
+
+    operations = load_or_create(df, seed=args.seed, log_fn=print).operations(df)
+    print(f"Iniciando malha aberta: {args.rate:.0f} ops/s por {args.duration:.0f} s com {args.workers} workers...")
+    try:
+        result = run_open_loop(backends, operations, args.rate, args.duration, log_fn=print)
+        print(f"Histograma exportado em: {save_histogram(result['latency'], f'{args.backend}_malha_aberta')}")
+        record_run(loader.name, "malha_aberta", result["throughput"], result["elapsed"], result["operations"],
+                   dataset_rows=len(df), params=backend_params(loader, rate=args.rate, workers=args.workers),
+                   latency={"latency": result["latency"], "service": result["service"]},
+                   extra={"missed": result["missed"], "errors": result["errors"]})
+    finally:
+        loader.teardown()
+        for backend in backends:
+            backend.close()
@@ -0,0 +1,94 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pandas as pd
+
+from backends import create_backend
+
+
+# Divide o DataFrame em n partições contíguas de tamanho parecido
+def partition(df, n):
+    bounds = [len(df) * i // n for i in range(n + 1)]
+    return [df.iloc[bounds[i]:bounds[i + 1]] for i in range(n)]
+
+
+# Cada worker tem o seu backend (e a sua conexão): prepara o lote fora da medição,
+# espera os demais na barreira e só então insere.
+def _insert_worker(kind, backend_kwargs, part, barrier):
+    backend = create_backend(kind, **backend_kwargs)
+    try:
+        try:
+            backend.connect()
+            batch = backend.prepare_batch(part)
+        except Exception:
+            # Libera os outros workers presos na barreira
+            barrier.abort()
+            raise
+        barrier.wait()
+        start = time.time()
+        rows = backend.insert_batch(batch)
+        end = time.time()
+        return rows, start, end
+    finally:
+        backend.close()
+
+
+# Insere o DataFrame com `workers` threads (ou processos) em paralelo.
+# O pool do backend é dimensionado para `workers`, então cada worker usa a sua conexão.
+def run_parallel_insert(kind, df, workers, executor="thread", backend_kwargs=None):
+    backend_kwargs = dict(backend_kwargs or {})
+    backend_kwargs.setdefault("pool_size", workers)
+
+    backend = create_backend(kind, **backend_kwargs)
+    backend.connect(warm=workers)
+    backend.prepare_dataset(df)
+
+    parts = partition(df, workers)
+    if executor == "process":
+        manager = multiprocessing.Manager()
+        barrier = manager.Barrier(workers)
+        pool = ProcessPoolExecutor(max_workers=workers)
+    else:
+        manager = None
+        barrier = threading.Barrier(workers)
+        pool = ThreadPoolExecutor(max_workers=workers)
+
+    try:
+        with pool:
+            futures = [pool.submit(_insert_worker, kind, backend_kwargs, part, barrier) for part in parts]
+            results = [f.result() for f in futures]
+    finally:
+        if manager is not None:
+            manager.shutdown()
+        backend.teardown()
+        backend.close()
+
+    total_rows = sum(r[0] for r in results)
+    elapsed = max(r[2] for r in results) - min(r[1] for r in results)
+    return {
+        "workers": workers,
+        "rows": total_rows,
+        "elapsed": elapsed,
+        "throughput": total_rows / elapsed if elapsed > 0 else 0,
+        "worker_throughput": [r[0] / (r[2] - r[1]) if r[2] > r[1] else 0 for r in results],
+    }
+
+
+# Varre N = 1, 2, 4, ... até max_workers e monta a curva de escalabilidade
+def scaling_curve(kind, df, max_workers=8, executor="thread", backend_kwargs=None, log_fn=None):
+    rows = []
+    workers = 1
+    while workers <= max_workers:
+        result = run_parallel_insert(kind, df, workers, executor, backend_kwargs)
+        rows.append(result)
+        if log_fn:
+            log_fn(f"{workers} worker(s): {result['throughput']:.2f} linhas/segundo "
+                   f"({result['rows']} linhas em {result['elapsed']:.2f} s)")
+        workers *= 2
+
+    curve = pd.DataFrame(rows).drop(columns=["worker_throughput"])
+    base = curve["throughput"].iloc[0]
+    curve["speedup"] = curve["throughput"] / base if base > 0 else 0
+    curve["efficiency"] = curve["speedup"] / curve["workers"]
+    return curve
@@ -0,0 +1,98 @@
+import os
+import numpy as np
+import pandas as pd
+
+DEFAULT_WARMUP = 1
+DEFAULT_REPETITIONS = 5
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_BOOTSTRAP = 10_000
+# Limite do z-score modificado (mediana/MAD) acima do qual uma amostra é marcada como outlier
+OUTLIER_THRESHOLD = 3.5
+
+
+# Configuração do .env: BENCH_WARMUP (execuções descartadas) e BENCH_REPETITIONS (medidas)
+def settings_from_env():
+    warmup = int(os.getenv("BENCH_WARMUP", DEFAULT_WARMUP))
+    repetitions = int(os.getenv("BENCH_REPETITIONS", DEFAULT_REPETITIONS))
+    if warmup < 0 or repetitions < 1:
+        raise ValueError("BENCH_WARMUP deve ser >= 0 e BENCH_REPETITIONS >= 1")
+    return warmup, repetitions
+
+
+# Marca outliers pelo z-score modificado (0.6745 * |x - mediana| / MAD), robusto a poucas
+# amostras e ao próprio outlier; com MAD zero nenhuma amostra é marcada
+def outlier_mask(samples, threshold=OUTLIER_THRESHOLD):
+    samples = np.asarray(samples, dtype="float64")
+    median = np.median(samples)
+    mad = np.median(np.abs(samples - median))
+    if mad == 0:
+        return np.zeros(len(samples), dtype=bool)
+    return 0.6745 * np.abs(samples - median) / mad > threshold
+
+
+# Intervalo de confiança da média por bootstrap percentil (reamostragens vetorizadas)
+def bootstrap_ci(samples, confidence=DEFAULT_CONFIDENCE, resamples=DEFAULT_BOOTSTRAP, seed=0):
+    samples = np.asarray(samples, dtype="float64")
+    if len(samples) < 2:
+        return float(samples.mean()), float(samples.mean())
+    rng = np.random.default_rng(seed)
+    means = samples[rng.integers(0, len(samples), (resamples, len(samples)))].mean(axis=1)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(means, [alpha, 1 - alpha])
+    return float(low), float(high)
+
+
+def summarize(samples, confidence=DEFAULT_CONFIDENCE, resamples=DEFAULT_BOOTSTRAP):
+    samples = np.asarray(samples, dtype="float64")
+    ci_low, ci_high = bootstrap_ci(samples, confidence, resamples)
+    mean = float(samples.mean())
+    std = float(samples.std(ddof=1)) if len(samples) > 1 else 0.0
+    return {
+        "n": len(samples),
+        "mean": mean,
+        "median": float(np.median(samples)),
+        "std": std,
+        "cv": std / mean if mean else 0.0,
+        "min": float(samples.min()),
+        "max": float(samples.max()),
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+        "confidence": confidence,
+        "outliers": int(outlier_mask(samples).sum()),
+    }
+
+
+# Executa `fn` warmup vezes sem medir e depois `repetitions` vezes, coletando o valor que ela
+# devolve (ex.: throughput de uma inserção). setup/teardown rodam antes/depois de cada execução,
+# inclusive no aquecimento, e ficam fora da medição. Devolve (resumo, DataFrame das amostras).
+def run_repeated(fn, repetitions=DEFAULT_REPETITIONS, warmup=DEFAULT_WARMUP, setup=None, teardown=None,
+                 confidence=DEFAULT_CONFIDENCE, log_fn=None):
+    samples = []
+    for i in range(warmup + repetitions):
+        if setup:
+            setup()
+        try:
+            value = fn()
+        finally:
+            if teardown:
+                teardown()
+        if i < warmup:
+            if log_fn:
+                log_fn(f"Aquecimento {i + 1}/{warmup}: {value:.2f} (descartado)")
+            continue
+        samples.append(value)
+        if log_fn:
+            log_fn(f"Repetição {len(samples)}/{repetitions}: {value:.2f}")
+
+    summary = summarize(samples, confidence)
+    table = pd.DataFrame({"repetition": range(1, len(samples) + 1), "value": samples,
+                          "outlier": outlier_mask(samples)})
+    return summary, table
+
+
+def format_summary(summary, unit=""):
+    unit = f" {unit}" if unit else ""
+    return (f"média {summary['mean']:.2f}{unit} (IC {summary['confidence'] * 100:.0f}%: "
+            f"{summary['ci_low']:.2f} a {summary['ci_high']:.2f}) | mediana {summary['median']:.2f} | "
+            f"desvio padrão {summary['std']:.2f} (CV {summary['cv'] * 100:.1f}%) | "
+            f"n={summary['n']}, outliers={summary['outliers']}")
@@ -0,0 +1,201 @@
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import time
+from importlib import metadata
+import pandas as pd
+
+from config import get_base_path, get_results_dir
+from dataset import get_dataset_source
+from latency import LatencyHistogram
+
+# Versões registradas em cada execução, para comparar antes/depois de uma atualização de driver
+TRACKED_PACKAGES = ("pymongo", "sqlalchemy", "pyodbc", "pandas", "numpy", "pyarrow")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    workload TEXT NOT NULL,
+    dataset TEXT,
+    dataset_rows INTEGER,
+    rows INTEGER,
+    elapsed REAL,
+    throughput REAL,
+    params TEXT,
+    git_commit TEXT,
+    host TEXT,
+    latency TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_runs_backend_workload ON runs (backend, workload, created_at);
+"""
+
+
+# Banco de resultados (RESULTS_DB no .env; padrão results/benchmarks.db)
+def get_results_db_path():
+    return os.getenv("RESULTS_DB") or os.path.join(get_results_dir(), "benchmarks.db")
+
+
+def _connect(path=None):
+    conn = sqlite3.connect(path or get_results_db_path(), timeout=30)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+# Commit atual do repositório (None fora de um checkout git, ex.: executável do PyInstaller)
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=get_base_path(),
+                             capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if out.returncode != 0:
+        return None
+    return out.stdout.strip() or None
+
+
+def host_info():
+    packages = {}
+    for name in TRACKED_PACKAGES:
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            continue
+    return {
+        "hostname": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "packages": packages,
+    }
+
+
+# Configuração do backend que afeta o resultado (estratégia de inserção, cache, pool, índices)
+def backend_params(backend, **extra):
+    params = {}
+    strategy = getattr(backend, "strategy", None)
+    if strategy is not None:
+        params["strategy"] = strategy.label()
+    for attr in ("table_name", "collection_name", "pool_size", "statement_cache"):
+        if hasattr(backend, attr):
+            params[attr] = getattr(backend, attr)
+    if getattr(backend, "schema", None) is not None:
+        params["typed_schema"] = any(spec.kind != "text" for spec in backend.schema)
+    if getattr(backend, "_indexes", None):
+        params["indexes"] = list(backend._indexes)
+    params.update(extra)
+    return params
+
+
+# Registra uma execução e devolve o id. latency: LatencyHistogram (ou dict {nome: histograma}
+# quando a execução tem mais de um, ex.: latência e tempo de serviço)
+def record_run(backend, workload, throughput, elapsed=None, rows=None, dataset=None, dataset_rows=None,
+               params=None, latency=None, extra=None, path=None):
+    if isinstance(latency, LatencyHistogram):
+        latency = {"latency": latency}
+    latency_json = json.dumps({k: h.to_dict() for k, h in latency.items()}) if latency else None
+    if dataset is None:
+        dataset = os.path.basename(get_dataset_source())
+
+    with _connect(path) as conn:
+        cursor = conn.execute(
+            "INSERT INTO runs (created_at, backend, workload, dataset, dataset_rows, rows, elapsed, throughput, "
+            "params, git_commit, host, latency, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (time.strftime("%Y-%m-%dT%H:%M:%S"), backend, workload, dataset, dataset_rows, rows, elapsed,
+             throughput, json.dumps(params or {}, default=str), git_commit(), json.dumps(host_info()),
+             latency_json, json.dumps(extra, default=str) if extra else None),
+        )
+        run_id = cursor.lastrowid
+    conn.close()
+    return run_id
+
+
+# Execuções registradas, mais recentes primeiro, com o resumo da latência principal em colunas
+def query_runs(backend=None, workload=None, since=None, limit=None, path=None):
+    sql = "SELECT * FROM runs WHERE 1 = 1"
+    args = []
+    for column, value in (("backend", backend), ("workload", workload)):
+        if value is not None:
+            sql += f" AND {column} = ?"
+            args.append(value)
+    if since is not None:
+        sql += " AND created_at >= ?"
+        args.append(since)
+    sql += " ORDER BY id DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        args.append(int(limit))
+
+    conn = _connect(path)
+    try:
+        runs = pd.read_sql_query(sql, conn, params=args)
+    finally:
+        conn.close()
+
+    summaries = [_latency_summary(value) for value in runs["latency"]]
+    for key in ("p50_ms", "p99_ms", "max_ms"):
+        runs[key] = [summary.get(key) for summary in summaries]
+    return runs
+
+
+# Latência NULL chega como None ou NaN conforme a versão do pandas
+def _latency_summary(value):
+    if value is None or pd.isna(value) or not value:
+        return {}
+    histograms = json.loads(value)
+    return LatencyHistogram.from_dict(next(iter(histograms.values()))).summary()
+
+
+def load_latency(run_id, name="latency", path=None):
+    conn = _connect(path)
+    try:
+        row = conn.execute("SELECT latency FROM runs WHERE id = ?", (run_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        raise KeyError(f"Execução {run_id} não encontrada")
+    if not row[0]:
+        return None
+    return LatencyHistogram.from_dict(json.loads(row[0])[name])
+
+
+# Compara execuções com a primeira (baseline): variação de throughput e de p50/p99 em %
+def compare_runs(run_ids, path=None):
+    runs = query_runs(path=path).set_index("id")
+    missing = [run_id for run_id in run_ids if run_id not in runs.index]
+    if missing:
+        raise KeyError(f"Execuções não encontradas: {missing}")
+    table = runs.loc[list(run_ids), ["created_at", "backend", "workload", "dataset_rows",
+                                     "git_commit", "throughput", "p50_ms", "p99_ms"]].copy()
+    baseline = table.iloc[0]
+    for column in ("throughput", "p50_ms", "p99_ms"):
+        if pd.notna(baseline[column]) and baseline[column]:
+            table[f"{column}_delta_%"] = (table[column] / baseline[column] - 1) * 100
+    table["git_commit"] = table["git_commit"].str[:8]
+    return table.reset_index()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Histórico de execuções dos benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    list_parser = sub.add_parser("list")
+    list_parser.add_argument("--backend")
+    list_parser.add_argument("--workload")
+    list_parser.add_argument("--limit", type=int, default=20)
+    compare_parser = sub.add_parser("compare")
+    compare_parser.add_argument("ids", type=int, nargs="+", help="a primeira é a referência")
+    args = parser.parse_args()
+
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        if args.command == "list":
+            runs = query_runs(args.backend, args.workload, limit=args.limit)
+            print(runs[["id", "created_at", "backend", "workload", "dataset", "rows",
+                        "throughput", "p50_ms", "p99_ms"]].to_string(index=False))
+        else:
+            print(compare_runs(args.ids).to_string(index=False))
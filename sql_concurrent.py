@@ -0,0 +1,95 @@
+import itertools
+import threading
+import time
+from sqlalchemy import text
+
+from backends import create_backend, dispose_engine
+from latency import LatencyHistogram
+
+
+# Consultas pontuais com `workers` threads disputando um pool de exatamente `workers`
+# conexões (max_overflow=0). Cada consulta faz checkout/devolução da conexão, então a
+# espera no pool é medida separadamente do tempo de execução da consulta.
+# O pool é só desta execução: a engine é descartada ao final (scaling_curve cria uma por N).
+def run_concurrent_queries(kind, operations, workers, total_queries, table_name="olist_dataset", log_fn=None):
+    backend = create_backend(kind, table_name=table_name, pool_size=workers, max_overflow=0)
+    backend.pool_pre_ping = False
+    engine = backend.engine
+    try:
+        return _run_concurrent(backend, engine, operations, workers, total_queries, log_fn)
+    finally:
+        backend.close()
+        dispose_engine(engine)
+
+
+def _run_concurrent(backend, engine, operations, workers, total_queries, log_fn):
+    backend.connect(warm=workers, log_fn=log_fn)
+
+    counter = itertools.count()
+    wait = [LatencyHistogram() for _ in range(workers)]
+    query = [LatencyHistogram() for _ in range(workers)]
+    errors = [0] * workers
+    barrier = threading.Barrier(workers)
+
+    def worker(w):
+        statements = {}
+        barrier.wait()
+        while True:
+            i = next(counter)
+            if i >= total_queries:
+                break
+            key, value = operations[i % len(operations)]
+            stmt = statements.get(key)
+            if stmt is None:
+                stmt = statements[key] = text(backend.select_one_sql(key))
+            t0 = time.perf_counter_ns()
+            conn = engine.connect()
+            t1 = time.perf_counter_ns()
+            try:
+                conn.execute(stmt, {"val": value}).fetchone()
+                query[w].record(time.perf_counter_ns() - t1)
+            except Exception:
+                errors[w] += 1
+            finally:
+                conn.close()
+            wait[w].record(t1 - t0)
+
+    threads = [threading.Thread(target=worker, args=(w,), daemon=True) for w in range(workers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    wait_hist = LatencyHistogram()
+    query_hist = LatencyHistogram()
+    for w in range(workers):
+        wait_hist.merge(wait[w])
+        query_hist.merge(query[w])
+
+    result = {
+        "workers": workers,
+        "queries": query_hist.count,
+        "errors": sum(errors),
+        "elapsed": elapsed,
+        "throughput": query_hist.count / elapsed if elapsed > 0 else 0,
+        "per_worker": [h.count for h in query],
+        "query": query_hist,
+        "pool_wait": wait_hist,
+    }
+    if log_fn:
+        log_fn(f"{workers} threads: {result['throughput']:.2f} consultas/segundo ({result['errors']} erros)")
+        log_fn(f"  Consulta: {query_hist.format()}")
+        log_fn(f"  Espera no pool: {wait_hist.format()}")
+    return result
+
+
+# Repete com 1, 2, 4, ... até max_workers threads
+def scaling_curve(kind, operations, max_workers=16, total_queries=1000, table_name="olist_dataset", log_fn=None):
+    results = []
+    workers = 1
+    while workers <= max_workers:
+        results.append(run_concurrent_queries(kind, operations, workers, total_queries, table_name, log_fn))
+        workers *= 2
+    return results
@@ -0,0 +1,144 @@
+import os
+import re
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+# Maior chave de índice nonclustered no SQL Server: 1700 bytes = NVARCHAR(850)
+MAX_INDEXABLE_NVARCHAR = 850
+_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$")
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    name: str
+    kind: str        # int | bigint | decimal | float | bool | datetime | text
+    sql_type: str
+    length: int = None
+
+    @property
+    def indexable(self):
+        if self.sql_type == "NVARCHAR(MAX)":
+            return False
+        return self.length is None or self.length <= MAX_INDEXABLE_NVARCHAR
+
+
+def _decimal_places(values, max_scale=6):
+    for scale in range(max_scale + 1):
+        if np.allclose(values, np.round(values, scale), rtol=0, atol=1e-9):
+            return scale
+    return None
+
+
+def _text_length(values):
+    longest = int(values.astype(str).str.len().max())
+    length = 16
+    while length < longest:
+        length *= 2
+    return length
+
+
+def _infer_column(name, series, dialect):
+    values = series.dropna()
+    sqlite = dialect == "sqlite"
+
+    if pd.api.types.is_bool_dtype(series):
+        return ColumnSpec(name, "bool", "INTEGER" if sqlite else "BIT")
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return ColumnSpec(name, "datetime", "TEXT" if sqlite else "DATETIME2")
+
+    if pd.api.types.is_numeric_dtype(series):
+        numbers = values.to_numpy(dtype="float64")
+        if len(numbers) == 0 or np.all(np.mod(numbers, 1) == 0):
+            if len(numbers) and (numbers.min() < -2**31 or numbers.max() >= 2**31):
+                return ColumnSpec(name, "bigint", "INTEGER" if sqlite else "BIGINT")
+            return ColumnSpec(name, "int", "INTEGER" if sqlite else "INT")
+        scale = _decimal_places(numbers)
+        if scale is None or sqlite:
+            return ColumnSpec(name, "float", "REAL" if sqlite else "FLOAT")
+        digits = len(str(int(np.abs(numbers).max())))
+        return ColumnSpec(name, "decimal", f"DECIMAL({min(38, digits + scale)}, {scale})")
+
+    text = values.astype(str)
+    if len(text) and text.str.match(_DATE_PATTERN).all():
+        if sqlite:
+            return ColumnSpec(name, "datetime", "TEXT")
+        fractional = text.str.contains(r"\.\d", regex=True).any()
+        return ColumnSpec(name, "datetime", "DATETIME2" if fractional else "DATETIME2(0)")
+
+    if sqlite:
+        return ColumnSpec(name, "text", "TEXT")
+    length = _text_length(text) if len(text) else 16
+    if length > 4000:
+        return ColumnSpec(name, "text", "NVARCHAR(MAX)", None)
+    return ColumnSpec(name, "text", f"NVARCHAR({length})", length)
+
+
+# Tipos SQL a partir dos dtypes do DataFrame: INT/BIGINT, DECIMAL(p,s), DATETIME2 e
+# NVARCHAR dimensionado (em vez de NVARCHAR(MAX) para todas as colunas)
+def infer_schema(df, dialect="mssql"):
+    return [_infer_column(col, df[col], dialect) for col in df.columns]
+
+
+# Esquema antigo: tudo NVARCHAR(MAX) (TEXT no SQLite), sem chaves nem índices
+def untyped_schema(df, dialect="mssql"):
+    sql_type = "TEXT" if dialect == "sqlite" else "NVARCHAR(MAX)"
+    return [ColumnSpec(col, "text", sql_type) for col in df.columns]
+
+
+def create_table_sql(table_name, schema):
+    columns_def = ", ".join(f"[{spec.name}] {spec.sql_type}" for spec in schema)
+    return f"CREATE TABLE {table_name} ({columns_def});"
+
+
+# Converte as colunas para os tipos do esquema antes do to_sql (datas como datetime, inteiros
+# anuláveis como Int64) para o driver enviar parâmetros já no tipo da coluna
+def coerce_frame(df, schema):
+    df = df.copy()
+    for spec in schema:
+        if spec.kind == "datetime" and spec.sql_type != "TEXT":
+            df[spec.name] = pd.to_datetime(df[spec.name], errors="coerce")
+        elif spec.kind in ("int", "bigint"):
+            df[spec.name] = df[spec.name].astype("Int64")
+    return df
+
+
+def index_name(table_name, column, clustered=False):
+    prefix = "cx" if clustered else "ix"
+    return f"{prefix}_{table_name}_{re.sub(r'[^0-9A-Za-z_]', '_', column)}"
+
+
+# Pares (nome, CREATE INDEX) para as colunas consultadas; colunas não indexáveis são ignoradas.
+# clustered: coluna que recebe o índice clustered (apenas SQL Server)
+def create_index_sql(table_name, schema, columns, clustered=None, dialect="mssql"):
+    specs = {spec.name: spec for spec in schema}
+    statements = []
+    skipped = []
+    # O clustered vem primeiro para não reconstruir os nonclustered já criados
+    columns = sorted(dict.fromkeys(columns), key=lambda col: col != clustered)
+    for col in columns:
+        spec = specs.get(col)
+        if spec is None or not spec.indexable:
+            skipped.append(col)
+            continue
+        if col == clustered and dialect == "mssql":
+            name = index_name(table_name, col, True)
+            statements.append((name, f"CREATE CLUSTERED INDEX {name} ON {table_name} ([{col}]);"))
+        else:
+            name = index_name(table_name, col)
+            statements.append((name, f"CREATE INDEX {name} ON {table_name} ([{col}]);"))
+    return statements, skipped
+
+
+INDEX_MODES = ("none", "nonclustered", "clustered")
+
+
+# Configuração do .env: SQL_TYPED_SCHEMA (true/false), SQL_INDEXES (none | nonclustered |
+# clustered) e SQL_CLUSTERED_COLUMN (coluna do índice clustered no modo clustered)
+def settings_from_env():
+    typed = os.getenv("SQL_TYPED_SCHEMA", "true").lower() in ("1", "true", "yes", "sim")
+    mode = os.getenv("SQL_INDEXES", "none")
+    if mode not in INDEX_MODES:
+        raise ValueError(f"SQL_INDEXES inválido: {mode} (opções: {', '.join(INDEX_MODES)})")
+    clustered = os.getenv("SQL_CLUSTERED_COLUMN", "order_id") if mode == "clustered" else None
+    return typed, mode, clustered
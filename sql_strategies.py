@@ -0,0 +1,138 @@
+import itertools
+import os
+import time
+from dataclasses import dataclass
+import pandas as pd
+
+METHODS = ("executemany", "multi", "raw")
+TRANSACTIONS = ("single", "per_chunk")
+
+# Limite de parâmetros por comando de cada dialeto (o INSERT multi-row precisa caber nele)
+MAX_PARAMS = {"mssql": 2100, "sqlite": 999}
+
+
+# Estratégia de escrita SQL:
+#   executemany - df.to_sql padrão (fast_executemany no SQL Server)
+#   multi       - df.to_sql(method="multi"), um INSERT com várias linhas em VALUES
+#   raw         - cursor DBAPI direto com as linhas pré-montadas em tuplas
+#                 (no pyodbc, fast_executemany envia o array de parâmetros de uma vez)
+# transaction: "single" (um commit no fim) ou "per_chunk" (commit a cada chunk)
+@dataclass(frozen=True)
+class SqlInsertStrategy:
+    method: str = "executemany"
+    chunksize: int = None
+    transaction: str = "single"
+
+    def label(self):
+        return f"{self.method} chunk={self.chunksize or 'tudo'} {self.transaction}"
+
+
+# Estratégia definida no .env (SQL_INSERT_METHOD, SQL_CHUNKSIZE, SQL_TRANSACTION);
+# sem SQL_INSERT_METHOD mantém o df.to_sql padrão
+def strategy_from_env():
+    method = os.getenv("SQL_INSERT_METHOD", "")
+    if not method:
+        return None
+    if method not in METHODS:
+        raise ValueError(f"SQL_INSERT_METHOD inválido: {method} (opções: {', '.join(METHODS)})")
+    transaction = os.getenv("SQL_TRANSACTION", "single")
+    if transaction not in TRANSACTIONS:
+        raise ValueError(f"SQL_TRANSACTION inválido: {transaction} (opções: {', '.join(TRANSACTIONS)})")
+    return SqlInsertStrategy(method, int(os.getenv("SQL_CHUNKSIZE", "0") or 0) or None, transaction)
+
+
+# Linhas como tuplas de tipos nativos (NaN -> None), prontas para executemany
+def to_rows(df):
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+
+def _effective_chunksize(engine, df, strategy):
+    chunksize = strategy.chunksize or len(df) or 1
+    if strategy.method == "multi":
+        limit = MAX_PARAMS.get(engine.dialect.name, 999)
+        chunksize = min(chunksize, max(1, (limit - 1) // max(1, len(df.columns))))
+    return chunksize
+
+
+def _insert_raw(engine, table_name, df, rows, chunksize, transaction):
+    columns = ", ".join(f"[{col}]" for col in df.columns)
+    marks = ", ".join("?" for _ in df.columns)
+    sql = f"INSERT INTO {table_name} ({columns}) VALUES ({marks})"
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if engine.dialect.name == "mssql":
+            cursor.fast_executemany = True
+        for i in range(0, len(rows), chunksize):
+            cursor.executemany(sql, rows[i:i + chunksize])
+            if transaction == "per_chunk":
+                raw.commit()
+        raw.commit()
+        cursor.close()
+    finally:
+        raw.close()
+
+
+# Insere o DataFrame na tabela segundo a estratégia; `rows` (to_rows) pode vir
+# pré-montado para que a conversão fique fora da medição no modo raw
+def insert_with_strategy(engine, table_name, df, strategy, rows=None):
+    chunksize = _effective_chunksize(engine, df, strategy)
+    if strategy.method == "raw":
+        _insert_raw(engine, table_name, df, rows if rows is not None else to_rows(df), chunksize, strategy.transaction)
+        return len(df)
+
+    method = "multi" if strategy.method == "multi" else None
+    if strategy.transaction == "single":
+        with engine.begin() as conn:
+            df.to_sql(table_name, con=conn, if_exists="append", index=False, chunksize=chunksize, method=method)
+    else:
+        for i in range(0, len(df), chunksize):
+            with engine.begin() as conn:
+                df.iloc[i:i + chunksize].to_sql(table_name, con=conn, if_exists="append", index=False, method=method)
+    return len(df)
+
+
+def run_strategy(backend, df, strategy, rows=None):
+    backend.prepare_dataset(df)
+    start = time.perf_counter()
+    inserted = insert_with_strategy(backend.engine, backend.table_name, df, strategy, rows)
+    elapsed = time.perf_counter() - start
+    return {
+        "strategy": strategy.label(),
+        "method": strategy.method,
+        "chunksize": strategy.chunksize,
+        "transaction": strategy.transaction,
+        "rows": inserted,
+        "elapsed": elapsed,
+        "throughput": inserted / elapsed if elapsed > 0 else 0,
+    }
+
+
+# Executa todas as combinações e devolve uma tabela ordenada por throughput
+def sweep(backend, df, methods=METHODS, chunksizes=(None, 1000, 10000), transactions=TRANSACTIONS, log_fn=None):
+    rows = to_rows(df)
+    results = []
+    for method, chunksize, transaction in itertools.product(methods, chunksizes, transactions):
+        result = run_strategy(backend, df, SqlInsertStrategy(method, chunksize, transaction), rows)
+        results.append(result)
+        if log_fn:
+            log_fn(f"{result['strategy']}: {result['throughput']:.2f} linhas/segundo ({result['elapsed']:.2f} s)")
+    backend.teardown()
+
+    table = pd.DataFrame(results).sort_values("throughput", ascending=False, ignore_index=True)
+    table["vs_default"] = table["throughput"] / table.loc[table["strategy"] == SqlInsertStrategy().label(), "throughput"].max()
+    return table
+
+
+if __name__ == "__main__":
+    import sys
+    from backends import create_backend
+    from dataset import load_dataset
+
+    # python sql_strategies.py [sqlserver|sqlite]
+    backend = create_backend(sys.argv[1] if len(sys.argv) > 1 else "sqlserver")
+    backend.connect(log_fn=print)
+    result = sweep(backend, load_dataset(), log_fn=print)
+    print(result.to_string(index=False))
+    backend.close()
@@ -0,0 +1,214 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from config import get_base_path
+
+try:
+    import pyarrow as pa
+except ImportError:  # sem pyarrow só o modo de inserção em streaming funciona
+    pa = None
+
+DEFAULT_CHUNKSIZE = 1_000_000
+# Colunas de texto com mais valores distintos que esta fração das linhas são tratadas como chaves
+KEY_RATIO = 0.5
+# Linhas usadas para decidir se uma coluna de texto contém datas
+DATE_SAMPLE = 1000
+
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mix(keys):
+    # splitmix64: espalha chaves sequenciais em valores pseudoaleatórios, de forma determinística
+    z = keys * np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * _MIX_1
+    z = (z ^ (z >> np.uint64(27))) * _MIX_2
+    return z ^ (z >> np.uint64(31))
+
+
+# Datas em texto (ex.: "2017-10-02 10:56:33" no CSV) -> datetime64; None se a amostra não é de datas
+def _parse_dates(values):
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    if not len(values):
+        return None
+    try:
+        pd.to_datetime(values.head(DATE_SAMPLE).astype(str), format="ISO8601")
+    except (ValueError, TypeError, OverflowError):
+        return None
+    dates = pd.to_datetime(values.astype(str), format="ISO8601", errors="coerce")
+    return dates.dropna() if dates.notna().any() else None
+
+
+# Perfil de uma coluna: taxa de nulos e, conforme o conteúdo, o intervalo das datas (sorteadas
+# de forma uniforme entre o mínimo e o máximo observados), as frequências dos valores observados
+# (amostradas com as mesmas probabilidades) ou o tamanho das chaves hexadecimais
+class ColumnProfile:
+    def __init__(self, name, dtype, null_rate, values=None, probs=None, key_ratio=None, key_length=None,
+                 date_range=None, date_format=None):
+        self.name = name
+        self.dtype = dtype
+        self.null_rate = null_rate
+        self.values = values
+        self.probs = probs
+        self.key_ratio = key_ratio
+        self.key_length = key_length
+        self.date_range = date_range
+        self.date_format = date_format
+
+    @classmethod
+    def from_series(cls, series):
+        values = series.dropna()
+        null_rate = 1 - len(values) / len(series) if len(series) else 0.0
+        is_text = not pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+        dates = _parse_dates(values) if is_text else None
+        if dates is not None:
+            date_range = (dates.min().value, dates.max().value)
+            if pd.api.types.is_datetime64_any_dtype(series):
+                return cls(series.name, series.dtype, null_rate, date_range=date_range)
+            # Mantém o texto no formato do CSV: só a data quando nenhuma linha tem horário
+            date_only = bool((dates == dates.dt.normalize()).all())
+            return cls(series.name, series.dtype, null_rate, date_range=date_range,
+                       date_format="%Y-%m-%d" if date_only else "%Y-%m-%d %H:%M:%S")
+        counts = values.value_counts()
+        if is_text and len(values) and len(counts) / len(values) >= KEY_RATIO:
+            length = int(values.astype(str).str.len().median())
+            return cls(series.name, series.dtype, null_rate, key_ratio=len(counts) / len(values), key_length=length)
+        probs = (counts / counts.sum()).to_numpy(dtype="float64") if len(counts) else None
+        return cls(series.name, series.dtype, null_rate, counts.index.to_numpy(), probs)
+
+    # Chaves: as primeiras key_ratio * n linhas (pela posição global) recebem índices distintos
+    # e as demais repetem um índice sorteado; cada índice é convertido em hex. Assim a cardinalidade
+    # acompanha o volume gerado sem manter um conjunto de chaves em memória. O salt (único por
+    # coluna) desloca os índices antes da mistura, então colunas de chave diferentes não coincidem.
+    def _keys(self, rng, start, size, total_rows, salt):
+        pool = max(1, int(self.key_ratio * total_rows))
+        words = -(-self.key_length // 16)
+        positions = np.arange(start, start + size, dtype=np.uint64)
+        keys = np.where(positions < pool, positions, rng.integers(0, pool, size, dtype=np.uint64))
+        offsets = _mix(_mix(np.full(words, salt % 2**64, dtype=np.uint64)) + np.arange(words, dtype=np.uint64))
+        mixed = np.stack([_mix(keys + offsets[w]) for w in range(words)], axis=1)
+        raw = np.frombuffer(mixed.astype(">u8").tobytes().hex().encode(), dtype=f"S{16 * words}")
+        return raw.astype(f"U{self.key_length}").astype(object)
+
+    # Datas uniformes entre o mínimo e o máximo observados, em segundos inteiros
+    def _dates(self, rng, size):
+        low, high = (value // 10**9 for value in self.date_range)
+        dates = pd.Series(pd.to_datetime(rng.integers(low, high + 1, size), unit="s"))
+        if self.date_format is None:
+            return dates.to_numpy()
+        return dates.dt.strftime(self.date_format).to_numpy(dtype=object)
+
+    def sample(self, rng, start, size, total_rows, salt=0):
+        if self.date_range is not None:
+            column = self._dates(rng, size)
+        elif self.key_ratio is not None:
+            column = self._keys(rng, start, size, total_rows, salt)
+        elif self.values is None:
+            return pd.Series(np.full(size, np.nan), name=self.name)
+        else:
+            column = self.values[rng.choice(len(self.values), size, p=self.probs)]
+
+        if self.null_rate > 0:
+            mask = rng.random(size) < self.null_rate
+            if pd.api.types.is_numeric_dtype(self.dtype):
+                column = column.astype("float64")
+                column[mask] = np.nan
+                return pd.Series(column, name=self.name)
+            column = column.astype(object)
+            column[mask] = None
+        return pd.Series(column, name=self.name, dtype=self.dtype)
+
+
+# Distribuições por coluna (cardinalidade, frequência dos valores, taxa de nulos) extraídas do
+# dataset real. As colunas são amostradas de forma independente: correlações entre colunas
+# (ex.: cidade x estado) não são preservadas.
+class DatasetProfile:
+    def __init__(self, columns):
+        self.columns = columns
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls([ColumnProfile.from_series(df[col]) for col in df.columns])
+
+    # Quando o DataFrame é um chunk de uma geração maior: start é a posição da primeira linha,
+    # total_rows o volume total (define a cardinalidade das chaves) e rng o gerador do chunk.
+    # Cada coluna tem o seu salt (semente e posição da coluna) para as chaves
+    def generate(self, n, seed=0, start=0, total_rows=None, rng=None):
+        rng = rng or np.random.default_rng(seed)
+        total_rows = total_rows or n
+        width = len(self.columns)
+        return pd.DataFrame({col.name: col.sample(rng, start, n, total_rows, seed * width + i)
+                             for i, col in enumerate(self.columns)})
+
+    # Gera n linhas em chunks independentes (cada um com o seu gerador derivado da semente),
+    # prontos para stream_insert ou para gravação incremental no cache colunar
+    def iter_chunks(self, n, chunksize=DEFAULT_CHUNKSIZE, seed=0):
+        starts = range(0, n, chunksize)
+        for start, child in zip(starts, np.random.SeedSequence(seed).spawn(len(starts))):
+            size = min(chunksize, n - start)
+            yield self.generate(size, seed, start, n, np.random.default_rng(child))
+
+
+# Caminho padrão do dataset sintético: data/olist_synthetic_<n>.arrow
+def get_synthetic_path(n):
+    return os.path.join(get_base_path(), "data", f"olist_synthetic_{n}.arrow")
+
+
+# Grava n linhas sintéticas em Arrow/Feather chunk a chunk (memória limitada a um chunk);
+# o arquivo pode ser usado pelos benchmarks via DATASET_FILE
+def write_synthetic(profile, n, path=None, chunksize=DEFAULT_CHUNKSIZE, seed=0, log_fn=None):
+    if pa is None:
+        raise ImportError("pyarrow é necessário para gravar o dataset sintético (use --insert para inserir em streaming)")
+    path = path or get_synthetic_path(n)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    writer = None
+    written = 0
+    start = time.perf_counter()
+    try:
+        for chunk in profile.iter_chunks(n, chunksize, seed):
+            batch = pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pa.ipc.new_file(tmp_path, batch.schema)
+            writer.write_batch(batch)
+            written += len(chunk)
+            if log_fn:
+                log_fn(f"{written} de {n} linhas geradas ({time.perf_counter() - start:.2f} s)")
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, path)
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+    from backends import create_backend
+    from dataset import load_dataset
+    from ingestion import stream_insert
+
+    parser = argparse.ArgumentParser(description="Gera um dataset sintético com as distribuições do olist")
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--output", default=None, help="arquivo .arrow (padrão: data/olist_synthetic_<rows>.arrow)")
+    parser.add_argument("--insert", choices=["sqlserver", "mongo", "sqlite"], default=None,
+                        help="insere os chunks diretamente no banco em vez de gravar o arquivo")
+    args = parser.parse_args()
+
+    profile = DatasetProfile.from_frame(load_dataset(log_fn=print))
+    if args.insert:
+        backend = create_backend(args.insert)
+        backend.connect(log_fn=print)
+        try:
+            stats = stream_insert(backend, profile.iter_chunks(args.rows, args.chunksize, args.seed), log_fn=print)
+            print(f"{stats['rows']} linhas inseridas em {stats['elapsed']:.2f} s "
+                  f"({stats['throughput']:.2f} registros/segundo)")
+        finally:
+            backend.close()
+    else:
+        path = write_synthetic(profile, args.rows, args.output, args.chunksize, args.seed, log_fn=print)
+        print(f"Dataset sintético gravado em: {path}")
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from synthetic import DatasetProfile
+
+
+def _olist_like(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = pd.Timestamp("2017-01-01") + pd.to_timedelta(rng.integers(0, 365 * 86400, n), unit="s")
+    return pd.DataFrame({
+        "order_id": [f"{i:032x}" for i in rng.permutation(n)],
+        "customer_id": [f"{i * 7919:032x}" for i in rng.permutation(n)],
+        "order_status": rng.choice(["delivered", "shipped", "canceled"], n, p=[0.9, 0.08, 0.02]),
+        "customer_state": rng.choice(["SP", "RJ", "MG"], n),
+        "order_purchase_timestamp": timestamps.strftime("%Y-%m-%d %H:%M:%S"),
+        "price": rng.integers(100, 50_000, n) / 100,
+    })
+
+
+def test_key_columns_differ():
+    df = DatasetProfile.from_frame(_olist_like()).generate(2000, seed=3)
+    assert not (df["order_id"] == df["customer_id"]).any()
+    assert df["order_id"].nunique() > 1000
+
+
+def test_timestamps_parse_within_observed_range():
+    source = _olist_like()
+    df = DatasetProfile.from_frame(source).generate(2000, seed=3)
+    observed = pd.to_datetime(source["order_purchase_timestamp"])
+    generated = pd.to_datetime(df["order_purchase_timestamp"], format="%Y-%m-%d %H:%M:%S")
+    assert generated.notna().all()
+    assert generated.min() >= observed.min() and generated.max() <= observed.max()
+
+
+def test_chunks_keep_keys_unique_across_columns():
+    profile = DatasetProfile.from_frame(_olist_like())
+    df = pd.concat(profile.iter_chunks(3000, chunksize=1000, seed=1), ignore_index=True)
+    assert not set(df["order_id"]) & set(df["customer_id"])
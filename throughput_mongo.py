@@ -1,57 +1,65 @@
-import pandas as pd
 import time
-import os
-from dotenv import load_dotenv
-from pymongo import MongoClient
-import urllib.parse
 
-# Carrega variáveis do .env
-dotenv_path = os.path.join(os.path.dirname(__file__), '.env')
-load_dotenv(dotenv_path) #, override=True)
+from backends import create_backend
+from config import get_csv_path
+from dataset import load_dataset
+from ingestion import get_chunksize, iter_csv_chunks, stream_insert
+from repetition import format_summary, run_repeated, settings_from_env
+from results_store import backend_params, record_run
 
-# Lê as variáveis do ambiente
-mongo_host = os.getenv("MONGO_HOST")
-mongo_port = os.getenv("MONGO_PORT")
-mongo_db = os.getenv("MONGO_DB")
-mongo_collection = os.getenv("MONGO_COLLECTION")
-mongo_user = os.getenv("MONGO_USER")
-mongo_pass = os.getenv("MONGO_PASSWORD")
-
-# Codificar a senha para garantir que caracteres especiais sejam tratados corretamente
-encoded_pass = urllib.parse.quote_plus(mongo_pass)
-
-# print({mongo_host}, {mongo_port}, {mongo_user}, {mongo_pass}, {mongo_db}, {mongo_collection})
+print("Iniciando inserção de dados no MongoDB")
 
-# Cria URL de conexão
-mongo_uri = f"mongodb://{mongo_user}:{encoded_pass}@{mongo_host}:{mongo_port}/{mongo_db}?authSource=admin"
+# Conectar ao MongoDB (client reaproveitado do pool)
+backend = create_backend("mongo")
+backend.connect()
+# Começa com a coleção vazia: o benchmark_mongo.py pode tê-la deixado carregada (FIXTURE_REUSE)
+backend.prepare_dataset(None)
 
-print("Iniciando inserção de dados no MongoDB")
+chunksize = get_chunksize()
+# Execuções de aquecimento descartadas e repetições medidas (BENCH_WARMUP / BENCH_REPETITIONS)
+warmup, repetitions = settings_from_env()
 
-# Conectar ao MongoDB
-client = MongoClient(mongo_uri)
-db = client[mongo_db]
-collection = db[mongo_collection]
+if chunksize > 0:
+    # Modo streaming: lê o CSV em chunks e sobrepõe leitura e inserção
+    print(f"Modo streaming: chunks de {chunksize} linhas")
+    total_rows = 0
 
-# Caminho do CSV
-csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "olist_dataset.csv")
-df = pd.read_csv(csv_path)
-total_rows = len(df)
+    def insert_once():
+        global total_rows
+        stats = stream_insert(backend, iter_csv_chunks(get_csv_path(), chunksize))
+        total_rows = stats["rows"]
+        return stats["rows"] / stats["elapsed"] if stats["elapsed"] > 0 else 0
+else:
+    # Dataset do cache colunar
+    df = load_dataset()
+    total_rows = len(df)
 
-# Transforma DataFrame em dicionários
-records = df.to_dict(orient="records")
+    # Transforma DataFrame em dicionários
+    records = backend.prepare_batch(df)
 
-# Medir tempo de inserção
-start_time = time.time()
-collection.insert_many(records)
-end_time = time.time()
+    # O insert_many grava o _id nos próprios dicionários; remove antes de cada repetição
+    # para que todas gerem os _id como a primeira
+    def _reset_records():
+        for record in records:
+            record.pop("_id", None)
 
-# Calcular throughput
-elapsed_time = end_time - start_time
-throughput = total_rows / elapsed_time if elapsed_time > 0 else 0
+    # Medir tempo de inserção
+    def insert_once():
+        start_time = time.perf_counter()
+        backend.insert_batch(records)
+        elapsed = time.perf_counter() - start_time
+        return total_rows / elapsed if elapsed > 0 else 0
 
-print(f"Linhas inseridas no MongoDB: {total_rows}")
-print(f"Tempo total de inserção: {elapsed_time:.2f} segundos")
-print(f"Throughput: {throughput:.2f} linhas por segundo")
+# Cada repetição insere o dataset completo e exclui os dados em seguida
+setup = _reset_records if chunksize <= 0 else None
+summary, samples = run_repeated(insert_once, repetitions, warmup, setup=setup, teardown=backend.teardown, log_fn=print)
+median_time = total_rows / summary["median"] if summary["median"] > 0 else 0
 
-# Excluir os dados para novo teste
-collection.delete_many({})
+print(f"Linhas inseridas no MongoDB: {total_rows} por repetição")
+print(f"Tempo mediano de inserção: {median_time:.2f} segundos")
+print(f"Throughput (linhas por segundo): {format_summary(summary)}")
+if summary["outliers"]:
+    print(f"Repetições fora do padrão: {samples.loc[samples['outlier'], 'repetition'].tolist()}")
+record_run(backend.name, "insercao", summary["mean"], median_time, total_rows, dataset_rows=total_rows,
+           params=backend_params(backend, chunksize=chunksize, warmup=warmup, repetitions=repetitions),
+           extra={"summary": summary, "samples": samples["value"].tolist()})
@@ -1,87 +1,64 @@
-import pandas as pd
 import time
-import os
-from sqlalchemy import create_engine, text
-from dotenv import load_dotenv
-from sqlalchemy.engine import URL
 
-# Carrega as variáveis do arquivo .env
-dotenv_path = os.path.join(os.path.dirname(__file__), '.env')
-load_dotenv(dotenv_path, override=True)
-
-# Lê as variáveis do ambiente
-server = os.getenv("DB_SERVER")
-banco = os.getenv("DB_NAME")
-username = os.getenv("DB_USERNAME")
-password = os.getenv("DB_PASSWORD")
-port = os.getenv("DB_PORT", "1433")
-
-#print(f"Variáveis carregadas: SERVER={server}, BANCO={banco}, USER={username}, PASSWORD={password}, PORT={port}")
+from backends import create_backend
+from config import get_csv_path
+from dataset import load_dataset
+from ingestion import get_chunksize, iter_csv_chunks, stream_insert
+from repetition import format_summary, run_repeated, settings_from_env
+from results_store import backend_params, record_run
 
 print('Iniciando inserção de dados')
 
-# String de conexão inicial (sem banco)
-conn_url = URL.create(
-    drivername="mssql+pyodbc",
-    username=username,
-    password=password,
-    host=server,
-    port=int(port),
-    database=banco,
-    query={"driver": "ODBC Driver 18 for SQL Server", "TrustServerCertificate": "yes"}
-)
+# Backend do SQL Server: engine reaproveitada do pool, cria o banco se necessário
+backend = create_backend("sqlserver")
+backend.connect(log_fn=print)
+
+chunksize = get_chunksize()
+# Execuções de aquecimento descartadas e repetições medidas (BENCH_WARMUP / BENCH_REPETITIONS)
+warmup, repetitions = settings_from_env()
 
-# Conectar à instância e criar banco, se necessário
-engine = create_engine(conn_url, fast_executemany=True)
-with engine.connect() as conn:
-    result = conn.execute(
-        text(f"SELECT COUNT(*) FROM sys.databases WHERE name = :db_name"),
-        {"db_name": banco}
-    )
-    exists = result.scalar()
-    if not exists:
-        print(f"Criando banco de dados '{banco}'...")
-        conn.execute(text(f"CREATE DATABASE [{banco}]"))
-        conn.commit()
-    #else:
-        #print(f"Banco de dados '{banco}' já existe.")
+if chunksize > 0:
+    # Modo streaming: lê o CSV em chunks e sobrepõe leitura e inserção
+    print(f"Modo streaming: chunks de {chunksize} linhas")
+    total_rows = 0
 
-# Conectar ao banco agora criado
-conn_url = URL.create(
-    "mssql+pyodbc",
-    username=username,
-    password=password,
-    host=server,
-    port=int(port),
-    database=banco,
-    query={
-        "driver": "ODBC Driver 18 for SQL Server",
-        "TrustServerCertificate": "yes"
-    }
-)
+    def insert_once():
+        global total_rows
+        stats = stream_insert(backend, iter_csv_chunks(get_csv_path(), chunksize))
+        total_rows = stats["rows"]
+        return stats["rows"] / stats["elapsed"] if stats["elapsed"] > 0 else 0
+else:
+    # Dataset do cache colunar
+    df = load_dataset()
+    total_rows = len(df)
 
-engine = create_engine(conn_url, fast_executemany=True)
+    # Cria a tabela vazia e prepara o lote fora da medição
+    backend.prepare_dataset(df)
+    batch = backend.prepare_batch(df)
 
-# Caminho do arquivo CSV
-csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "olist_dataset.csv")
-df = pd.read_csv(csv_path)
-total_rows = len(df)
+    # Recria a tabela vazia antes de cada repetição
+    def _reset_table():
+        backend.prepare_dataset(df)
 
-# Medir tempo de inserção
-start_time = time.time()
-df.to_sql("olist_dataset", con=engine, if_exists="replace", index=False)
-end_time = time.time()
+    # Medir tempo de inserção
+    def insert_once():
+        start_time = time.perf_counter()
+        backend.insert_batch(batch)
+        elapsed = time.perf_counter() - start_time
+        return total_rows / elapsed if elapsed > 0 else 0
 
-# Calcular throughput
-elapsed_time = end_time - start_time
-throughput = total_rows / elapsed_time if elapsed_time > 0 else 0
+# Cada repetição insere o dataset completo e exclui os dados em seguida
+setup = _reset_table if chunksize <= 0 else None
+summary, samples = run_repeated(insert_once, repetitions, warmup, setup=setup, teardown=backend.teardown, log_fn=print)
+median_time = total_rows / summary["median"] if summary["median"] > 0 else 0
 
-print(f"Linhas inseridas no banco: {total_rows}")
-print(f"Tempo total de inserção: {elapsed_time:.2f} segundos")
-print(f"Throughput: {throughput:.2f} linhas por segundo")
+print(f"Linhas inseridas no banco: {total_rows} por repetição")
+print(f"Tempo mediano de inserção: {median_time:.2f} segundos")
+print(f"Throughput (linhas por segundo): {format_summary(summary)}")
+if summary["outliers"]:
+    print(f"Repetições fora do padrão: {samples.loc[samples['outlier'], 'repetition'].tolist()}")
+record_run(backend.name, "insercao", summary["mean"], median_time, total_rows, dataset_rows=total_rows,
+           params=backend_params(backend, chunksize=chunksize, warmup=warmup, repetitions=repetitions),
+           extra={"summary": summary, "samples": samples["value"].tolist()})
 
-# Excluir dados para novo teste
-with engine.connect() as conn:
-    conn.execute(text("DELETE FROM olist_dataset"))
-    conn.commit()
-    #print("Dados excluídos da tabela 'olist_dataset'.")
+backend.close()
@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+from collections import deque
+import pandas as pd
+
+from config import get_results_dir
+
+DEFAULT_INTERVAL = 1.0
+# Uma hora de amostras de 1 s; amostras mais antigas são descartadas
+DEFAULT_CAPACITY = 3600
+
+
+# Amostrador de throughput por intervalo fixo: o loop medido só soma contadores (add) e uma
+# thread separada, a cada `interval` segundos, converte o acumulado em linhas/s e operações/s
+# e grava em um buffer circular de `capacity` amostras.
+class ThroughputSampler:
+    def __init__(self, interval=DEFAULT_INTERVAL, capacity=DEFAULT_CAPACITY):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._rows = 0
+        self._ops = 0
+        self._samples = deque(maxlen=capacity)
+        self._stop = threading.Event()
+        self._thread = None
+        self._start = None
+
+    def add(self, rows=0, ops=1):
+        with self._lock:
+            self._rows += rows
+            self._ops += ops
+
+    def _take(self):
+        with self._lock:
+            rows, ops = self._rows, self._ops
+            self._rows = self._ops = 0
+        return rows, ops
+
+    def _run(self):
+        last = self._start
+        k = 1
+        # Horários fixos (start + k * interval), sem acumular o atraso de cada amostra
+        while not self._stop.wait(max(0.0, self._start + k * self.interval - time.perf_counter())):
+            self._sample(last)
+            last = time.perf_counter()
+            k += 1
+        self._sample(last)
+
+    def _sample(self, last):
+        now = time.perf_counter()
+        rows, ops = self._take()
+        span = now - last
+        if span <= 0:
+            return
+        with self._lock:
+            self._samples.append((now - self._start, rows / span, ops / span))
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # Cópia das amostras (t, linhas/s, operações/s); pode ser lida durante a execução
+    def series(self):
+        with self._lock:
+            return list(self._samples)
+
+    def to_frame(self):
+        return pd.DataFrame(self.series(), columns=["t", "rows_per_s", "ops_per_s"])
+
+    def to_dict(self):
+        frame = self.to_frame()
+        return {"interval": self.interval, **{col: frame[col].round(3).tolist() for col in frame.columns}}
+
+    # Razão entre o throughput médio do último e do primeiro `fraction` da execução
+    # (< 1 indica queda ao longo do tempo); None com menos de 4 amostras
+    def degradation(self, column="rows_per_s", fraction=0.1):
+        values = self.to_frame()[column]
+        if len(values) < 4:
+            return None
+        n = max(1, int(len(values) * fraction))
+        first = values.iloc[:n].mean()
+        return values.iloc[-n:].mean() / first if first > 0 else None
+
+    def save(self, name):
+        path = os.path.join(get_results_dir(), f"timeline_{name}_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+        self.to_frame().to_csv(path, index=False)
+        return path
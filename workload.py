@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from config import get_base_path
+
+DEFAULT_OPERATIONS = 100_000
+DEFAULT_SEED = 42
+
+
+# Impressão digital do conteúdo do DataFrame (colunas + valores), usada para garantir
+# que um workload seja reproduzido sobre os mesmos dados em que foi gerado
+def dataset_fingerprint(df):
+    digest = hashlib.sha256(json.dumps(list(map(str, df.columns))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# Sequência de consultas pontuais (coluna, linha) gerada de uma vez, fora do loop medido.
+# Guarda apenas índices, então o arquivo é pequeno e o mesmo workload pode ser
+# reproduzido de forma idêntica no SQL Server e no MongoDB.
+class Workload:
+    def __init__(self, columns, col_idx, row_idx, seed, fingerprint):
+        self.columns = list(columns)
+        self.col_idx = col_idx
+        self.row_idx = row_idx
+        self.seed = seed
+        self.fingerprint = fingerprint
+
+    def __len__(self):
+        return len(self.col_idx)
+
+    # Campo e linha sorteados uniformemente, ignorando células nulas (que nunca casam no SQL)
+    @classmethod
+    def generate(cls, df, n=DEFAULT_OPERATIONS, seed=DEFAULT_SEED, columns=None):
+        columns = [col for col in (columns or df.columns) if df[col].notna().any()]
+        rng = np.random.default_rng(seed)
+        col_idx = rng.integers(0, len(columns), n).astype(np.uint16)
+        row_idx = np.empty(n, dtype=np.uint32)
+        for c, col in enumerate(columns):
+            mask = col_idx == c
+            valid = np.flatnonzero(df[col].notna().to_numpy())
+            row_idx[mask] = valid[rng.integers(0, len(valid), int(mask.sum()))]
+        return cls(columns, col_idx, row_idx, seed, dataset_fingerprint(df))
+
+    # Materializa a lista de (campo, valor) com tipos nativos do Python, vetorizado por coluna
+    def operations(self, df):
+        if dataset_fingerprint(df) != self.fingerprint:
+            raise ValueError("Workload gerado para outro dataset (impressão digital diferente)")
+        ops = [None] * len(self)
+        for c, col in enumerate(self.columns):
+            positions = np.flatnonzero(self.col_idx == c)
+            values = df[col].iloc[self.row_idx[positions]].tolist()
+            for pos, value in zip(positions.tolist(), values):
+                ops[pos] = (col, value)
+        return ops
+
+    def save(self, path):
+        meta = {"columns": self.columns, "seed": self.seed, "fingerprint": self.fingerprint}
+        with open(path, "wb") as f:
+            np.savez_compressed(f, col_idx=self.col_idx, row_idx=self.row_idx, meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            return cls(meta["columns"], data["col_idx"], data["row_idx"], meta["seed"], meta["fingerprint"])
+
+
+# Caminho padrão do arquivo de workload (WORKLOAD_FILE no .env)
+def get_workload_path():
+    return os.getenv("WORKLOAD_FILE") or os.path.join(get_base_path(), "data", "workload.npz")
+
+
+# Reaproveita o workload salvo quando ele corresponde ao dataset; senão gera e salva um novo
+def load_or_create(df, path=None, n=None, seed=None, log_fn=None):
+    path = path or get_workload_path()
+    n = n or int(os.getenv("WORKLOAD_OPERATIONS", DEFAULT_OPERATIONS))
+    seed = seed if seed is not None else int(os.getenv("WORKLOAD_SEED", DEFAULT_SEED))
+
+    if os.path.isfile(path):
+        workload = Workload.load(path)
+        if workload.seed == seed and len(workload) == n and workload.fingerprint == dataset_fingerprint(df):
+            if log_fn:
+                log_fn(f"Workload reaproveitado: {path}")
+            return workload
+
+    workload = Workload.generate(df, n, seed)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    workload.save(path)
+    if log_fn:
+        log_fn(f"Workload gerado ({n} operações, semente {seed}): {path}")
+    return workload
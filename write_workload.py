@@ -0,0 +1,118 @@
+from mixed_workload import (DEFAULT_MAX_FANOUT, DEFAULT_RANGE_ROWS, generate_operations, max_range_operations,
+                            results_table, run_mixed)
+from workload import DEFAULT_SEED
+
+# Cargas só de escrita sobre as colunas do olist; update-many tem fan-out de 2 a max_fanout
+# linhas por operação e delete-range apaga blocos disjuntos de range_rows linhas
+WRITE_WORKLOADS = {
+    "update-by-key": {"update": 1.0},        # UPDATE TOP (1) ... WHERE key = ? / update_one
+    "update-many": {"update_many": 1.0},     # UPDATE ... WHERE key = ? / update_many
+    "delete-by-key": {"delete": 1.0},        # DELETE TOP (1) ... WHERE key = ? / delete_one
+    "delete-range": {"delete_range": 1.0},   # DELETE ... WHERE low <= key < high / delete_many
+}
+
+
+def _reload(backend, df, log_fn):
+    log_fn("Recarregando dados para a carga de escrita...")
+    backend.prepare_dataset(df)
+    backend.insert_batch(backend.prepare_batch(df))
+
+
+def _volume_delta(before, after, rows):
+    if before is None or after is None:
+        return None
+    delta = {key: after[key] - before[key] for key in before}
+    total = sum(delta.values())
+    delta["bytes_per_row"] = total / rows if rows else None
+    return delta
+
+
+# Executa uma carga de escrita nos backends já carregados. delete-range é limitado às operações
+# que cabem em MAX_DELETE_FRACTION da tabela. O volume gravado pelo servidor (dados + log) é
+# lido antes e depois, fora da medição; os contadores são da instância inteira, então outras
+# cargas no mesmo servidor entram na conta
+def run_write(backends, df, name, operations, duration=None, seed=DEFAULT_SEED, max_fanout=DEFAULT_MAX_FANOUT,
+              range_rows=DEFAULT_RANGE_ROWS, log_fn=print):
+    if name not in WRITE_WORKLOADS:
+        raise ValueError(f"Carga de escrita desconhecida: {name} (opções: {', '.join(WRITE_WORKLOADS)})")
+    loader = backends[0]
+    if name == "delete-range" and operations > max_range_operations(df, range_rows):
+        operations = max_range_operations(df, range_rows)
+        log_fn(f"delete-range limitado a {operations} operações de {range_rows} linhas")
+    ops = generate_operations(df, WRITE_WORKLOADS[name], operations, seed, max_fanout=max_fanout,
+                              range_rows=range_rows)
+    log_fn(f"[{loader.name}] {name}: {len(ops)} operações com {len(backends)} workers")
+    before = loader.write_volume()
+    result = run_mixed(backends, ops, duration, log_fn=log_fn)
+    volume = _volume_delta(before, loader.write_volume(), sum(result["rows_affected"].values()))
+    if volume:
+        per_row = volume["bytes_per_row"]
+        log_fn(f"  gravado pelo servidor: dados {volume['data_bytes'] / 2**20:.1f} MB, "
+               f"log {volume['log_bytes'] / 2**20:.1f} MB"
+               + (f" | {per_row:,.0f} bytes por linha afetada" if per_row is not None else ""))
+    result["write_volume"] = volume
+    result["fanout_limit"] = max_fanout if name == "update-many" else None
+    result["range_rows"] = range_rows if name == "delete-range" else None
+    return result
+
+
+# Executa cada carga de escrita sobre uma cópia recém-carregada do dataset (as exclusões
+# esvaziam a tabela e as atualizações alteram os dados das cargas seguintes).
+# O primeiro backend da lista é usado para carregar e descartar os dados.
+def run_write_suite(backends, df, names=None, operations=10_000, duration=None, seed=DEFAULT_SEED,
+                    max_fanout=DEFAULT_MAX_FANOUT, range_rows=DEFAULT_RANGE_ROWS, log_fn=print, record=True):
+    from results_store import backend_params, record_run
+
+    loader = backends[0]
+    results = {}
+    for name in names or WRITE_WORKLOADS:
+        _reload(loader, df, log_fn)
+        try:
+            result = run_write(backends, df, name, operations, duration, seed, max_fanout, range_rows, log_fn)
+        finally:
+            loader.teardown()
+        results[name] = result
+        if record:
+            record_run(loader.name, name.replace("-", "_"), result["throughput"], result["elapsed"],
+                       result["operations"], dataset_rows=len(df),
+                       params=backend_params(loader, workers=len(backends), operations=operations,
+                                             fanout_limit=result["fanout_limit"], range_rows=result["range_rows"]),
+                       latency={"total": result["latency"], **result["by_type"]},
+                       extra={"errors": result["errors"], "rows_affected": result["rows_affected"],
+                              "write_volume": result["write_volume"]})
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import pandas as pd
+    from backends import create_backend
+    from dataset import load_dataset
+
+    parser = argparse.ArgumentParser(description="Cargas de atualização e exclusão")
+    parser.add_argument("backend", choices=["sqlserver", "mongo", "sqlite"])
+    parser.add_argument("--workload", action="append", choices=list(WRITE_WORKLOADS),
+                        help="pode ser repetido (padrão: todas)")
+    parser.add_argument("--operations", type=int, default=10_000)
+    parser.add_argument("--duration", type=float, default=None, help="limite em segundos por carga")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--max-fanout", type=int, default=DEFAULT_MAX_FANOUT, help="linhas por update-many (máx.)")
+    parser.add_argument("--range-rows", type=int, default=DEFAULT_RANGE_ROWS, help="linhas por delete-range")
+    args = parser.parse_args()
+
+    backends = [create_backend(args.backend, pool_size=args.workers) for _ in range(args.workers)]
+    backends[0].connect(warm=args.workers, log_fn=print)
+    try:
+        df = load_dataset(log_fn=print)
+        results = run_write_suite(backends, df, args.workload, args.operations, args.duration, args.seed,
+                                  args.max_fanout, args.range_rows)
+        tables = []
+        for name, result in results.items():
+            table = results_table(result)
+            table.insert(0, "workload", name)
+            tables.append(table)
+        print(pd.concat(tables, ignore_index=True).to_string(index=False))
+    finally:
+        for backend in backends:
+            backend.close()